@@ -1,14 +1,23 @@
 import os
+import sys
 
 import joblib
 import pandas as pd
 from sklearn.ensemble import RandomForestRegressor
 
+# Allow running as ``python model/train_model.py`` from the project root.
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from server.flat_forest import export_flat_forest
+
 
 def main() -> None:
     base_dir = os.path.dirname(__file__)
     csv_path = os.path.join(base_dir, "tashkent_grid_historic_data.csv")
     model_path = os.path.join(base_dir, "grid_load_rf.joblib")
+    flat_model_dir = os.path.join(base_dir, "grid_load_rf_flat")
 
     if not os.path.exists(csv_path):
         raise FileNotFoundError(
@@ -44,8 +53,10 @@ def main() -> None:
     )
     model.fit(X, y)
     joblib.dump(model, model_path)
+    manifest = export_flat_forest(model, flat_model_dir)
 
     print(f"Model trained and saved to: {model_path}")
+    print(f"Flat model ({manifest['node_count']} nodes) exported to: {flat_model_dir}")
     print(f"Rows: {len(df)}, Features: {feature_cols}")
 
 
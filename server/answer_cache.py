@@ -0,0 +1,194 @@
+import logging
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Sequence
+
+import numpy as np
+
+from server.cache import LruTtlCache
+from server.config import Settings
+
+logger = logging.getLogger("grid-backend")
+
+# Embeddings of recent questions, so storing an answer does not embed its question again.
+QUESTION_EMBEDDING_CACHE_SIZE = 256
+
+
+def normalize_question(question: str) -> str:
+    text = unicodedata.normalize("NFKC", question).casefold()
+    return " ".join(re.sub(r"[^\w\s]", " ", text).split())
+
+
+@dataclass(frozen=True)
+class CachedAnswer:
+    answer: str
+    match: str
+    similarity: float = 1.0
+    sources: tuple = ()
+
+
+class AnswerCache:
+    """Answers to /ask keyed by the normalized question and a hash of the prompt context.
+
+    The exact lookup is a dict hit. With ``similarity_threshold`` above zero and
+    an ``embed`` function, a miss falls back to the closest earlier question
+    asked against the same context, by cosine similarity of their embeddings.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_s: float = 3600.0,
+        similarity_threshold: float = 0.0,
+        embed: Optional[Callable[[str], Sequence[float]]] = None,
+    ) -> None:
+        self._answers = LruTtlCache(max_entries=max_entries, ttl_s=ttl_s)
+        self.similarity_threshold = float(similarity_threshold)
+        self._embed = embed if self.similarity_threshold > 0 else None
+        self._question_vectors = LruTtlCache(max_entries=QUESTION_EMBEDDING_CACHE_SIZE)
+        # context hash -> normalized question -> unit vector, oldest first.
+        self._vectors: Dict[str, "OrderedDict[str, np.ndarray]"] = {}
+        self._vector_count = 0
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.embedding_errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._answers.max_entries > 0
+
+    def lookup(self, question: str, context_hash: str) -> Optional[CachedAnswer]:
+        if not self.enabled:
+            return None
+        normalized = normalize_question(question)
+        entry = self._answers.get((context_hash, normalized))
+        if entry is not None:
+            self.exact_hits += 1
+            return CachedAnswer(answer=entry[0], match="exact", sources=entry[1])
+
+        cached = self._lookup_similar(normalized, context_hash) if self._embed is not None else None
+        if cached is None:
+            self.misses += 1
+        else:
+            self.semantic_hits += 1
+        return cached
+
+    def store(self, question: str, context_hash: str, answer: str, sources: Sequence[Any] = ()) -> None:
+        if not self.enabled or not answer:
+            return
+        normalized = normalize_question(question)
+        self._answers.put((context_hash, normalized), (answer, tuple(sources)))
+        if self._embed is None:
+            return
+        vector = self._vector(normalized)
+        if vector is None:
+            return
+        with self._lock:
+            bucket = self._vectors.setdefault(context_hash, OrderedDict())
+            if normalized not in bucket:
+                self._vector_count += 1
+            bucket[normalized] = vector
+            bucket.move_to_end(normalized)
+            # Answers age out of the LRU on their own; keep the vector index no larger than it.
+            while self._vector_count > self._answers.max_entries:
+                self._drop_oldest_vector()
+
+    def invalidate(self) -> None:
+        self._answers.invalidate()
+        with self._lock:
+            self._vectors.clear()
+            self._vector_count = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.exact_hits + self.semantic_hits + self.misses
+        answers = self._answers.stats()
+        return {
+            "entries": answers["entries"],
+            "max_entries": answers["max_entries"],
+            "ttl_s": answers["ttl_s"],
+            "evictions": answers["evictions"],
+            "semantic": self._embed is not None,
+            "similarity_threshold": self.similarity_threshold,
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "embedding_errors": self.embedding_errors,
+            "hit_rate": round((self.exact_hits + self.semantic_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+    def _lookup_similar(self, normalized: str, context_hash: str) -> Optional[CachedAnswer]:
+        with self._lock:
+            bucket = self._vectors.get(context_hash)
+            if not bucket:
+                return None
+            candidates = list(bucket.items())
+        vector = self._vector(normalized)
+        if vector is None:
+            return None
+
+        similarities = np.stack([candidate for _, candidate in candidates]) @ vector
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.similarity_threshold:
+            return None
+        entry = self._answers.get((context_hash, candidates[best][0]))
+        if entry is None:
+            # Expired or evicted from the answer LRU since it was indexed.
+            self._forget(context_hash, candidates[best][0])
+            return None
+        return CachedAnswer(
+            answer=entry[0],
+            match="semantic",
+            similarity=round(float(similarities[best]), 4),
+            sources=entry[1],
+        )
+
+    def _vector(self, normalized: str) -> Optional[np.ndarray]:
+        vector = self._question_vectors.get(normalized)
+        if vector is not None:
+            return vector
+        try:
+            vector = np.asarray(self._embed(normalized), dtype=np.float32)
+        except Exception as error:
+            self.embedding_errors += 1
+            logger.warning("Answer cache embedding failed: %s", error)
+            return None
+        norm = float(np.linalg.norm(vector))
+        if norm == 0.0:
+            return None
+        vector = vector / norm
+        self._question_vectors.put(normalized, vector)
+        return vector
+
+    def _forget(self, context_hash: str, normalized: str) -> None:
+        with self._lock:
+            bucket = self._vectors.get(context_hash)
+            if bucket is not None and bucket.pop(normalized, None) is not None:
+                self._vector_count -= 1
+                if not bucket:
+                    del self._vectors[context_hash]
+
+    def _drop_oldest_vector(self) -> None:
+        # Trims the oldest context first; questions against one prediction arrive close together.
+        context_hash = next(iter(self._vectors))
+        bucket = self._vectors[context_hash]
+        bucket.popitem(last=False)
+        self._vector_count -= 1
+        if not bucket:
+            del self._vectors[context_hash]
+
+
+def build_answer_cache(
+    settings: Settings,
+    embed: Optional[Callable[[str], Sequence[float]]] = None,
+) -> AnswerCache:
+    return AnswerCache(
+        max_entries=settings.answer_cache_size,
+        ttl_s=settings.answer_cache_ttl_s,
+        similarity_threshold=settings.answer_cache_similarity,
+        embed=embed,
+    )
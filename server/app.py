@@ -4,17 +4,49 @@ import logging
 import os
 import time
 import uuid
+import weakref
+from contextlib import aclosing
+from datetime import datetime
+from typing import Optional
 from requests.exceptions import RequestException
 
+import httpx
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 
+from server.answer_cache import CachedAnswer
 from server.config import get_settings
-from server.schemas import ChatQuery, PredictRequest
-from server.services.prediction_service import build_prediction_response_async
-from server.services.station_service import generate_stations_from_csv
-from server.state import create_runtime_state
+from server.future_state_store import new_future_state_id
+from server.llm_scheduler import PRIORITY_INTERACTIVE, LlmDeadlineExceeded, LlmQueueFull, LlmSchedulerError
+from server.ollama_stream import OllamaStreamError
+from server.schemas import ChatQuery, PredictRangeRequest, PredictRequest
+from server.services.chat_service import (
+    SUPPORTED_LANGUAGES,
+    AskPrompt,
+    answer_context_hash,
+    build_ask_prompt,
+    build_future_context,
+    estimate_tokens,
+    format_excerpts,
+    normalize_language,
+    split_client_context,
+    summarize_future_state,
+    translate_templates,
+)
+from server.services.prediction_service import (
+    EXPLANATION_TEMPLATES,
+    build_prediction_range_response_async,
+    build_prediction_response_async,
+    iter_prediction_events,
+    localize_suggestions,
+    sample_explanation_values,
+)
+from server.services.refresh_service import refresh_district_data
+from server.services.station_service import load_current_stations
+from server.shared_state import has_shared_snapshot, load_shared_runtime_state
+from server.state import RuntimeState, create_runtime_state
+from server.utils import parse_target_date
 
 logger = logging.getLogger("grid-backend")
 logging.basicConfig(level=logging.INFO)
@@ -23,8 +55,15 @@ logging.basicConfig(level=logging.INFO)
 settings = get_settings()
 if not os.path.exists(settings.model_path):
     raise RuntimeError(f"Pre-trained model not found at: {settings.model_path}")
+if any(language not in SUPPORTED_LANGUAGES or language == "en" for language in settings.translation_languages):
+    raise RuntimeError(
+        "Unsupported TRANSLATION_LANGUAGES. Use a comma-separated subset of: uz, ru. "
+        f"Received: {','.join(settings.translation_languages)}"
+    )
 
-state = create_runtime_state(settings)
+# Heavy assets load in the background after the server binds; see load_runtime_state().
+state: Optional[RuntimeState] = None
+startup_report: dict = {"status": "starting", "stages_ms": {}, "total_ms": None, "error": None}
 
 app = FastAPI(title="Tashkent Local Predictive RAG API")
 app.add_middleware(
@@ -35,9 +74,149 @@ app.add_middleware(
 )
 
 
+def require_state(request: Request) -> RuntimeState:
+    if state is None:
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "message": f"Backend is not ready yet (startup {startup_report['status']})",
+                "request_id": request.state.request_id,
+            },
+            headers={"Retry-After": "5"},
+        )
+    return state
+
+
+async def load_runtime_state():
+    global state
+    started = time.perf_counter()
+    stage_timings = startup_report["stages_ms"]
+    try:
+        if settings.shared_state_dir and has_shared_snapshot(settings.shared_state_dir):
+            runtime_state = await asyncio.to_thread(load_shared_runtime_state, settings, stage_timings)
+        else:
+            if settings.shared_state_dir:
+                logger.warning("No shared state snapshot in %s; loading privately", settings.shared_state_dir)
+            runtime_state = await asyncio.to_thread(create_runtime_state, settings, stage_timings)
+            stage_started = time.perf_counter()
+            runtime_state.current_stations = await asyncio.to_thread(load_current_stations, runtime_state)
+            stage_timings["stations"] = round((time.perf_counter() - stage_started) * 1000, 2)
+    except Exception as error:
+        logger.exception("Backend startup failed")
+        startup_report.update(status="failed", error=str(error))
+        return
+
+    state = runtime_state
+    startup_report.update(status="ready", total_ms=round((time.perf_counter() - started) * 1000, 2))
+    logger.info(
+        "Backend ready in %.2fms (%s)",
+        startup_report["total_ms"],
+        ", ".join(f"{stage} {elapsed:.2f}ms" for stage, elapsed in stage_timings.items()),
+    )
+    schedule_template_translation(runtime_state)
+    if settings.data_refresh_interval_s > 0:
+        app.state.refresh_task = asyncio.create_task(periodic_district_refresh(settings.data_refresh_interval_s))
+
+
+async def translate_explanation_templates(runtime_state: RuntimeState, languages: list[str]) -> None:
+    for language in languages:
+        started = time.perf_counter()
+        try:
+            templates = await asyncio.to_thread(
+                translate_templates,
+                EXPLANATION_TEMPLATES,
+                language,
+                runtime_state,
+                sample_values=sample_explanation_values(),
+            )
+        except Exception as error:
+            logger.warning("Explanation templates not translated to %s: %s", language, error)
+            continue
+        if templates is None:
+            logger.warning("Explanation templates for %s came back incomplete; retrying on a later /predict", language)
+            continue
+        runtime_state.explanation_templates[language] = templates
+        logger.info(
+            "Explanation templates translated to %s in %.2fms",
+            language,
+            (time.perf_counter() - started) * 1000,
+        )
+
+
+def schedule_template_translation(runtime_state: RuntimeState) -> None:
+    """Translate the TP explanation templates once per language in the background; English is served meanwhile."""
+    task = getattr(app.state, "template_task", None)
+    if task is not None and not task.done():
+        return
+    missing = [
+        language for language in settings.translation_languages if language not in runtime_state.explanation_templates
+    ]
+    if missing:
+        app.state.template_task = asyncio.create_task(translate_explanation_templates(runtime_state, missing))
+
+
+def requested_language(requested: Optional[str], default: str, request_id: str) -> str:
+    if not requested:
+        return default
+    language = normalize_language(requested)
+    if language is None:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "message": f"Unsupported language. Use one of: {', '.join(SUPPORTED_LANGUAGES)}. Received: {requested}",
+                "request_id": request_id,
+            },
+        )
+    return language
+
+
+def explanation_language(runtime_state: RuntimeState, requested: Optional[str], request_id: str) -> str:
+    """The language /predict explanations are rendered in: the requested one once its templates are ready."""
+    language = requested_language(requested, "en", request_id)
+    if language == "en" or language in runtime_state.explanation_templates:
+        return language
+    schedule_template_translation(runtime_state)
+    return "en"
+
+
+# Requests read the module-level ``state``; a refresh builds a new RuntimeState
+# off the event loop and rebinds the name, so in-flight requests keep the one they started with.
+state_refresh_lock = asyncio.Lock()
+
+
+async def refresh_runtime_state() -> dict:
+    global state
+    async with state_refresh_lock:
+        refreshed, summary = await asyncio.to_thread(refresh_district_data, state)
+        state = refreshed
+    if summary["rows_added"]:
+        logger.info(
+            "District data refreshed: %d rows for %s in %.2fms",
+            summary["rows_added"],
+            ", ".join(summary["districts_updated"]),
+            summary["elapsed_ms"],
+        )
+    return summary
+
+
+async def periodic_district_refresh(interval_s: int):
+    while True:
+        await asyncio.sleep(interval_s)
+        try:
+            await refresh_runtime_state()
+        except Exception:
+            logger.exception("Scheduled district data refresh failed")
+
+
 @app.on_event("startup")
-async def preload_current_tps():
-    state.current_stations = generate_stations_from_csv(state)
+async def start_background_startup():
+    app.state.startup_task = asyncio.create_task(load_runtime_state())
+
+
+@app.on_event("shutdown")
+async def close_llm_stream():
+    if state is not None and state.llm_stream is not None:
+        await state.llm_stream.aclose()
 
 
 @app.middleware("http")
@@ -62,14 +241,15 @@ async def request_logging_middleware(request: Request, call_next):
 
 @app.get("/api/stations")
 async def get_all_stations(request: Request):
+    runtime_state = require_state(request)
     try:
-        if not state.current_stations:
-            state.current_stations = generate_stations_from_csv(state)
-        stations = state.current_stations
+        if not runtime_state.current_stations:
+            runtime_state.current_stations = load_current_stations(runtime_state)
+        stations = runtime_state.current_stations
         return {
             "request_id": request.state.request_id,
             "count": len(stations),
-            "stations": stations,
+            "stations": stations.materialize(),
         }
     except Exception as error:
         logger.exception("get_all_stations failed")
@@ -81,13 +261,13 @@ async def get_all_stations(request: Request):
 
 @app.get("/api/stations/{district}")
 async def get_district_stations(district: str, request: Request):
+    runtime_state = require_state(request)
     try:
-        if not state.current_stations:
-            state.current_stations = generate_stations_from_csv(state)
-        all_stations = state.current_stations
-        district_stations = [s for s in all_stations if s["district"].lower() == district.lower()]
+        if not runtime_state.current_stations:
+            runtime_state.current_stations = load_current_stations(runtime_state)
+        station_indices = runtime_state.current_stations.district_indices(district)
 
-        if not district_stations:
+        if station_indices is None:
             raise HTTPException(
                 status_code=404,
                 detail={"message": f"District not found: {district}", "request_id": request.state.request_id},
@@ -96,8 +276,8 @@ async def get_district_stations(district: str, request: Request):
         return {
             "request_id": request.state.request_id,
             "district": district,
-            "count": len(district_stations),
-            "stations": district_stations,
+            "count": len(station_indices),
+            "stations": runtime_state.current_stations.materialize(station_indices),
         }
     except HTTPException:
         raise
@@ -109,16 +289,30 @@ async def get_district_stations(district: str, request: Request):
         )
 
 
+def store_future_state(runtime_state: RuntimeState, future_state_id: str, future_state: dict) -> None:
+    future_state = {**future_state, "suggested_tps": localize_suggestions(future_state.get("suggested_tps") or [])}
+    runtime_state.future_state_store.put(future_state_id, future_state, summarize_future_state(future_state))
+
+
 @app.post("/predict")
 async def predict_endpoint(item: PredictRequest, request: Request):
+    runtime_state = require_state(request)
+    language = explanation_language(runtime_state, item.language, request.state.request_id)
     try:
-        if not state.current_stations:
-            state.current_stations = generate_stations_from_csv(state)
-        all_stations = state.current_stations
-        payload = await build_prediction_response_async(state, item.target_date, all_stations)
-        state.future_state = payload.pop("future_state")
+        if not runtime_state.current_stations:
+            runtime_state.current_stations = load_current_stations(runtime_state)
+        all_stations = runtime_state.current_stations
+        payload = await build_prediction_response_async(runtime_state, item.target_date, all_stations)
+        future_state_id = item.future_state_id or new_future_state_id()
+        # The stored future state keeps the English explanations the /ask prompt is written in.
+        await asyncio.to_thread(store_future_state, runtime_state, future_state_id, payload.pop("future_state"))
+        payload["suggested_tps"] = localize_suggestions(
+            payload["suggested_tps"], runtime_state.explanation_templates.get(language)
+        )
         return {
             "request_id": request.state.request_id,
+            "future_state_id": future_state_id,
+            "language": language,
             **payload,
         }
     except Exception as error:
@@ -129,57 +323,308 @@ async def predict_endpoint(item: PredictRequest, request: Request):
         )
 
 
-@app.post("/ask")
-async def ask_question(item: ChatQuery, request: Request):
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+
+def _encode_stream_event(event: dict, stream_format: str) -> str:
+    data = json.dumps(event, ensure_ascii=True)
+    if stream_format == "sse":
+        return f"event: {event['event']}\ndata: {data}\n\n"
+    return data + "\n"
+
+
+@app.post("/predict/stream")
+async def predict_stream_endpoint(item: PredictRequest, request: Request, format: str = "ndjson"):
+    request_id = request.state.request_id
+    stream_format = format.strip().lower()
+    if stream_format not in STREAM_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail={"message": "format must be 'ndjson' or 'sse'", "request_id": request_id},
+        )
+    try:
+        parse_target_date(item.target_date)
+    except ValueError as error:
+        raise HTTPException(
+            status_code=400,
+            detail={"message": str(error), "request_id": request_id},
+        )
+
+    runtime_state = require_state(request)
+    language = explanation_language(runtime_state, item.language, request_id)
+    if not runtime_state.current_stations:
+        runtime_state.current_stations = load_current_stations(runtime_state)
+    all_stations = runtime_state.current_stations
+    future_state_id = item.future_state_id or new_future_state_id()
+
+    def event_stream():
+        # Stations are not retained for /ask; only the compact parts of the stream are.
+        future_state = {
+            "target_date": item.target_date,
+            "generated_at": datetime.utcnow().isoformat(),
+            "suggested_tps": [],
+        }
+        try:
+            for event in iter_prediction_events(runtime_state, item.target_date, all_stations):
+                if event["event"] == "district_predictions":
+                    event["request_id"] = request_id
+                    # Usable with /ask once the stream has completed.
+                    event["future_state_id"] = future_state_id
+                    event["language"] = language
+                    future_state["district_predictions"] = event["district_predictions"]
+                    future_state["total_transformers_needed"] = event["total_transformers_needed"]
+                elif event["event"] == "suggested_tps":
+                    future_state["suggested_tps"].extend(event["suggested_tps"])
+                    event["suggested_tps"] = localize_suggestions(
+                        event["suggested_tps"], runtime_state.explanation_templates.get(language)
+                    )
+                elif event["event"] == "summary":
+                    future_state["critical_priority"] = event["critical_priority"]
+                    future_state["station_count"] = event["station_count"]
+                yield _encode_stream_event(event, stream_format)
+        except Exception as error:
+            logger.exception("predict_stream_endpoint failed")
+            yield _encode_stream_event(
+                {"event": "error", "message": str(error), "request_id": request_id},
+                stream_format,
+            )
+            return
+        store_future_state(runtime_state, future_state_id, future_state)
+
+    return StreamingResponse(event_stream(), media_type=STREAM_MEDIA_TYPES[stream_format])
+
+
+@app.post("/predict/range")
+async def predict_range_endpoint(item: PredictRangeRequest, request: Request):
+    runtime_state = require_state(request)
+    try:
+        payload = await build_prediction_range_response_async(
+            runtime_state,
+            item.start_date,
+            item.end_date,
+            item.step_months,
+        )
+        return {
+            "request_id": request.state.request_id,
+            **payload,
+        }
+    except Exception as error:
+        logger.exception("predict_range_endpoint failed")
+        raise HTTPException(
+            status_code=400,
+            detail={"message": str(error), "request_id": request.state.request_id},
+        )
+
+
+@app.post("/admin/refresh")
+async def refresh_endpoint(request: Request):
+    require_state(request)
+    try:
+        summary = await refresh_runtime_state()
+        return {
+            "request_id": request.state.request_id,
+            **summary,
+        }
+    except Exception as error:
+        logger.exception("refresh_endpoint failed")
+        raise HTTPException(
+            status_code=502,
+            detail={"message": str(error), "request_id": request.state.request_id},
+        )
+
+
+def ollama_unavailable_message() -> str:
+    return (
+        f"Ollama is unreachable at {settings.ollama_base_url}. "
+        f"Start Ollama and make sure model '{settings.ollama_llm_model}' is available "
+        "(example: `ollama serve` and `ollama pull "
+        f"{settings.ollama_llm_model}`)."
+    )
+
+
+def llm_scheduler_http_error(error: LlmSchedulerError, request_id: str) -> HTTPException:
+    """429 when the LLM queue is full, 503 when the deadline passed in the queue, 504 when it passed mid-answer."""
+    if isinstance(error, LlmQueueFull):
+        status_code, retry_after = 429, "2"
+    elif isinstance(error, LlmDeadlineExceeded) and error.queued:
+        status_code, retry_after = 503, "5"
+    else:
+        status_code, retry_after = 504, None
+    return HTTPException(
+        status_code=status_code,
+        detail={"message": str(error), "request_id": request_id},
+        headers={"Retry-After": retry_after} if retry_after else None,
+    )
+
+
+async def prepare_ask_prompt(item: ChatQuery, request: Request, runtime_state: RuntimeState) -> AskPrompt:
+    """Build the /ask prompt along with the stored future state JSON and the prompt's token report."""
+    query = (item.query or item.question or "").strip()
+    if not query:
+        raise HTTPException(status_code=400, detail="Query is required.")
+
+    # Not guessed from the question: detect_language_fast matches substrings ("yield" reads as Uzbek "yil").
+    language = requested_language(item.language, "en", request.state.request_id)
+
+    context_snapshot, client_future_summary = split_client_context(item.context_snapshot or item.context or {})
+
+    # Without a handle only the client's own summary is used, never another session's prediction.
+    future_state_json = None
+    if item.future_state_id:
+        # Stored pre-serialized, so the JSON text goes into the response as is.
+        future_state_json = await asyncio.to_thread(runtime_state.future_state_store.get_json, item.future_state_id)
+        if future_state_json is None:
+            raise HTTPException(
+                status_code=404,
+                detail={
+                    "message": "Unknown or expired future_state_id; run /predict again",
+                    "request_id": request.state.request_id,
+                },
+            )
+    digest = None
+    if future_state_json is not None:
+        digest = await asyncio.to_thread(runtime_state.future_state_store.get_context, item.future_state_id)
+        if digest is None:
+            # Stored without a digest (e.g. before an upgrade); summarize once here.
+            digest = summarize_future_state(json.loads(future_state_json))
+    elif client_future_summary is not None:
+        digest = summarize_future_state(client_future_summary)
+
+    future_context, context_report = build_future_context(digest, query, settings.ask_context_token_budget)
+    # Answered in the user's language by the one generation call, rather than translated afterwards.
+    prompt = build_ask_prompt(query, future_context, context_snapshot, language=language)
+    context_tokens = {
+        "budget": settings.ask_context_token_budget,
+        "future_state": context_report["tokens"],
+        "client_context": estimate_tokens(json.dumps(context_snapshot, ensure_ascii=True)),
+        "prompt": estimate_tokens(prompt),
+        "focus_districts": context_report["focus_districts"],
+        "truncated": context_report.get("truncated", False),
+    }
+    logger.info(
+        "ask_context request_id=%s prompt_tokens=%s future_state_tokens=%s budget=%s truncated=%s",
+        request.state.request_id,
+        context_tokens["prompt"],
+        context_tokens["future_state"],
+        context_tokens["budget"],
+        context_tokens["truncated"],
+    )
+    return AskPrompt(
+        query=query,
+        prompt=prompt,
+        context_hash=answer_context_hash(future_context, context_snapshot, language),
+        future_context=future_context,
+        client_context=context_snapshot,
+        future_state_json=future_state_json,
+        context_tokens=context_tokens,
+        language=language,
+    )
+
+
+async def retrieve_excerpts(runtime_state: RuntimeState, ask: AskPrompt, request_id: str) -> None:
+    """Add regulatory excerpts to ``ask.prompt``; skipped when retrieval overruns RAG_TIMEOUT_MS.
+
+    Runs only on an answer cache miss, so cached answers never pay for it.
+    """
+    retriever = runtime_state.retriever
+    if retriever is None:
+        return
     try:
-        query = (item.query or item.question or "").strip()
-        if not query:
-            raise HTTPException(status_code=400, detail="Query is required.")
-
-        context_snapshot = item.context_snapshot or item.context or {}
-
-        future_context = (
-            json.dumps(state.future_state, ensure_ascii=True)
-            if state.future_state
-            else "No future mode prediction has been generated yet."
-        )
-        prompt = (
-            "You are Grid AI Assistant for Tashkent power planning.\n"
-            "Always answer in English.\n"
-            "Use the future mode state and context snapshot as the source of truth when available.\n"
-            "Keep responses practical, concise, and operations-focused.\n"
-            "If the user asks for prediction guidance, give a short summary and concrete action.\n"
-            "Do not invent missing metrics; say when data is unavailable.\n\n"
-            f"Future mode state: {future_context}\n"
-            f"Client context snapshot: {json.dumps(context_snapshot, ensure_ascii=True)}\n"
-            f"User question: {query}\n"
-            "Assistant response:"
+        chunks, timing = await asyncio.wait_for(
+            asyncio.to_thread(retriever.retrieve, ask.query),
+            settings.rag_timeout_ms / 1000,
         )
+    except asyncio.TimeoutError:
+        # The search thread finishes in the background; its query embedding still gets cached.
+        logger.warning("ask_retrieval request_id=%s skipped after %sms budget", request_id, settings.rag_timeout_ms)
+        ask.retrieval = {"timed_out": True, "budget_ms": settings.rag_timeout_ms, "hits": 0}
+        return
+    except Exception as error:
+        logger.warning("ask_retrieval request_id=%s failed: %s", request_id, error)
+        ask.retrieval = {"error": str(error), "hits": 0}
+        return
+
+    ask.retrieval = {"timed_out": False, "budget_ms": settings.rag_timeout_ms, **timing}
+    if not chunks:
+        return
+    excerpts = format_excerpts(chunks, settings.rag_excerpt_chars)
+    ask.prompt = build_ask_prompt(ask.query, ask.future_context, ask.client_context, excerpts, ask.language)
+    ask.sources = [chunk.as_source() for chunk in chunks]
+    ask.context_tokens["retrieval"] = estimate_tokens(excerpts)
+    ask.context_tokens["prompt"] = estimate_tokens(ask.prompt)
+    logger.info(
+        "ask_retrieval request_id=%s hits=%s embed_ms=%s search_ms=%s prompt_tokens=%s",
+        request_id,
+        timing["hits"],
+        timing["embed_ms"],
+        timing["search_ms"],
+        ask.context_tokens["prompt"],
+    )
+
+
+async def lookup_cached_answer(runtime_state: RuntimeState, ask: AskPrompt) -> Optional[CachedAnswer]:
+    cache = runtime_state.answer_cache
+    if cache is None or not cache.enabled:
+        return None
+    # The semantic fallback may call the embedding model, so keep it off the event loop.
+    return await asyncio.to_thread(cache.lookup, ask.query, ask.context_hash)
+
+
+def store_answer(runtime_state: RuntimeState, ask: AskPrompt, answer: str) -> None:
+    if runtime_state.answer_cache is not None:
+        runtime_state.answer_cache.store(ask.query, ask.context_hash, answer, ask.sources)
 
+
+@app.post("/ask")
+async def ask_question(item: ChatQuery, request: Request):
+    runtime_state = require_state(request)
+    try:
+        ask = await prepare_ask_prompt(item, request, runtime_state)
+        cached = await lookup_cached_answer(runtime_state, ask)
         try:
-            answer = str(await asyncio.to_thread(state.llm.invoke, prompt)).strip()
+            if cached is not None:
+                answer = cached.answer
+                ask.sources = list(cached.sources)
+            else:
+                await retrieve_excerpts(runtime_state, ask, request.state.request_id)
+                answer = await runtime_state.llm_scheduler.invoke_async(
+                    runtime_state.llm, ask.prompt, PRIORITY_INTERACTIVE
+                )
+                answer = str(answer).strip()
+                await asyncio.to_thread(store_answer, runtime_state, ask, answer)
+        except LlmSchedulerError as error:
+            logger.warning("ask_question rejected by LLM scheduler: %s", error)
+            raise llm_scheduler_http_error(error, request.state.request_id) from error
         except RequestException as error:
             logger.warning("ask_question failed: Ollama request error: %s", error)
             raise HTTPException(
                 status_code=503,
                 detail={
-                    "message": (
-                        f"Ollama is unreachable at {settings.ollama_base_url}. "
-                        f"Start Ollama and make sure model '{settings.ollama_llm_model}' is available "
-                        "(example: `ollama serve` and `ollama pull "
-                        f"{settings.ollama_llm_model}`)."
-                    ),
+                    "message": ollama_unavailable_message(),
                     "request_id": request.state.request_id,
                     "error": str(error),
                 },
             ) from error
-        return {
-            "answer": answer,
-            "request_id": request.state.request_id,
-            "mode": "future_chat",
-            "language": "en",
-            "future_state": state.future_state,
-        }
+        body = json.dumps(
+            {
+                "answer": answer,
+                "request_id": request.state.request_id,
+                "mode": "future_chat",
+                "language": ask.language,
+                "future_state_id": item.future_state_id,
+                "context_tokens": ask.context_tokens,
+                "cache": cached.match if cached is not None else "miss",
+                "retrieval": ask.retrieval,
+                "sources": ask.sources,
+            }
+        )
+        return Response(
+            content=f'{body[:-1]}, "future_state": {ask.future_state_json or "{}"}}}',
+            media_type="application/json",
+        )
     except HTTPException:
         raise
     except Exception as error:
@@ -190,16 +635,173 @@ async def ask_question(item: ChatQuery, request: Request):
         )
 
 
+@app.post("/ask/stream")
+async def ask_stream_endpoint(item: ChatQuery, request: Request, format: str = "ndjson"):
+    request_id = request.state.request_id
+    stream_format = format.strip().lower()
+    if stream_format not in STREAM_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail={"message": "format must be 'ndjson' or 'sse'", "request_id": request_id},
+        )
+    runtime_state = require_state(request)
+    if runtime_state.llm_stream is None:
+        raise HTTPException(
+            status_code=503,
+            detail={"message": "Streaming LLM client is not configured", "request_id": request_id},
+        )
+    try:
+        ask = await prepare_ask_prompt(item, request, runtime_state)
+        cached = await lookup_cached_answer(runtime_state, ask)
+        if cached is not None:
+            ask.sources = list(cached.sources)
+        else:
+            await retrieve_excerpts(runtime_state, ask, request_id)
+        # Taken before the response starts, so a full queue can still answer 429/503.
+        lease = None if cached is not None else await runtime_state.llm_scheduler.acquire_async(PRIORITY_INTERACTIVE)
+    except HTTPException:
+        raise
+    except LlmSchedulerError as error:
+        logger.warning("ask_stream_endpoint rejected by LLM scheduler: %s", error)
+        raise llm_scheduler_http_error(error, request_id) from error
+    except Exception as error:
+        logger.exception("ask_stream_endpoint failed")
+        raise HTTPException(
+            status_code=500,
+            detail={"message": str(error), "request_id": request_id},
+        )
+
+    async def event_stream():
+        started = time.perf_counter()
+        first_token_ms = None
+        chunks: list[str] = []
+        final: dict = {}
+        yield _encode_stream_event(
+            {
+                "event": "meta",
+                "request_id": request_id,
+                "mode": "future_chat",
+                "language": ask.language,
+                "future_state_id": item.future_state_id,
+                "context_tokens": ask.context_tokens,
+                "cache": cached.match if cached is not None else "miss",
+                "retrieval": ask.retrieval,
+                "sources": ask.sources,
+            },
+            stream_format,
+        )
+        if cached is not None:
+            yield _encode_stream_event({"event": "token", "token": cached.answer}, stream_format)
+            yield _encode_stream_event(
+                {
+                    "event": "done",
+                    "answer": cached.answer,
+                    "request_id": request_id,
+                    "first_token_ms": round((time.perf_counter() - started) * 1000, 2),
+                    "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+                    "prompt_eval_count": None,
+                    "eval_count": None,
+                },
+                stream_format,
+            )
+            return
+        try:
+            # Closing the generator (client gone, task cancelled) closes the Ollama response too.
+            records = runtime_state.llm_stream.stream_generate(ask.prompt, timeout_s=lease.remaining_s())
+            async with aclosing(records):
+                async for record in records:
+                    if lease.remaining_s() <= 0:
+                        raise LlmDeadlineExceeded("LLM generation exceeded its deadline", queued=False)
+                    token = record.get("response", "")
+                    if token:
+                        if first_token_ms is None:
+                            first_token_ms = round((time.perf_counter() - started) * 1000, 2)
+                        chunks.append(token)
+                        yield _encode_stream_event({"event": "token", "token": token}, stream_format)
+                    if record.get("done"):
+                        final = record
+        except (asyncio.CancelledError, GeneratorExit):
+            logger.info(
+                "ask_stream cancelled request_id=%s after %d chunks in %.2fms",
+                request_id,
+                len(chunks),
+                (time.perf_counter() - started) * 1000,
+            )
+            raise
+        except (httpx.HTTPError, OllamaStreamError, LlmDeadlineExceeded) as error:
+            if isinstance(error, httpx.TimeoutException) and lease.remaining_s() <= 0:
+                error = LlmDeadlineExceeded("LLM generation exceeded its deadline", queued=False)
+            logger.warning("ask_stream failed: %s", error)
+            if isinstance(error, httpx.TransportError) and not isinstance(error, httpx.TimeoutException):
+                message = ollama_unavailable_message()
+            else:
+                message = str(error)
+            yield _encode_stream_event(
+                {"event": "error", "message": message, "request_id": request_id, "error": str(error)},
+                stream_format,
+            )
+            return
+        finally:
+            lease.release()
+        answer = "".join(chunks).strip()
+        # Only complete answers are cached; a cancelled stream never gets here.
+        await asyncio.to_thread(store_answer, runtime_state, ask, answer)
+        yield _encode_stream_event(
+            {
+                "event": "done",
+                "answer": answer,
+                "request_id": request_id,
+                "first_token_ms": first_token_ms,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+                "prompt_eval_count": final.get("prompt_eval_count"),
+                "eval_count": final.get("eval_count"),
+            },
+            stream_format,
+        )
+
+    events = event_stream()
+    if lease is not None:
+        # Starlette never starts the generator if the client is gone before the first byte.
+        weakref.finalize(events, lease.release)
+    return StreamingResponse(events, media_type=STREAM_MEDIA_TYPES[stream_format])
+
+
 @app.get("/health")
 async def health_check():
-    return {
+    """Liveness: answers as soon as the server is up, whether or not startup has finished."""
+    health = {
         "status": "online",
+        "ready": state is not None,
+        "startup": startup_report["status"],
         "provider": "ollama-local-predictive",
         "llm_model": settings.ollama_llm_model,
         "ollama_base_url": settings.ollama_base_url,
         "csv_path": settings.csv_path,
         "model_path": settings.model_path,
-        "known_districts": state.known_districts,
-        "data_source_provider": state.data_provider_name,
-        "future_state_loaded": bool(state.future_state),
     }
+    if state is not None:
+        future_state_store = state.future_state_store.stats()
+        health.update(
+            known_districts=state.known_districts,
+            data_source_provider=state.data_provider_name,
+            future_state_loaded=future_state_store["entries"] > 0,
+            future_state_store=future_state_store,
+            data_version=state.data_version,
+            model_version=state.model_version,
+            prediction_cache=state.prediction_cache.stats(),
+            answer_cache=state.answer_cache.stats() if state.answer_cache is not None else None,
+            llm_scheduler=state.llm_scheduler.stats(),
+            retriever=state.retriever.stats() if state.retriever is not None else None,
+            translation_cache=state.translation_cache.stats(),
+            explanation_languages=["en", *sorted(state.explanation_templates)],
+        )
+    return health
+
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness: 200 once data, model and LLM client are loaded, 503 until then or if startup failed."""
+    return JSONResponse(
+        status_code=200 if state is not None else 503,
+        content={"ready": state is not None, **startup_report},
+    )
@@ -0,0 +1,76 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class LruTtlCache:
+    """Thread-safe LRU cache with an optional per-entry time-to-live.
+
+    With ``max_bytes`` set, callers pass each entry's ``size`` to ``put`` and the
+    least recently used entries are also evicted to stay under that budget.
+    """
+
+    def __init__(self, max_entries: int = 64, ttl_s: float = 0.0, max_bytes: int = 0) -> None:
+        self.max_entries = max(0, int(max_entries))
+        self.ttl_s = float(ttl_s)
+        self.max_bytes = max(0, int(max_bytes))
+        self._entries: "OrderedDict[Hashable, tuple[float, Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_s > 0 and time.monotonic() - entry[0] > self.ttl_s:
+                del self._entries[key]
+                self._bytes -= entry[2]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any, size: int = 0) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[2]
+            self._entries[key] = (time.monotonic(), value, size)
+            self._bytes += size
+            # The newest entry is always kept, even if it alone exceeds max_bytes.
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes and self._bytes > self.max_bytes and len(self._entries) > 1
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted[2]
+                self.evictions += 1
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_s": self.ttl_s,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -25,14 +25,57 @@ def load_environment(base_dir: str) -> None:
 class Settings:
     base_dir: str
     csv_path: str
+    parquet_path: str
+    data_cache_dir: str
     model_path: str
     data_source_provider: str
     company_api_base_url: str
     company_api_token: str
     company_api_timeout_s: int
+    company_api_page_size: int
+    company_api_concurrency: int
+    company_api_max_retries: int
     ollama_base_url: str
     ollama_llm_model: str
+    ollama_embed_model: str
     allowed_origins: list[str]
+    prediction_cache_size: int
+    prediction_cache_ttl_s: int
+    station_source_provider: str
+    stations_path: str
+    station_chunk_size: int
+    data_refresh_interval_s: int
+    shared_state_dir: str
+    future_state_store: str
+    future_state_db_path: str
+    future_state_max_sessions: int
+    future_state_max_bytes: int
+    future_state_ttl_s: int
+    ask_context_token_budget: int
+    answer_cache_size: int
+    answer_cache_ttl_s: int
+    answer_cache_similarity: float
+    llm_max_concurrency: int
+    llm_max_queue: int
+    llm_timeout_s: float
+    rag_enabled: bool
+    chroma_dir: str
+    rag_embeddings: str
+    rag_mode: str
+    vector_store: str
+    vector_rerank: int
+    rag_top_k: int
+    rag_timeout_ms: int
+    rag_max_distance: float
+    rag_excerpt_chars: int
+    query_embedding_cache_size: int
+    embedding_cache_path: str
+    embedding_cache_max_entries: int
+    ingest_workers: int
+    embed_batch_size: int
+    embed_concurrency: int
+    translation_cache_size: int
+    translation_languages: list[str]
 
 
 
@@ -41,8 +84,14 @@ def get_settings() -> Settings:
     load_environment(base_dir)
 
     csv_path = _resolve_path(base_dir, os.getenv("GRID_DATA_CSV", "tashkent_grid_historic_data.csv"))
+    parquet_path = _resolve_path(base_dir, os.getenv("GRID_DATA_PARQUET", "tashkent_grid_historic_data.parquet"))
+    data_cache_dir = os.getenv("GRID_DATA_CACHE_DIR", "").strip()
     model_path = _resolve_path(base_dir, os.getenv("GRID_MODEL_PATH", "grid_load_rf.joblib"))
 
+    stations_path = os.getenv("GRID_STATIONS_PATH", "").strip()
+    shared_state_dir = os.getenv("SHARED_STATE_DIR", "").strip()
+    embedding_cache_path = os.getenv("EMBEDDING_CACHE_PATH", ".cache/embeddings.sqlite3").strip()
+
     allowed_origins = [
         origin.strip()
         for origin in os.getenv("ALLOWED_ORIGINS", "http://localhost:5173,http://127.0.0.1:5173").split(",")
@@ -52,12 +101,59 @@ def get_settings() -> Settings:
     return Settings(
         base_dir=base_dir,
         csv_path=csv_path,
+        parquet_path=parquet_path,
+        data_cache_dir=_resolve_path(base_dir, data_cache_dir) if data_cache_dir else "",
         model_path=model_path,
         data_source_provider=os.getenv("DATA_SOURCE_PROVIDER", "csv").strip().lower(),
         company_api_base_url=os.getenv("COMPANY_API_BASE_URL", "").strip(),
         company_api_token=os.getenv("COMPANY_API_TOKEN", "").strip(),
         company_api_timeout_s=int(os.getenv("COMPANY_API_TIMEOUT_S", "15")),
+        company_api_page_size=int(os.getenv("COMPANY_API_PAGE_SIZE", "0")),
+        company_api_concurrency=int(os.getenv("COMPANY_API_CONCURRENCY", "4")),
+        company_api_max_retries=int(os.getenv("COMPANY_API_MAX_RETRIES", "3")),
         ollama_base_url=os.getenv("OLLAMA_BASE_URL", "http://localhost:11434"),
         ollama_llm_model=os.getenv("OLLAMA_LLM_MODEL", "llama3.1:8b"),
+        ollama_embed_model=os.getenv("OLLAMA_EMBED_MODEL", "nomic-embed-text"),
         allowed_origins=allowed_origins,
+        prediction_cache_size=int(os.getenv("PREDICTION_CACHE_SIZE", "32")),
+        prediction_cache_ttl_s=int(os.getenv("PREDICTION_CACHE_TTL_S", "3600")),
+        station_source_provider=os.getenv("STATION_SOURCE_PROVIDER", "synthetic").strip().lower(),
+        stations_path=_resolve_path(base_dir, stations_path) if stations_path else "",
+        station_chunk_size=int(os.getenv("STATION_CHUNK_SIZE", "50000")),
+        data_refresh_interval_s=int(os.getenv("DATA_REFRESH_INTERVAL_S", "0")),
+        shared_state_dir=_resolve_path(base_dir, shared_state_dir) if shared_state_dir else "",
+        future_state_store=os.getenv("FUTURE_STATE_STORE", "memory").strip().lower(),
+        future_state_db_path=_resolve_path(base_dir, os.getenv("FUTURE_STATE_DB_PATH", ".cache/future_state.sqlite3")),
+        future_state_max_sessions=int(os.getenv("FUTURE_STATE_MAX_SESSIONS", "256")),
+        future_state_max_bytes=int(os.getenv("FUTURE_STATE_MAX_BYTES", str(64 << 20))),
+        future_state_ttl_s=int(os.getenv("FUTURE_STATE_TTL_S", "86400")),
+        ask_context_token_budget=int(os.getenv("ASK_CONTEXT_TOKEN_BUDGET", "1500")),
+        answer_cache_size=int(os.getenv("ANSWER_CACHE_SIZE", "256")),
+        answer_cache_ttl_s=int(os.getenv("ANSWER_CACHE_TTL_S", "3600")),
+        answer_cache_similarity=float(os.getenv("ANSWER_CACHE_SIMILARITY", "0")),
+        llm_max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "2")),
+        llm_max_queue=int(os.getenv("LLM_MAX_QUEUE", "16")),
+        llm_timeout_s=float(os.getenv("LLM_TIMEOUT_S", "120")),
+        rag_enabled=os.getenv("RAG_ENABLED", "1").strip().lower() not in ("0", "false", "no", "off"),
+        chroma_dir=_resolve_path(base_dir, os.getenv("CHROMA_DIR", "chroma_db")),
+        rag_embeddings=os.getenv("RAG_EMBEDDINGS", "ollama").strip().lower(),
+        rag_mode=os.getenv("RAG_MODE", "hybrid").strip().lower(),
+        vector_store=os.getenv("VECTOR_STORE", "chroma").strip().lower(),
+        vector_rerank=int(os.getenv("VECTOR_RERANK", "4")),
+        rag_top_k=int(os.getenv("RAG_TOP_K", "4")),
+        rag_timeout_ms=int(os.getenv("RAG_TIMEOUT_MS", "800")),
+        rag_max_distance=float(os.getenv("RAG_MAX_DISTANCE", "0")),
+        rag_excerpt_chars=int(os.getenv("RAG_EXCERPT_CHARS", "800")),
+        query_embedding_cache_size=int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "1024")),
+        embedding_cache_path=_resolve_path(base_dir, embedding_cache_path) if embedding_cache_path else "",
+        embedding_cache_max_entries=int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000")),
+        ingest_workers=int(os.getenv("INGEST_WORKERS", "0")),
+        embed_batch_size=int(os.getenv("EMBED_BATCH_SIZE", "32")),
+        embed_concurrency=int(os.getenv("EMBED_CONCURRENCY", "4")),
+        translation_cache_size=int(os.getenv("TRANSLATION_CACHE_SIZE", "2048")),
+        translation_languages=[
+            language.strip().lower()
+            for language in os.getenv("TRANSLATION_LANGUAGES", "uz,ru").split(",")
+            if language.strip()
+        ],
     )
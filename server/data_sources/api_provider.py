@@ -1,27 +1,64 @@
 import json
-from urllib import request
+from urllib import parse, request
 
 import pandas as pd
 
-from server.data_sources.base import GridDataProvider
-from server.data_sources.normalization import normalize_district_dataframe
+from server.data_sources.base import GridDataProvider, StationDataProvider
+from server.data_sources.http_pool import PooledApiClient, build_api_headers, extract_api_records
+from server.data_sources.normalization import normalize_district_dataframe, normalize_station_dataframe
+from server.station_registry import StationRegistry
 
 
 class CompanyApiGridDataProvider(GridDataProvider):
-    def __init__(self, base_url: str, token: str | None = None, timeout_s: int = 15) -> None:
+    """Loads district history from ``GET /grid/historic``.
+
+    With ``page_size`` > 0 the endpoint is read as ``?page=N&page_size=M`` pages,
+    fetched ``concurrency`` at a time over pooled keep-alive connections.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        token: str | None = None,
+        timeout_s: int = 15,
+        page_size: int = 0,
+        concurrency: int = 4,
+        max_retries: int = 3,
+    ) -> None:
         self.base_url = base_url.rstrip("/") if base_url else ""
         self.token = token
         self.timeout_s = timeout_s
+        self.page_size = page_size
+        self.concurrency = concurrency
+        self.max_retries = max_retries
 
     @property
     def provider_name(self) -> str:
         return "company_api"
 
     def load_district_dataframe(self) -> pd.DataFrame:
+        district_df = self._fetch_district_dataframe({})
+        if district_df.empty:
+            raise RuntimeError("Company API returned no district records")
+        return normalize_district_dataframe(district_df)
+
+    def load_district_dataframe_since(self, after_snapshot_date: str) -> pd.DataFrame:
+        district_df = self._fetch_district_dataframe({"since": after_snapshot_date})
+        if district_df.empty:
+            return district_df
+        district_df = normalize_district_dataframe(district_df)
+        # Older API versions ignore ``since`` and return the full history.
+        return district_df[district_df["snapshot_date"] > after_snapshot_date]
+
+    def _fetch_district_dataframe(self, params: dict[str, str]) -> pd.DataFrame:
         if not self.base_url:
             raise RuntimeError("COMPANY_API_BASE_URL is required when DATA_SOURCE_PROVIDER=company_api")
+        if self.page_size > 0:
+            return self._load_paged_dataframe(params)
 
         endpoint = f"{self.base_url}/grid/historic"
+        if params:
+            endpoint = f"{endpoint}?{parse.urlencode(params)}"
         req = request.Request(endpoint, headers=self._build_headers(), method="GET")
 
         try:
@@ -30,24 +67,80 @@ class CompanyApiGridDataProvider(GridDataProvider):
         except Exception as error:
             raise RuntimeError(f"Failed to fetch historic data from company API: {error}") from error
 
-        records = self._extract_records(payload)
-        if not records:
-            raise RuntimeError("Company API returned no district records")
+        return pd.DataFrame(self._extract_records(payload))
 
-        return normalize_district_dataframe(pd.DataFrame(records))
+    def _load_paged_dataframe(self, params: dict[str, str]) -> pd.DataFrame:
+        client = PooledApiClient(
+            self.base_url,
+            headers=build_api_headers(self.token),
+            timeout_s=self.timeout_s,
+            concurrency=self.concurrency,
+            max_retries=self.max_retries,
+        )
+        try:
+            # Each page becomes a DataFrame chunk right away so the raw JSON can be freed.
+            chunks = [
+                pd.DataFrame(records)
+                for records in client.iter_pages("/grid/historic", self.page_size, params=params)
+            ]
+        except Exception as error:
+            raise RuntimeError(f"Failed to fetch historic data from company API: {error}") from error
+        finally:
+            client.close()
+
+        return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
 
     def _build_headers(self) -> dict[str, str]:
-        headers = {"Accept": "application/json"}
-        if self.token:
-            headers["Authorization"] = f"Bearer {self.token}"
-        return headers
+        return build_api_headers(self.token)
 
     def _extract_records(self, payload: object) -> list[dict]:
-        if isinstance(payload, list):
-            return [item for item in payload if isinstance(item, dict)]
-        if isinstance(payload, dict):
-            data = payload.get("data")
-            if isinstance(data, list):
-                return [item for item in data if isinstance(item, dict)]
-        return []
+        return extract_api_records(payload)
+
+
+class CompanyApiStationDataProvider(StationDataProvider):
+    """Pages through ``GET /grid/stations?page=N&page_size=M`` until a short or empty page."""
+
+    def __init__(
+        self,
+        base_url: str,
+        token: str | None = None,
+        timeout_s: int = 15,
+        page_size: int = 50_000,
+        concurrency: int = 4,
+        max_retries: int = 3,
+    ) -> None:
+        self.base_url = base_url.rstrip("/") if base_url else ""
+        self.token = token
+        self.timeout_s = timeout_s
+        self.page_size = page_size
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+
+    @property
+    def provider_name(self) -> str:
+        return "company_api"
+
+    def load_station_registry(self) -> StationRegistry:
+        if not self.base_url:
+            raise RuntimeError("COMPANY_API_BASE_URL is required when STATION_SOURCE_PROVIDER=company_api")
+
+        client = PooledApiClient(
+            self.base_url,
+            headers=build_api_headers(self.token),
+            timeout_s=self.timeout_s,
+            concurrency=self.concurrency,
+            max_retries=self.max_retries,
+        )
+        try:
+            registry = StationRegistry.from_chunks(
+                normalize_station_dataframe(pd.DataFrame(records))
+                for records in client.iter_pages("/grid/stations", self.page_size)
+            )
+        except Exception as error:
+            raise RuntimeError(f"Failed to fetch stations from company API: {error}") from error
+        finally:
+            client.close()
 
+        if not len(registry):
+            raise RuntimeError("Company API returned no station records")
+        return registry
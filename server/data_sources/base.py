@@ -2,6 +2,8 @@ from abc import ABC, abstractmethod
 
 import pandas as pd
 
+from server.station_registry import StationRegistry
+
 
 class GridDataProvider(ABC):
     @property
@@ -12,3 +14,19 @@ class GridDataProvider(ABC):
     @abstractmethod
     def load_district_dataframe(self) -> pd.DataFrame:
         pass
+
+    def load_district_dataframe_since(self, after_snapshot_date: str) -> pd.DataFrame:
+        """Rows with snapshot_date after ``after_snapshot_date``; providers override to filter at the source."""
+        district_df = self.load_district_dataframe()
+        return district_df[district_df["snapshot_date"] > after_snapshot_date]
+
+
+class StationDataProvider(ABC):
+    @property
+    @abstractmethod
+    def provider_name(self) -> str:
+        pass
+
+    @abstractmethod
+    def load_station_registry(self) -> StationRegistry:
+        pass
@@ -1,14 +1,33 @@
+import glob
+import logging
 import os
 
 import pandas as pd
 
-from server.data_sources.base import GridDataProvider
-from server.data_sources.normalization import normalize_district_dataframe
+from server.data_sources.base import GridDataProvider, StationDataProvider
+from server.data_sources.normalization import (
+    DISTRICT_COLUMN_DTYPES,
+    STATION_COLUMN_DTYPES,
+    normalize_district_dataframe,
+    normalize_station_dataframe,
+)
+from server.data_sources.parquet_provider import read_columnar_frame
+from server.station_registry import StationRegistry
+
+logger = logging.getLogger("grid-backend")
 
 
 class CsvGridDataProvider(GridDataProvider):
-    def __init__(self, csv_path: str) -> None:
+    """Reads district history from CSV.
+
+    With ``cache_dir`` set (and pyarrow installed) the normalized frame is also
+    written as Parquet, keyed on the CSV's mtime and size, and later loads read
+    that file instead of parsing the CSV again.
+    """
+
+    def __init__(self, csv_path: str, cache_dir: str = "") -> None:
         self.csv_path = csv_path
+        self.cache_dir = cache_dir
 
     @property
     def provider_name(self) -> str:
@@ -20,5 +39,68 @@ class CsvGridDataProvider(GridDataProvider):
         if not os.path.exists(self.csv_path):
             raise RuntimeError(f"District stats CSV not found at: {self.csv_path}")
 
-        district_df = pd.read_csv(self.csv_path)
-        return normalize_district_dataframe(district_df)
+        cache_path = self._parquet_cache_path()
+        if cache_path and os.path.exists(cache_path):
+            return normalize_district_dataframe(read_columnar_frame(cache_path))
+
+        # Parse straight into compact dtypes instead of float64/object first.
+        csv_dtypes = {"district": "category"}
+        csv_dtypes.update({column: dtype for column, dtype in DISTRICT_COLUMN_DTYPES.items() if dtype == "float32"})
+        header = pd.read_csv(self.csv_path, nrows=0).columns
+        district_df = pd.read_csv(
+            self.csv_path,
+            dtype={column: dtype for column, dtype in csv_dtypes.items() if column in header},
+        )
+        district_df = normalize_district_dataframe(district_df)
+        if cache_path:
+            self._write_parquet_cache(district_df, cache_path)
+        return district_df
+
+    def _parquet_cache_path(self) -> str | None:
+        if not self.cache_dir:
+            return None
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            logger.warning("GRID_DATA_CACHE_DIR is set but pyarrow is not installed; reading CSV directly")
+            return None
+
+        stat = os.stat(self.csv_path)
+        stem = os.path.splitext(os.path.basename(self.csv_path))[0]
+        return os.path.join(self.cache_dir, f"{stem}-{stat.st_mtime_ns}-{stat.st_size}.parquet")
+
+    def _write_parquet_cache(self, district_df: pd.DataFrame, cache_path: str) -> None:
+        stem = os.path.splitext(os.path.basename(self.csv_path))[0]
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            for stale in glob.glob(os.path.join(self.cache_dir, f"{glob.escape(stem)}-*.parquet")):
+                os.remove(stale)
+            temp_path = f"{cache_path}.tmp"
+            district_df.to_parquet(temp_path, index=False)
+            os.replace(temp_path, cache_path)
+        except OSError as error:
+            logger.warning("Could not write Parquet cache %s: %s", cache_path, error)
+
+
+class CsvStationDataProvider(StationDataProvider):
+    def __init__(self, csv_path: str, chunk_size: int = 50_000) -> None:
+        self.csv_path = csv_path
+        self.chunk_size = chunk_size
+
+    @property
+    def provider_name(self) -> str:
+        return "csv"
+
+    def load_station_registry(self) -> StationRegistry:
+        if not self.csv_path:
+            raise RuntimeError("GRID_STATIONS_PATH is not configured")
+        if not os.path.exists(self.csv_path):
+            raise RuntimeError(f"Station inventory CSV not found at: {self.csv_path}")
+
+        header = pd.read_csv(self.csv_path, nrows=0).columns
+        chunks = pd.read_csv(
+            self.csv_path,
+            chunksize=self.chunk_size,
+            dtype={column: dtype for column, dtype in STATION_COLUMN_DTYPES.items() if column in header},
+        )
+        return StationRegistry.from_chunks(normalize_station_dataframe(chunk) for chunk in chunks)
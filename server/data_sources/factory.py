@@ -1,22 +1,57 @@
 from server.config import Settings
-from server.data_sources.api_provider import CompanyApiGridDataProvider
-from server.data_sources.base import GridDataProvider
-from server.data_sources.csv_provider import CsvGridDataProvider
+from server.data_sources.api_provider import CompanyApiGridDataProvider, CompanyApiStationDataProvider
+from server.data_sources.base import GridDataProvider, StationDataProvider
+from server.data_sources.csv_provider import CsvGridDataProvider, CsvStationDataProvider
+from server.data_sources.parquet_provider import ParquetGridDataProvider, ParquetStationDataProvider
 
 
 
 def build_data_provider(settings: Settings) -> GridDataProvider:
     if settings.data_source_provider == "csv":
-        return CsvGridDataProvider(csv_path=settings.csv_path)
+        return CsvGridDataProvider(csv_path=settings.csv_path, cache_dir=settings.data_cache_dir)
+
+    if settings.data_source_provider == "parquet":
+        return ParquetGridDataProvider(parquet_path=settings.parquet_path)
 
     if settings.data_source_provider == "company_api":
         return CompanyApiGridDataProvider(
             base_url=settings.company_api_base_url,
             token=settings.company_api_token,
             timeout_s=settings.company_api_timeout_s,
+            page_size=settings.company_api_page_size,
+            concurrency=settings.company_api_concurrency,
+            max_retries=settings.company_api_max_retries,
         )
 
     raise RuntimeError(
-        "Unsupported DATA_SOURCE_PROVIDER. Use 'csv' or 'company_api'. "
+        "Unsupported DATA_SOURCE_PROVIDER. Use 'csv', 'parquet' or 'company_api'. "
         f"Received: {settings.data_source_provider}"
     )
+
+
+
+def build_station_provider(settings: Settings) -> StationDataProvider | None:
+    """Return the configured station inventory provider, or None for synthetic stations."""
+    if settings.station_source_provider == "synthetic":
+        return None
+
+    if settings.station_source_provider == "csv":
+        return CsvStationDataProvider(csv_path=settings.stations_path, chunk_size=settings.station_chunk_size)
+
+    if settings.station_source_provider == "parquet":
+        return ParquetStationDataProvider(parquet_path=settings.stations_path, chunk_size=settings.station_chunk_size)
+
+    if settings.station_source_provider == "company_api":
+        return CompanyApiStationDataProvider(
+            base_url=settings.company_api_base_url,
+            token=settings.company_api_token,
+            timeout_s=settings.company_api_timeout_s,
+            page_size=settings.station_chunk_size,
+            concurrency=settings.company_api_concurrency,
+            max_retries=settings.company_api_max_retries,
+        )
+
+    raise RuntimeError(
+        "Unsupported STATION_SOURCE_PROVIDER. Use 'synthetic', 'csv', 'parquet' or 'company_api'. "
+        f"Received: {settings.station_source_provider}"
+    )
@@ -0,0 +1,146 @@
+import gzip
+import http.client
+import json
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+from urllib import parse
+
+TRANSIENT_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class TransientHTTPError(RuntimeError):
+    pass
+
+
+def build_api_headers(token: str | None) -> dict[str, str]:
+    headers = {"Accept": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    return headers
+
+
+def extract_api_records(payload: object) -> list[dict]:
+    if isinstance(payload, list):
+        return [item for item in payload if isinstance(item, dict)]
+    if isinstance(payload, dict):
+        data = payload.get("data")
+        if isinstance(data, list):
+            return [item for item in data if isinstance(item, dict)]
+    return []
+
+
+class PooledApiClient:
+    """Small keep-alive HTTP/1.1 client for paged company API endpoints.
+
+    Up to ``concurrency`` connections are kept open and reused, responses are
+    requested gzip-compressed, and connection errors, timeouts and 429/5xx
+    responses are retried with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        headers: dict[str, str],
+        timeout_s: int = 15,
+        concurrency: int = 4,
+        max_retries: int = 3,
+        backoff_s: float = 0.5,
+    ) -> None:
+        parts = parse.urlsplit(base_url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise RuntimeError(f"Unsupported company API URL: {base_url}")
+        self._connection_class = (
+            http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        )
+        self._host = parts.hostname
+        self._port = parts.port
+        self._base_path = parts.path.rstrip("/")
+        self.headers = {**headers, "Accept-Encoding": "gzip", "Connection": "keep-alive"}
+        self.timeout_s = timeout_s
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max(0, max_retries)
+        self.backoff_s = backoff_s
+        self._idle: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue()
+
+    def get_json(self, path: str, params: dict | None = None) -> object:
+        target = f"{self._base_path}{path}"
+        if params:
+            target = f"{target}?{parse.urlencode(params)}"
+
+        attempt = 0
+        while True:
+            try:
+                return json.loads(self._request(target))
+            except (OSError, http.client.HTTPException, TransientHTTPError):
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(self.backoff_s * (2 ** attempt))
+                attempt += 1
+
+    def iter_pages(self, path: str, page_size: int, params: dict | None = None) -> Iterator[list[dict]]:
+        """Yield the records of ``path?page=N&page_size=M`` in page order.
+
+        Pages are fetched ``concurrency`` at a time. The first empty page, short
+        page, or page carrying ``"next_page": null`` ends the sequence. ``params``
+        are sent with every page request.
+        """
+
+        def fetch(page: int) -> tuple[list[dict], bool]:
+            payload = self.get_json(path, {**(params or {}), "page": page, "page_size": page_size})
+            records = extract_api_records(payload)
+            if isinstance(payload, dict) and "next_page" in payload:
+                is_last = payload["next_page"] is None
+            else:
+                is_last = len(records) < page_size
+            return records, is_last or not records
+
+        first_page = 1
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            while True:
+                window = [executor.submit(fetch, page) for page in range(first_page, first_page + self.concurrency)]
+                for position, future in enumerate(window):
+                    records, is_last = future.result()
+                    if records:
+                        yield records
+                    if is_last:
+                        # Pages prefetched past the last one may fail (404, 5xx); they are not part of the result.
+                        for pending in window[position + 1:]:
+                            pending.cancel()
+                        return
+                first_page += self.concurrency
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _request(self, target: str) -> bytes:
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            connection = self._connection_class(self._host, self._port, timeout=self.timeout_s)
+
+        try:
+            connection.request("GET", target, headers=self.headers)
+            response = connection.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            raise
+
+        if response.will_close:
+            connection.close()
+        else:
+            self._idle.put(connection)
+
+        if response.status in TRANSIENT_STATUS_CODES:
+            raise TransientHTTPError(f"{response.status} {response.reason} for {target}")
+        if response.status >= 400:
+            raise RuntimeError(f"{response.status} {response.reason} for {target}")
+        if (response.getheader("Content-Encoding") or "").lower() == "gzip":
+            body = gzip.decompress(body)
+        return body
@@ -1,5 +1,6 @@
 from typing import Iterable
 
+import numpy as np
 import pandas as pd
 
 REQUIRED_COLUMNS = [
@@ -14,14 +15,111 @@ REQUIRED_COLUMNS = [
     "actual_peak_load_mw",
 ]
 
+# Compact storage types; float32 matches the precision the RandomForest uses internally.
+DISTRICT_COLUMN_DTYPES = {
+    "district_rating": "float32",
+    "population_density": "float32",
+    "avg_temp": "float32",
+    "asset_age": "float32",
+    "commercial_infra_count": "int32",
+    "current_capacity_mw": "float32",
+    "avg_tp_capacity_mw": "float32",
+    "actual_peak_load_mw": "float32",
+}
 
 
-def normalize_district_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+
+def _normalize_district_labels(values: pd.Series) -> pd.Categorical:
+    # Normalize each distinct label once instead of running string ops on every row.
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    labels = pd.Index(uniques).astype(str).str.strip().str.lower()
+    label_codes, categories = pd.factorize(labels)
+    return pd.Categorical.from_codes(label_codes[codes], categories=categories)
+
+
+
+def normalize_district_dataframe(df: pd.DataFrame, copy: bool = False) -> pd.DataFrame:
+    """Validate and normalize a district frame.
+
+    Columns are converted in place unless ``copy`` is set; pass ``copy=True``
+    when the caller still needs the original frame.
+    """
     missing = [column for column in REQUIRED_COLUMNS if column not in df.columns]
     if missing:
         raise RuntimeError(f"Grid data is missing required columns: {', '.join(missing)}")
 
-    normalized = df.copy()
-    normalized["district"] = normalized["district"].astype(str).str.strip().str.lower()
-    normalized["snapshot_date"] = normalized["snapshot_date"].astype(str)
+    normalized = df.copy() if copy else df
+    normalized["district"] = _normalize_district_labels(normalized["district"])
+    if not pd.api.types.is_string_dtype(normalized["snapshot_date"]):
+        normalized["snapshot_date"] = normalized["snapshot_date"].astype(str)
+
+    for column, dtype in DISTRICT_COLUMN_DTYPES.items():
+        if column not in normalized.columns or normalized[column].dtype == dtype:
+            continue
+        if dtype == "int32" and not pd.api.types.is_integer_dtype(normalized[column]):
+            values = normalized[column]
+            if values.isna().any() or (values % 1 != 0).any():
+                dtype = "float32"
+        normalized[column] = normalized[column].astype(dtype)
     return normalized
+
+
+STATION_REQUIRED_COLUMNS = [
+    "id",
+    "district",
+    "latitude",
+    "longitude",
+    "capacity_kva",
+]
+
+STATION_OPTIONAL_DEFAULTS = {
+    "name": None,
+    "load_weight": 50.0,
+    "status": "unknown",
+    "install_year": 0,
+    "demographic_growth": 1.0,
+}
+
+STATION_COLUMN_DTYPES = {
+    "id": str,
+    "name": str,
+    "district": str,
+    "status": str,
+    "latitude": "float64",
+    "longitude": "float64",
+    "capacity_kva": "float64",
+    "load_weight": "float64",
+    "install_year": "float64",
+    "demographic_growth": "float64",
+}
+
+
+
+def normalize_station_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    """Validate a freshly loaded station chunk and fill optional columns in place."""
+    missing = [column for column in STATION_REQUIRED_COLUMNS if column not in df.columns]
+    if missing:
+        raise RuntimeError(f"Station data is missing required columns: {', '.join(missing)}")
+
+    for column in ("latitude", "longitude", "capacity_kva"):
+        df[column] = pd.to_numeric(df[column], errors="coerce")
+    invalid = ~np.isfinite(df[["latitude", "longitude", "capacity_kva"]].to_numpy(dtype="float64")).all(axis=1)
+    if invalid.any():
+        examples = ", ".join(df.loc[invalid, "id"].astype(str).head(5))
+        raise RuntimeError(
+            f"Station data has {int(invalid.sum())} rows with missing or non-numeric "
+            f"latitude, longitude or capacity_kva (ids: {examples})"
+        )
+
+    for column, default in STATION_OPTIONAL_DEFAULTS.items():
+        if column not in df.columns:
+            df[column] = df["id"] if column == "name" else default
+    df["id"] = df["id"].astype(str)
+    df["name"] = df["name"].fillna(df["id"]).astype(str)
+    df["district"] = df["district"].astype(str).str.strip()
+    df["status"] = df["status"].fillna(STATION_OPTIONAL_DEFAULTS["status"]).astype(str)
+    # Blank numeric cells would reach /api/stations as NaN, which JSON cannot encode.
+    for column in ("load_weight", "install_year", "demographic_growth"):
+        values = pd.to_numeric(df[column], errors="coerce")
+        df[column] = values.where(np.isfinite(values), STATION_OPTIONAL_DEFAULTS[column])
+    return df
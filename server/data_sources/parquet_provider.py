@@ -0,0 +1,97 @@
+import os
+
+import pandas as pd
+
+from server.data_sources.base import GridDataProvider, StationDataProvider
+from server.data_sources.normalization import normalize_district_dataframe, normalize_station_dataframe
+from server.station_registry import StationRegistry
+
+FEATHER_EXTENSIONS = (".feather", ".arrow", ".ipc")
+
+
+
+def _import_pyarrow(setting: str):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as error:
+        raise RuntimeError(f"pyarrow is required for {setting} (pip install pyarrow)") from error
+
+
+
+def read_columnar_frame(path: str, filters: list[tuple] | None = None) -> pd.DataFrame:
+    """Read a Parquet or Feather/Arrow IPC file through a memory map.
+
+    ``filters`` uses the pyarrow.parquet ``[(column, op, value)]`` form.
+    """
+    if path.lower().endswith(FEATHER_EXTENSIONS):
+        import pyarrow.compute as pc
+        import pyarrow.feather as feather
+
+        table = feather.read_table(path, memory_map=True)
+        for column, op, value in filters or []:
+            table = table.filter(_ARROW_COMPARISONS[op](pc, table[column], value))
+    else:
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(path, memory_map=True, filters=filters or None)
+    return table.to_pandas()
+
+
+_ARROW_COMPARISONS = {
+    ">": lambda pc, column, value: pc.greater(column, value),
+    ">=": lambda pc, column, value: pc.greater_equal(column, value),
+    "==": lambda pc, column, value: pc.equal(column, value),
+}
+
+
+
+class ParquetGridDataProvider(GridDataProvider):
+    def __init__(self, parquet_path: str) -> None:
+        self.parquet_path = parquet_path
+
+    @property
+    def provider_name(self) -> str:
+        return "parquet"
+
+    def load_district_dataframe(self) -> pd.DataFrame:
+        self._check_path()
+        return normalize_district_dataframe(read_columnar_frame(self.parquet_path))
+
+    def load_district_dataframe_since(self, after_snapshot_date: str) -> pd.DataFrame:
+        self._check_path()
+        # Row-group statistics let pyarrow skip data that is entirely older than the cutoff.
+        return normalize_district_dataframe(
+            read_columnar_frame(self.parquet_path, filters=[("snapshot_date", ">", after_snapshot_date)])
+        )
+
+    def _check_path(self) -> None:
+        if not self.parquet_path:
+            raise RuntimeError("GRID_DATA_PARQUET is not configured")
+        if not os.path.exists(self.parquet_path):
+            raise RuntimeError(f"District stats Parquet/Feather file not found at: {self.parquet_path}")
+        _import_pyarrow("DATA_SOURCE_PROVIDER=parquet")
+
+
+
+class ParquetStationDataProvider(StationDataProvider):
+    def __init__(self, parquet_path: str, chunk_size: int = 50_000) -> None:
+        self.parquet_path = parquet_path
+        self.chunk_size = chunk_size
+
+    @property
+    def provider_name(self) -> str:
+        return "parquet"
+
+    def load_station_registry(self) -> StationRegistry:
+        if not self.parquet_path:
+            raise RuntimeError("GRID_STATIONS_PATH is not configured")
+        if not os.path.exists(self.parquet_path):
+            raise RuntimeError(f"Station inventory Parquet file not found at: {self.parquet_path}")
+        _import_pyarrow("STATION_SOURCE_PROVIDER=parquet")
+
+        import pyarrow.parquet as pq
+
+        # memory_map lets the OS page the file in; batches are decoded one at a time.
+        parquet_file = pq.ParquetFile(self.parquet_path, memory_map=True)
+        batches = parquet_file.iter_batches(batch_size=self.chunk_size)
+        return StationRegistry.from_chunks(normalize_station_dataframe(batch.to_pandas()) for batch in batches)
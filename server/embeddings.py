@@ -0,0 +1,295 @@
+import hashlib
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import TYPE_CHECKING, Any, Dict, Optional, Sequence, Union
+
+import numpy as np
+
+from server.cache import LruTtlCache
+from server.config import Settings
+
+if TYPE_CHECKING:
+    from langchain_community.embeddings import OllamaEmbeddings
+
+HASHING_DIMENSIONS = 384
+
+
+class HashingEmbeddings:
+    """Deterministic, offline stand-in for an embedding model.
+
+    Words and word bigrams are hashed into a fixed number of signed buckets and
+    the vector is L2-normalized, so texts sharing vocabulary land close
+    together. Good enough for tests and for running without Ollama; not a
+    substitute for a trained model's recall.
+    """
+
+    def __init__(self, dimensions: int = HASHING_DIMENSIONS) -> None:
+        self.dimensions = int(dimensions)
+
+    def embed_query(self, text: str) -> list[float]:
+        vector = [0.0] * self.dimensions
+        words = re.findall(r"\w+", unicodedata.normalize("NFKC", text).casefold())
+        for feature in words + [f"{left} {right}" for left, right in zip(words, words[1:])]:
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dimensions
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(value * value for value in vector))
+        return [value / norm for value in vector] if norm else vector
+
+    def embed_documents(self, texts: Sequence[str]) -> list[list[float]]:
+        return [self.embed_query(text) for text in texts]
+
+
+Embeddings = Union[HashingEmbeddings, "OllamaEmbeddings"]
+
+
+class EmbeddingStore:
+    """Embeddings persisted in SQLite, keyed by model name and the SHA-256 of the text.
+
+    Shared by ``server/ingest.py`` and every server worker on the host, so a
+    text is embedded once per model. Vectors are stored as float32. The least
+    recently used rows are deleted once ``max_entries`` is exceeded.
+
+    Entry and byte totals are counted once when the file is opened and then
+    kept up to date on insert and eviction, so neither ``put_many`` nor
+    ``stats`` scans the table. Rows written by other processes are only picked
+    up at the next open.
+    """
+
+    def __init__(self, db_path: str, max_entries: int = 200_000) -> None:
+        self.db_path = db_path
+        self.max_entries = max(1, int(max_entries))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = 0
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._connection_pid: Optional[int] = None
+
+    def get_many(self, model: str, texts: Sequence[str]) -> list[Optional[list[float]]]:
+        keys = [_text_key(text) for text in texts]
+        found: Dict[bytes, bytes] = {}
+        with self._lock:
+            connection = self._connect()
+            # Batched to stay under SQLite's bound-parameter limit.
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                rows = connection.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({','.join('?' * len(batch))})",
+                    (model, *batch),
+                ).fetchall()
+                found.update(rows)
+            if found:
+                now = time.time()
+                connection.executemany(
+                    "UPDATE embeddings SET accessed_at = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model, key) for key in found],
+                )
+                connection.commit()
+            self.hits += sum(1 for key in keys if key in found)
+            self.misses += sum(1 for key in keys if key not in found)
+        return [np.frombuffer(found[key], dtype=np.float32).tolist() if key in found else None for key in keys]
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        now = time.time()
+        rows = [
+            (model, _text_key(text), np.asarray(vector, dtype=np.float32).tobytes(), now)
+            for text, vector in zip(texts, vectors)
+        ]
+        with self._lock:
+            connection = self._connect()
+            for model_name, key, vector, accessed_at in rows:
+                # Insert and update apart, so the counters know which rows are new.
+                inserted = connection.execute(
+                    "INSERT OR IGNORE INTO embeddings (model, text_hash, vector, accessed_at) VALUES (?, ?, ?, ?)",
+                    (model_name, key, vector, accessed_at),
+                ).rowcount
+                if inserted:
+                    self._entries += 1
+                    self._bytes += len(vector)
+                else:
+                    connection.execute(
+                        "UPDATE embeddings SET vector = ?, accessed_at = ? WHERE model = ? AND text_hash = ?",
+                        (vector, accessed_at, model_name, key),
+                    )
+            if self._entries > self.max_entries:
+                excess = self._entries - self.max_entries
+                # Same transaction as the DELETE below, so both see the same oldest rows.
+                evicted, evicted_bytes = connection.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(LENGTH(vector)), 0) FROM ("
+                    " SELECT vector FROM embeddings ORDER BY accessed_at LIMIT ?"
+                    ")",
+                    (excess,),
+                ).fetchone()
+                connection.execute(
+                    "DELETE FROM embeddings WHERE (model, text_hash) IN ("
+                    " SELECT model, text_hash FROM embeddings ORDER BY accessed_at LIMIT ?"
+                    ")",
+                    (excess,),
+                )
+                self.evictions += evicted
+                self._entries -= evicted
+                self._bytes -= evicted_bytes
+            connection.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._connect()
+            entries, total_bytes = self._entries, self._bytes
+        return {
+            "path": self.db_path,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "bytes": total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections must not cross a fork, so each worker process opens its own.
+        if self._connection is None or self._connection_pid != os.getpid():
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "model TEXT NOT NULL, text_hash BLOB NOT NULL, vector BLOB NOT NULL, accessed_at REAL NOT NULL, "
+                "PRIMARY KEY (model, text_hash)) WITHOUT ROWID"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS embeddings_accessed_at ON embeddings (accessed_at)")
+            connection.commit()
+            self._entries, self._bytes = connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+            ).fetchone()
+            self._connection = connection
+            self._connection_pid = os.getpid()
+        return self._connection
+
+
+def _text_key(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+class CachedEmbeddings:
+    """Embedding model behind an in-process LRU (queries only) and an optional persistent store."""
+
+    def __init__(
+        self,
+        embeddings: Any,
+        model_name: str,
+        max_entries: int = 1024,
+        store: Optional[EmbeddingStore] = None,
+    ) -> None:
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.store = store
+        self._cache = LruTtlCache(max_entries=max_entries)
+        self._counter_lock = threading.Lock()
+        self.model_calls = 0
+        self.texts_embedded = 0
+        self.embed_ms_total = 0.0
+
+    def embed_query(self, text: str) -> list[float]:
+        vector, _ = self.embed_query_timed(text)
+        return vector
+
+    def embed_query_timed(self, text: str) -> tuple[list[float], bool]:
+        """Return the embedding and whether it came from a cache."""
+        key = (self.model_name, text)
+        vector = self._cache.get(key)
+        if vector is not None:
+            return vector, True
+        if self.store is not None:
+            vector = self.store.get_many(self.model_name, [text])[0]
+            if vector is not None:
+                self._cache.put(key, vector)
+                return vector, True
+        vector = self._timed_call(lambda: [list(self.embeddings.embed_query(text))], 1)[0]
+        self._cache.put(key, vector)
+        if self.store is not None:
+            self.store.put_many(self.model_name, [text], [vector])
+        return vector, False
+
+    def embed_documents(self, texts: Sequence[str]) -> list[list[float]]:
+        """Embed ``texts``, sending only those missing from the store to the model (in one call)."""
+        texts = list(texts)
+        if self.store is None:
+            return self._timed_call(lambda: self.embeddings.embed_documents(texts), len(texts))
+        vectors = self.store.get_many(self.model_name, texts)
+        missing = [position for position, vector in enumerate(vectors) if vector is None]
+        if missing:
+            missing_texts = [texts[position] for position in missing]
+            computed = self._timed_call(lambda: self.embeddings.embed_documents(missing_texts), len(missing))
+            self.store.put_many(self.model_name, missing_texts, computed)
+            for position, vector in zip(missing, computed):
+                vectors[position] = list(vector)
+        return vectors
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model": self.model_name,
+            **self._cache.stats(),
+            "model_calls": self.model_calls,
+            "texts_embedded": self.texts_embedded,
+            "embed_ms_total": round(self.embed_ms_total, 2),
+            "store": self.store.stats() if self.store is not None else None,
+        }
+
+    def _timed_call(self, call: Any, count: int) -> list[list[float]]:
+        started = time.perf_counter()
+        vectors = call()
+        with self._counter_lock:
+            self.model_calls += 1
+            self.texts_embedded += count
+            self.embed_ms_total += (time.perf_counter() - started) * 1000
+        return vectors
+
+
+def embedding_model_name(settings: Settings) -> str:
+    if settings.rag_embeddings == "hashing":
+        return f"hashing-{HASHING_DIMENSIONS}"
+    return settings.ollama_embed_model
+
+
+def build_embeddings(settings: Settings) -> Embeddings:
+    backend = settings.rag_embeddings
+    if backend == "hashing":
+        return HashingEmbeddings()
+    if backend == "ollama":
+        # Imported here: langchain accounts for over half a second of import time.
+        from langchain_community.embeddings import OllamaEmbeddings
+
+        return OllamaEmbeddings(model=settings.ollama_embed_model, base_url=settings.ollama_base_url)
+    raise RuntimeError(
+        "Unsupported RAG_EMBEDDINGS. Use 'ollama' or 'hashing'. "
+        f"Received: {backend}"
+    )
+
+
+def build_embedding_store(settings: Settings) -> Optional[EmbeddingStore]:
+    if not settings.embedding_cache_path:
+        return None
+    return EmbeddingStore(settings.embedding_cache_path, max_entries=settings.embedding_cache_max_entries)
+
+
+def build_cached_embeddings(settings: Settings, max_entries: int = 0) -> CachedEmbeddings:
+    return CachedEmbeddings(
+        build_embeddings(settings),
+        embedding_model_name(settings),
+        max_entries=max_entries,
+        store=build_embedding_store(settings),
+    )
+
+
+def build_query_embeddings(settings: Settings) -> CachedEmbeddings:
+    return build_cached_embeddings(settings, max_entries=settings.query_embedding_cache_size)
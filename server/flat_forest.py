@@ -0,0 +1,164 @@
+"""Flat, memory-mappable export of a fitted scikit-learn RandomForestRegressor.
+
+All trees are concatenated into one set of node arrays stored as ``.npy``
+files next to a ``manifest.json``. Loading maps the files read-only, so every
+worker process on a host shares one page-cached copy of the model.
+
+Usage::
+
+    python -m server.flat_forest model/grid_load_rf.joblib model/grid_load_rf_flat
+"""
+
+import hashlib
+import json
+import os
+import sys
+from typing import Any, Dict
+
+import numpy as np
+
+FORMAT_VERSION = 1
+MANIFEST_FILENAME = "manifest.json"
+NODE_ARRAYS = ("feature", "threshold", "children", "value", "roots")
+# Rows per traversal block; keeps the (rows x trees) node arrays cache-sized.
+PREDICT_BLOCK_ROWS = 256
+
+
+def export_flat_forest(model: Any, directory: str) -> Dict[str, Any]:
+    """Write ``model`` (a fitted single-output RandomForestRegressor) to ``directory``."""
+    if getattr(model, "n_outputs_", 1) != 1:
+        raise RuntimeError("Only single-output forests can be exported")
+
+    features, thresholds, children, values, roots = [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        node_ids = np.arange(tree.node_count, dtype=np.int64) + offset
+        is_leaf = tree.children_left == -1
+        # Leaves point at themselves, so a fixed number of steps lands every row on a leaf.
+        features.append(np.where(is_leaf, 0, tree.feature))
+        thresholds.append(tree.threshold)
+        # Entry 2 * node holds the "X > threshold" child, 2 * node + 1 the "X <= threshold" one.
+        children.append(
+            np.column_stack(
+                [
+                    np.where(is_leaf, node_ids, tree.children_right + offset),
+                    np.where(is_leaf, node_ids, tree.children_left + offset),
+                ]
+            ).ravel()
+        )
+        values.append(tree.value[:, 0, 0])
+        roots.append(offset)
+        offset += tree.node_count
+        max_depth = max(max_depth, int(tree.max_depth))
+
+    if 2 * offset > np.iinfo(np.int32).max:
+        raise RuntimeError("Forest has too many nodes for the flat format")
+
+    arrays = {
+        "feature": np.concatenate(features).astype(np.int32),
+        "threshold": np.concatenate(thresholds).astype(np.float64),
+        "children": np.concatenate(children).astype(np.int32),
+        "value": np.concatenate(values).astype(np.float64),
+        "roots": np.asarray(roots, dtype=np.int32),
+    }
+
+    os.makedirs(directory, exist_ok=True)
+    digest = hashlib.sha256()
+    for name in NODE_ARRAYS:
+        np.save(os.path.join(directory, f"{name}.npy"), arrays[name])
+        digest.update(arrays[name].tobytes())
+
+    feature_names = getattr(model, "feature_names_in_", None)
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "n_estimators": len(model.estimators_),
+        "n_features": int(model.n_features_in_),
+        "feature_names": [str(name) for name in feature_names] if feature_names is not None else None,
+        "node_count": int(offset),
+        "max_depth": max_depth,
+        "checksum": digest.hexdigest()[:16],
+    }
+    with open(os.path.join(directory, MANIFEST_FILENAME), "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, indent=2)
+    return manifest
+
+
+
+def is_flat_forest(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, MANIFEST_FILENAME))
+
+
+
+class FlatForestRegressor:
+    """Batch inference over an exported forest, matching ``RandomForestRegressor.predict`` bit for bit.
+
+    Like scikit-learn, inputs are cast to float32 before the split comparisons
+    and tree outputs are summed in estimator order before dividing.
+    """
+
+    def __init__(self, manifest: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> None:
+        self.manifest = manifest
+        self.n_features_in_ = int(manifest["n_features"])
+        self.feature_names = manifest.get("feature_names")
+        self.checksum = str(manifest["checksum"])
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.children = arrays["children"]
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+        self.max_depth = int(manifest["max_depth"])
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "FlatForestRegressor":
+        with open(os.path.join(directory, MANIFEST_FILENAME), encoding="utf-8") as handle:
+            manifest = json.load(handle)
+        if manifest.get("format_version") != FORMAT_VERSION:
+            raise RuntimeError(f"Unsupported flat forest format in {directory}: {manifest.get('format_version')}")
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r" if mmap else None)
+            for name in NODE_ARRAYS
+        }
+        return cls(manifest, arrays)
+
+    def predict(self, X: Any) -> np.ndarray:
+        if hasattr(X, "columns") and self.feature_names:
+            X = X[self.feature_names]
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected input with {self.n_features_in_} features, got shape {X.shape}")
+
+        predictions = np.empty(len(X), dtype=np.float64)
+        for start in range(0, len(X), PREDICT_BLOCK_ROWS):
+            predictions[start : start + PREDICT_BLOCK_ROWS] = self._predict_block(X[start : start + PREDICT_BLOCK_ROWS])
+        return predictions
+
+    def _predict_block(self, X: np.ndarray) -> np.ndarray:
+        # One step per level for all (row, tree) pairs at once; X is read through flat offsets.
+        flat_x = np.ascontiguousarray(X).ravel()
+        row_offsets = (np.arange(len(X), dtype=np.int64) * X.shape[1])[:, None]
+        nodes = np.repeat(np.asarray(self.roots)[None, :], len(X), axis=0)
+        for _ in range(self.max_depth):
+            go_left = flat_x[row_offsets + self.feature[nodes]] <= self.threshold[nodes]
+            nodes = self.children[2 * nodes + go_left]
+
+        leaf_values = self.value[nodes]
+        total = np.zeros(len(X), dtype=np.float64)
+        for tree in range(leaf_values.shape[1]):
+            total += leaf_values[:, tree]
+        return total / leaf_values.shape[1]
+
+
+
+def main(argv: list[str]) -> None:
+    if len(argv) != 2:
+        raise SystemExit("usage: python -m server.flat_forest MODEL.joblib OUTPUT_DIR")
+    import joblib
+
+    manifest = export_flat_forest(joblib.load(argv[0]), argv[1])
+    print(f"Exported {manifest['n_estimators']} trees ({manifest['node_count']} nodes) to {argv[1]}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,253 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+from server.cache import LruTtlCache
+from server.config import Settings
+
+FUTURE_STATE_COMPRESSION_LEVEL = 1
+
+
+def new_future_state_id() -> str:
+    return uuid.uuid4().hex
+
+
+def encode_future_state(future_state: Dict[str, Any]) -> bytes:
+    """Serialize once, in the same form the /ask prompt embeds, and compress."""
+    return zlib.compress(json.dumps(future_state, ensure_ascii=True).encode("ascii"), FUTURE_STATE_COMPRESSION_LEVEL)
+
+
+def decode_future_state(blob: bytes) -> str:
+    return zlib.decompress(blob).decode("ascii")
+
+
+
+class FutureStateStore(ABC):
+    """Future-mode predictions that ``/ask`` answers from, keyed by the handle ``/predict`` returns.
+
+    Entries are kept as compressed JSON, so reads hand back the serialized text
+    instead of re-encoding a dict on every question. Each entry may carry a
+    small ``context`` digest next to the full state for building prompts.
+    """
+
+    @property
+    @abstractmethod
+    def backend_name(self) -> str:
+        pass
+
+    @abstractmethod
+    def put(
+        self,
+        future_state_id: str,
+        future_state: Dict[str, Any],
+        context: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        pass
+
+    @abstractmethod
+    def get_json(self, future_state_id: Optional[str]) -> Optional[str]:
+        """Return the stored JSON text, or None if unknown, evicted or no id is given.
+
+        There is deliberately no "latest entry" fallback: it would answer one
+        planner from another planner's prediction.
+        """
+
+    @abstractmethod
+    def get_context(self, future_state_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Return the context digest stored with the entry, or None."""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        pass
+
+    def get(self, future_state_id: Optional[str]) -> Dict[str, Any]:
+        future_state_json = self.get_json(future_state_id)
+        return json.loads(future_state_json) if future_state_json else {}
+
+    def has(self, future_state_id: Optional[str]) -> bool:
+        return self.get_json(future_state_id) is not None
+
+
+
+class InProcessFutureStateStore(FutureStateStore):
+    """Per-process LRU store; only correct with a single worker."""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 << 20, ttl_s: float = 0.0) -> None:
+        self._entries = LruTtlCache(max_entries=max_entries, ttl_s=ttl_s, max_bytes=max_bytes)
+
+    @property
+    def backend_name(self) -> str:
+        return "memory"
+
+    def put(
+        self,
+        future_state_id: str,
+        future_state: Dict[str, Any],
+        context: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        blob = encode_future_state(future_state)
+        context_blob = encode_future_state(context) if context is not None else None
+        size = len(blob) + len(context_blob or b"")
+        self._entries.put(future_state_id, (blob, context_blob), size=size)
+
+    def get_json(self, future_state_id: Optional[str]) -> Optional[str]:
+        entry = self._entry(future_state_id)
+        return decode_future_state(entry[0]) if entry is not None else None
+
+    def get_context(self, future_state_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        entry = self._entry(future_state_id)
+        if entry is None or entry[1] is None:
+            return None
+        return json.loads(decode_future_state(entry[1]))
+
+    def _entry(self, future_state_id: Optional[str]) -> Optional[tuple[bytes, Optional[bytes]]]:
+        return self._entries.get(future_state_id) if future_state_id else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.backend_name, **self._entries.stats()}
+
+
+
+class SqliteFutureStateStore(FutureStateStore):
+    """Store backed by a local SQLite file, shared by every worker process on the host.
+
+    Least recently read entries are deleted once ``max_entries`` or ``max_bytes``
+    is exceeded.
+    """
+
+    def __init__(self, db_path: str, max_entries: int = 256, max_bytes: int = 64 << 20, ttl_s: float = 0.0) -> None:
+        self.db_path = db_path
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(0, int(max_bytes))
+        self.ttl_s = float(ttl_s)
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._connection_pid: Optional[int] = None
+
+    @property
+    def backend_name(self) -> str:
+        return "sqlite"
+
+    def put(
+        self,
+        future_state_id: str,
+        future_state: Dict[str, Any],
+        context: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        blob = encode_future_state(future_state)
+        context_blob = encode_future_state(context) if context is not None else None
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT INTO future_states (key, payload, context, size, updated_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET payload = excluded.payload, context = excluded.context, "
+                "size = excluded.size, updated_at = excluded.updated_at, accessed_at = excluded.accessed_at",
+                (future_state_id, blob, context_blob, len(blob) + len(context_blob or b""), now, now),
+            )
+            self.evictions += self._evict(connection, future_state_id, now)
+            connection.commit()
+
+    def get_json(self, future_state_id: Optional[str]) -> Optional[str]:
+        blob = self._read("payload", future_state_id)
+        return decode_future_state(blob) if blob is not None else None
+
+    def get_context(self, future_state_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        blob = self._read("context", future_state_id)
+        return json.loads(decode_future_state(blob)) if blob is not None else None
+
+    def _read(self, column: str, future_state_id: Optional[str]) -> Optional[bytes]:
+        if not future_state_id:
+            return None
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                f"SELECT {column}, updated_at, key FROM future_states WHERE key = ?", (future_state_id,)
+            ).fetchone()
+            if row is None or (self.ttl_s > 0 and time.time() - row[1] > self.ttl_s):
+                return None
+            connection.execute("UPDATE future_states SET accessed_at = ? WHERE key = ?", (time.time(), row[2]))
+            connection.commit()
+        return row[0]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, total_bytes = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM future_states"
+            ).fetchone()
+        return {
+            "backend": self.backend_name,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "bytes": total_bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_s": self.ttl_s,
+            "evictions": self.evictions,
+        }
+
+    def _evict(self, connection: sqlite3.Connection, keep_id: str, now: float) -> int:
+        evicted = 0
+        if self.ttl_s > 0:
+            evicted += connection.execute(
+                "DELETE FROM future_states WHERE updated_at < ? AND key != ?", (now - self.ttl_s, keep_id)
+            ).rowcount
+        # Walk entries from most to least recently read and drop everything past either budget.
+        evicted += connection.execute(
+            "DELETE FROM future_states WHERE key IN ("
+            " SELECT key FROM ("
+            "  SELECT key,"
+            "   ROW_NUMBER() OVER (ORDER BY key = ? DESC, accessed_at DESC) AS position,"
+            "   SUM(size) OVER (ORDER BY key = ? DESC, accessed_at DESC ROWS UNBOUNDED PRECEDING) AS running_bytes"
+            "  FROM future_states"
+            " ) WHERE position > 1 AND (position > ? OR (? > 0 AND running_bytes > ?))"
+            ")",
+            (keep_id, keep_id, self.max_entries, self.max_bytes, self.max_bytes),
+        ).rowcount
+        return evicted
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections must not cross a fork, so each worker process opens its own.
+        if self._connection is None or self._connection_pid != os.getpid():
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS future_states ("
+                "key TEXT PRIMARY KEY, payload BLOB NOT NULL, context BLOB, size INTEGER NOT NULL, "
+                "updated_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(future_states)")}
+            if "context" not in columns:
+                connection.execute("ALTER TABLE future_states ADD COLUMN context BLOB")
+            connection.commit()
+            self._connection = connection
+            self._connection_pid = os.getpid()
+        return self._connection
+
+
+
+def build_future_state_store(settings: Settings) -> FutureStateStore:
+    backend = settings.future_state_store
+    limits = {
+        "max_entries": settings.future_state_max_sessions,
+        "max_bytes": settings.future_state_max_bytes,
+        "ttl_s": settings.future_state_ttl_s,
+    }
+    if backend == "memory":
+        return InProcessFutureStateStore(**limits)
+    if backend == "sqlite":
+        return SqliteFutureStateStore(settings.future_state_db_path, **limits)
+    raise RuntimeError(
+        "Unsupported FUTURE_STATE_STORE. Use 'memory' or 'sqlite'. "
+        f"Received: {backend}"
+    )
@@ -0,0 +1,40 @@
+"""gunicorn settings for multi-worker deployments.
+
+``WEB_CONCURRENCY`` sets the worker count. With more than one worker the master
+builds the shared state snapshot before forking (see ``server/shared_state.py``)
+and ``/ask`` context moves to the SQLite future-state store, unless
+``SHARED_STATE_DIR`` / ``FUTURE_STATE_STORE`` are already set.
+"""
+
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = 120
+graceful_timeout = 0
+
+if workers > 1:
+    os.environ.setdefault("SHARED_STATE_DIR", ".cache/shared_state")
+    os.environ.setdefault("FUTURE_STATE_STORE", "sqlite")
+
+
+def on_starting(server):
+    from server.config import get_settings
+    from server.shared_state import build_shared_snapshot
+
+    settings = get_settings()
+    if not settings.shared_state_dir:
+        return
+    manifest = build_shared_snapshot(settings, settings.shared_state_dir)
+    server.log.info(
+        "Shared state snapshot written to %s in %.0fms (data %s, model %s)",
+        settings.shared_state_dir,
+        manifest["build_ms"],
+        manifest["data_version"],
+        manifest["model_version"],
+    )
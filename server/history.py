@@ -0,0 +1,67 @@
+from dataclasses import dataclass
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class DistrictHistory:
+    """Snapshot history of one district, sorted by snapshot_date."""
+
+    district: str
+    snapshot_dates: np.ndarray
+    columns: Dict[str, np.ndarray]
+    latest: Dict[str, Any]
+
+    def __len__(self) -> int:
+        return len(self.snapshot_dates)
+
+    def column(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+
+
+FLOAT32_SIGNIFICANT_DIGITS = 7
+
+
+def _as_float64(values: np.ndarray) -> np.ndarray:
+    widened = values.astype(np.float64)
+    if values.dtype != np.float32:
+        return widened
+    # float32 storage turns 2.4 into 2.4000000953674316; rounding back to the
+    # precision float32 can hold restores the decimal value from the source data.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        magnitude = np.floor(np.log10(np.abs(widened)))
+    exponent = np.where(np.isfinite(magnitude), FLOAT32_SIGNIFICANT_DIGITS - 1 - magnitude, 0)
+    scale = 10.0 ** np.maximum(exponent, 0)
+    return np.where(exponent > 0, np.round(widened * scale) / scale, widened)
+
+
+
+def build_district_history_index(district_df: pd.DataFrame) -> Dict[str, DistrictHistory]:
+    """Split the district frame into pre-sorted, contiguous per-district column arrays."""
+    ordered = district_df.sort_values(["district", "snapshot_date"], kind="mergesort")
+    numeric_columns = [
+        column
+        for column in ordered.columns
+        if column not in ("district", "snapshot_date") and pd.api.types.is_numeric_dtype(ordered[column])
+    ]
+
+    index: Dict[str, DistrictHistory] = {}
+    for district, rows in ordered.groupby("district", sort=True, observed=True):
+        snapshot_dates = rows["snapshot_date"].to_numpy(dtype=object)
+        columns = {
+            column: np.ascontiguousarray(_as_float64(rows[column].to_numpy()))
+            for column in numeric_columns
+        }
+        district = str(district)
+        latest: Dict[str, Any] = {"district": district, "snapshot_date": snapshot_dates[-1]}
+        latest.update({column: float(values[-1]) for column, values in columns.items()})
+        index[district] = DistrictHistory(
+            district=district,
+            snapshot_dates=snapshot_dates,
+            columns=columns,
+            latest=latest,
+        )
+    return index
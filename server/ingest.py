@@ -1,56 +1,238 @@
+import hashlib
+import json
+import multiprocessing
 import os
 import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Iterator, Optional
+
+from server.config import Settings, get_settings
+from server.embeddings import build_cached_embeddings, embedding_model_name
+from server.lexical_index import LEXICAL_INDEX_NAME, build_lexical_index
+from server.quantized_index import QUANTIZED_INDEX_NAME, build_quantized_index
+from server.retrieval import CHROMA_COLLECTION
+
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+# Kept inside CHROMA_DIR so the index and its manifest are always deleted together.
+MANIFEST_NAME = "ingest_manifest.json"
+MANIFEST_VERSION = 1
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def parse_pdf(path: str) -> tuple[int, list[tuple[int, str]]]:
+    """Split one PDF into ``(page, text)`` chunks; runs in a worker process."""
+    from langchain_community.document_loaders import PyPDFLoader
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    pages = PyPDFLoader(path).load()
+    splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    chunks = [(int(page.metadata.get("page", 0)), text) for page in pages for text in splitter.split_text(page.page_content)]
+    return len(pages), chunks
+
+
+def chunk_ids(name: str, chunks: list[tuple[int, str]]) -> list[str]:
+    """Content-derived ids, so an unchanged chunk keeps its id when other parts of the file change."""
+    ids = []
+    seen: Dict[str, int] = {}
+    for page, text in chunks:
+        chunk_id = hashlib.sha256(f"{name}\0{page}\0{text}".encode("utf-8")).hexdigest()[:32]
+        # Identical text repeated on one page (headers, blank forms) still needs distinct ids.
+        repeat = seen.get(chunk_id, 0)
+        seen[chunk_id] = repeat + 1
+        ids.append(chunk_id if repeat == 0 else f"{chunk_id}-{repeat}")
+    return ids
+
+
+def _load_manifest(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            manifest = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("version") == MANIFEST_VERSION else None
+
+
+def _write_manifest(path: str, manifest: Dict[str, Any]) -> None:
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, ensure_ascii=False, indent=1)
+    os.replace(temporary, path)
+
+
+def _batches(items: list, size: int) -> Iterator[list]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _rate(count: int, seconds: float) -> str:
+    return f"{count / seconds:.1f}" if seconds > 0 else "n/a"
+
+
+def ingest(settings: Settings, data_dir: str, rebuild: bool = False) -> Dict[str, Any]:
+    """Bring the Chroma index in line with the PDFs in ``data_dir``, re-embedding only changed chunks."""
+    # Imported here: chromadb takes about a second to import.
+    import chromadb
+    from chromadb.api.client import SharedSystemClient
+
+    chroma_dir = settings.chroma_dir
+    manifest_path = os.path.join(chroma_dir, MANIFEST_NAME)
+    model = embedding_model_name(settings)
+    expected = {"version": MANIFEST_VERSION, "embedding_model": model, "chunk_size": CHUNK_SIZE, "chunk_overlap": CHUNK_OVERLAP}
+
+    manifest = None if rebuild else _load_manifest(manifest_path)
+    if manifest is not None and any(manifest.get(key) != value for key, value in expected.items()):
+        print(f"Embedding model or chunking changed since the last run; rebuilding {chroma_dir}")
+        manifest = None
+    if manifest is None and os.path.isdir(chroma_dir):
+        shutil.rmtree(chroma_dir)
+        # Chroma keeps one open database per path and process; drop it along with the files.
+        SharedSystemClient.clear_system_cache()
+    os.makedirs(chroma_dir, exist_ok=True)
 
-from dotenv import load_dotenv
-from langchain_community.document_loaders import PyPDFDirectoryLoader
-from langchain_community.embeddings import OllamaEmbeddings
-from langchain_community.vectorstores import Chroma
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-
-
-def _project_root() -> str:
-    return os.path.dirname(os.path.dirname(__file__))
-
-
-def _load_env() -> None:
-    base_dir = _project_root()
-    for env_path in (os.path.join(base_dir, ".env"), os.path.join(base_dir, "server", ".env")):
-        if os.path.exists(env_path):
-            load_dotenv(dotenv_path=env_path)
-
-
-def main() -> None:
-    _load_env()
+    client = chromadb.PersistentClient(path=chroma_dir, settings=chromadb.Settings(anonymized_telemetry=False))
+    collection = client.get_or_create_collection(CHROMA_COLLECTION, metadata={"embedding_model": model})
+    files: Dict[str, Dict[str, Any]] = dict(manifest["files"]) if manifest is not None else {}
 
-    base_dir = _project_root()
-    data_dir = os.path.join(base_dir, "data")
-    chroma_dir = os.path.join(base_dir, "chroma_db")
-    ollama_base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
-    embedding_model = os.getenv("OLLAMA_EMBED_MODEL", "nomic-embed-text")
+    names = sorted(name for name in os.listdir(data_dir) if name.lower().endswith(".pdf") and not name.startswith("."))
+    if not names:
+        raise RuntimeError(f"No PDF documents found in: {data_dir}")
 
+    changed = []
+    for name in names:
+        path = os.path.join(data_dir, name)
+        stat = os.stat(path)
+        entry = files.get(name)
+        if entry is not None and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+            continue
+        sha256 = _file_sha256(path)
+        if entry is not None and entry["sha256"] == sha256:
+            # Touched but identical; remember the new mtime so it is not hashed again.
+            entry["mtime"] = stat.st_mtime
+            continue
+        changed.append((name, path, sha256, stat))
+    removed = sorted(set(files) - set(names))
+
+    parse_started = time.perf_counter()
+    parsed = {}
+    pages_parsed = 0
+    if changed:
+        workers = min(settings.ingest_workers or os.cpu_count() or 1, len(changed))
+        # Spawned, not forked: forking a process with Chroma's threads running can deadlock the child.
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            for (name, path, _, _), (page_count, chunks) in zip(changed, pool.map(parse_pdf, [path for _, path, _, _ in changed])):
+                parsed[name] = (page_count, chunks)
+                pages_parsed += page_count
+    parse_s = time.perf_counter() - parse_started
+
+    stale: list[str] = []
+    for name in removed:
+        stale.extend(files.pop(name)["chunks"])
+    pending = []
+    for name, path, sha256, stat in changed:
+        page_count, chunks = parsed[name]
+        ids = chunk_ids(name, chunks)
+        old_ids = set(files[name]["chunks"]) if name in files else set()
+        stale.extend(old_ids.difference(ids))
+        pending.extend(
+            (chunk_id, text, {"source": path, "page": page})
+            for chunk_id, (page, text) in zip(ids, chunks)
+            if chunk_id not in old_ids
+        )
+        files[name] = {"sha256": sha256, "size": stat.st_size, "mtime": stat.st_mtime, "pages": page_count, "chunks": ids}
+
+    max_batch = client.get_max_batch_size()
+    for batch in _batches(stale, max_batch):
+        collection.delete(ids=batch)
+
+    embed_started = time.perf_counter()
+    # Goes through the persistent embedding store, so re-indexing unchanged text calls no model.
+    embeddings = build_cached_embeddings(settings)
+    if pending:
+        batch_size = max(1, min(settings.embed_batch_size, max_batch))
+        batches = list(_batches(pending, batch_size))
+        # Embedding calls overlap each other; upserts stay on this thread in batch order.
+        with ThreadPoolExecutor(max_workers=max(1, settings.embed_concurrency)) as pool:
+            vectors = pool.map(lambda batch: embeddings.embed_documents([text for _, text, _ in batch]), batches)
+            for batch, batch_vectors in zip(batches, vectors):
+                collection.upsert(
+                    ids=[chunk_id for chunk_id, _, _ in batch],
+                    embeddings=batch_vectors,
+                    documents=[text for _, text, _ in batch],
+                    metadatas=[metadata for _, _, metadata in batch],
+                )
+    embed_s = time.perf_counter() - embed_started
+
+    # The BM25 and int8 indexes are rebuilt from the collection as a whole; neither calls the model.
+    lexical_s = quantized_s = 0.0
+    lexical_terms = quantized_bytes = None
+    if changed or removed or not os.path.isfile(os.path.join(chroma_dir, f"{LEXICAL_INDEX_NAME}.json")):
+        lexical, lexical_s = build_lexical_index(collection)
+        lexical.save(chroma_dir)
+        lexical_terms = len(lexical.vocabulary)
+    if changed or removed or not os.path.isfile(os.path.join(chroma_dir, f"{QUANTIZED_INDEX_NAME}.json")):
+        quantized, quantized_s = build_quantized_index(collection, model)
+        quantized.save(chroma_dir)
+        quantized_bytes = quantized.stats()["code_bytes"]
+
+    _write_manifest(manifest_path, {**expected, "files": files})
+    return {
+        "files": len(names),
+        "changed": len(changed),
+        "removed": len(removed),
+        "pages_parsed": pages_parsed,
+        "parse_s": parse_s,
+        "chunks_upserted": len(pending),
+        "chunks_deleted": len(stale),
+        "embed_s": embed_s,
+        "lexical_s": lexical_s,
+        "lexical_terms": lexical_terms,
+        "quantized_s": quantized_s,
+        "quantized_bytes": quantized_bytes,
+        "model_calls": embeddings.model_calls,
+        "texts_embedded": embeddings.texts_embedded,
+        "chunks_total": collection.count(),
+    }
+
+
+def main(argv: list[str]) -> None:
+    if any(arg not in ("--rebuild",) for arg in argv):
+        raise SystemExit("usage: python -m server.ingest [--rebuild]")
+    settings = get_settings()
+    data_dir = os.path.join(settings.base_dir, "data")
     if not os.path.isdir(data_dir):
         raise FileNotFoundError(f"Data folder not found: {data_dir}")
 
-    loader = PyPDFDirectoryLoader(data_dir)
-    docs = loader.load()
-    if not docs:
-        raise RuntimeError(f"No PDF documents found in: {data_dir}")
-
-    splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-    chunks = splitter.split_documents(docs)
-
-    if os.path.isdir(chroma_dir):
-        shutil.rmtree(chroma_dir)
-
-    embeddings = OllamaEmbeddings(model=embedding_model, base_url=ollama_base_url)
-    db = Chroma.from_documents(chunks, embeddings, persist_directory=chroma_dir)
-    if hasattr(db, "persist"):
-        db.persist()
-
-    print(f"Loaded PDFs: {len(docs)}")
-    print(f"Chunks indexed: {len(chunks)}")
-    print(f"Chroma DB path: {chroma_dir}")
+    report = ingest(settings, data_dir, rebuild="--rebuild" in argv)
+    print(
+        f"PDFs: {report['files']} ({report['changed']} new or changed, {report['removed']} removed, "
+        f"{report['files'] - report['changed']} unchanged)"
+    )
+    print(f"Parsed {report['pages_parsed']} pages in {report['parse_s']:.2f}s ({_rate(report['pages_parsed'], report['parse_s'])} pages/s)")
+    print(
+        f"Embedded {report['chunks_upserted']} chunks in {report['embed_s']:.2f}s "
+        f"({_rate(report['chunks_upserted'], report['embed_s'])} chunks/s), deleted {report['chunks_deleted']}"
+    )
+    print(
+        f"Embedding model: {report['texts_embedded']} texts in {report['model_calls']} calls, "
+        f"{report['chunks_upserted'] - report['texts_embedded']} chunks from the embedding cache"
+    )
+    if report["lexical_terms"] is not None:
+        print(f"Lexical index: {report['lexical_terms']} terms in {report['lexical_s']:.2f}s")
+    if report["quantized_bytes"] is not None:
+        print(f"Quantized index: {report['quantized_bytes']} bytes of int8 codes in {report['quantized_s']:.2f}s")
+    print(f"Chunks indexed: {report['chunks_total']}")
+    print(f"Chroma DB path: {settings.chroma_dir}")
 
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1:])
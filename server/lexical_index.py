@@ -0,0 +1,240 @@
+import json
+import os
+import re
+import time
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+# Written by server/ingest.py into CHROMA_DIR, next to the Chroma files it indexes.
+LEXICAL_INDEX_NAME = "lexical_index"
+LEXICAL_INDEX_VERSION = 1
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Identifier terms share the postings with words; the prefix keeps them apart.
+IDENTIFIER_PREFIX = "#"
+
+_APOSTROPHES = str.maketrans({"ʻ": "'", "ʼ": "'", "‘": "'", "’": "'", "`": "'"})
+_WORD = re.compile(r"\w+(?:'\w+)*")
+_LETTERS = r"[^\W\d_](?:'?[^\W\d_]){1,5}"
+_NUMBER = r"\d+(?:[./-]\d+)*"
+# "SHNQ 2.07.01-23", "O'RQ-939", "PQ-4160": an upper-case code followed by a number.
+_CODE = re.compile(rf"(?<!\w)({_LETTERS})[ -]?({_NUMBER})(?!\w)")
+# "319-сон", "603-sonli", "8-bob", "15-modda", "3-bandi": numbered documents and sections.
+_SECTION = re.compile(r"(?<![\w.])(\d+)-(son|сон|bob|modda|band)\w*", re.IGNORECASE)
+# "2.07.01-23", "20.05.2024": dotted numbers, searchable without their code.
+_DOTTED = re.compile(r"(?<![\w.])(\d+(?:\.\d+){2,}(?:-\d+)?)(?![\w])")
+
+
+def normalize_text(text: str) -> str:
+    return unicodedata.normalize("NFKC", text).translate(_APOSTROPHES)
+
+
+def tokenize(text: str) -> list[str]:
+    return _WORD.findall(normalize_text(text).casefold())
+
+
+def _number(value: str) -> str:
+    return re.sub(r"[/-]", ".", value)
+
+
+def extract_identifiers(text: str, upper_case_codes: bool = True) -> list[str]:
+    """Canonical identifier terms in ``text``, e.g. ``#shnq-2.07.01.23`` and ``#son-319``.
+
+    Documents are indexed with ``upper_case_codes`` so ordinary words followed by
+    a number are not taken for codes; queries match any case and keep only
+    identifiers the index knows.
+    """
+    text = normalize_text(text)
+    identifiers = []
+    for prefix, number in _CODE.findall(text):
+        if upper_case_codes and not prefix.replace("'", "").isupper():
+            continue
+        identifiers.append(f"{prefix.replace(chr(39), '').casefold()}-{_number(number)}")
+    for number, kind in _SECTION.findall(text):
+        identifiers.append(f"{'son' if kind.casefold() == 'сон' else kind.casefold()}-{number}")
+    identifiers.extend(_number(number) for number in _DOTTED.findall(text))
+    return [IDENTIFIER_PREFIX + identifier for identifier in identifiers]
+
+
+class LexicalIndex:
+    """BM25 inverted index over the ingested chunks, plus exact identifier lookup.
+
+    Postings are flat numpy arrays (CSR by term), so a query touches only the
+    posting lists of its own terms and never calls the embedding model.
+    """
+
+    def __init__(
+        self,
+        vocabulary: list[str],
+        offsets: np.ndarray,
+        postings: np.ndarray,
+        frequencies: np.ndarray,
+        lengths: np.ndarray,
+        chunk_ids: list[str],
+        texts: list[str],
+        sources: list[str],
+        pages: list[Optional[int]],
+    ) -> None:
+        self.vocabulary = vocabulary
+        self.term_index = {term: position for position, term in enumerate(vocabulary)}
+        self.offsets = offsets
+        self.postings = postings
+        self.frequencies = frequencies
+        self.lengths = lengths
+        self.average_length = float(lengths.mean()) if len(lengths) else 0.0
+        self.chunk_ids = chunk_ids
+        self.texts = texts
+        self.sources = sources
+        self.pages = pages
+        document_frequency = np.diff(offsets).astype(np.float64)
+        self.idf = np.log1p((len(chunk_ids) - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    @classmethod
+    def build(
+        cls,
+        chunk_ids: Sequence[str],
+        texts: Sequence[str],
+        metadatas: Sequence[Optional[Dict[str, Any]]],
+    ) -> "LexicalIndex":
+        term_postings: Dict[str, list[tuple[int, int]]] = {}
+        lengths = np.zeros(len(texts), dtype=np.float32)
+        for document, text in enumerate(texts):
+            terms = tokenize(text) + extract_identifiers(text)
+            lengths[document] = len(terms)
+            for term, count in Counter(terms).items():
+                term_postings.setdefault(term, []).append((document, count))
+
+        vocabulary = sorted(term_postings)
+        offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(term_postings[term]) for term in vocabulary])
+        postings = np.empty(int(offsets[-1]), dtype=np.int32)
+        frequencies = np.empty(int(offsets[-1]), dtype=np.float32)
+        for position, term in enumerate(vocabulary):
+            entries = np.asarray(term_postings[term], dtype=np.int64)
+            postings[offsets[position]:offsets[position + 1]] = entries[:, 0]
+            frequencies[offsets[position]:offsets[position + 1]] = entries[:, 1]
+
+        metadatas = [metadata or {} for metadata in metadatas]
+        return cls(
+            vocabulary,
+            offsets,
+            postings,
+            frequencies,
+            lengths,
+            list(chunk_ids),
+            list(texts),
+            [str(metadata.get("source", "")) for metadata in metadatas],
+            [int(metadata["page"]) if metadata.get("page") is not None else None for metadata in metadatas],
+        )
+
+    def save(self, directory: str) -> None:
+        path = os.path.join(directory, LEXICAL_INDEX_NAME)
+        np.savez(
+            f"{path}.tmp.npz",
+            offsets=self.offsets,
+            postings=self.postings,
+            frequencies=self.frequencies,
+            lengths=self.lengths,
+        )
+        with open(f"{path}.tmp.json", "w", encoding="utf-8") as handle:
+            json.dump(
+                {
+                    "version": LEXICAL_INDEX_VERSION,
+                    "vocabulary": self.vocabulary,
+                    "chunk_ids": self.chunk_ids,
+                    "texts": self.texts,
+                    "sources": self.sources,
+                    "pages": self.pages,
+                },
+                handle,
+                ensure_ascii=False,
+            )
+        os.replace(f"{path}.tmp.npz", f"{path}.npz")
+        os.replace(f"{path}.tmp.json", f"{path}.json")
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["LexicalIndex"]:
+        """The index saved in ``directory``, or None when there is none (or it is from another version)."""
+        path = os.path.join(directory, LEXICAL_INDEX_NAME)
+        if not (os.path.isfile(f"{path}.json") and os.path.isfile(f"{path}.npz")):
+            return None
+        with open(f"{path}.json", "r", encoding="utf-8") as handle:
+            meta = json.load(handle)
+        if meta.get("version") != LEXICAL_INDEX_VERSION:
+            return None
+        with np.load(f"{path}.npz") as arrays:
+            return cls(
+                meta["vocabulary"],
+                arrays["offsets"],
+                arrays["postings"],
+                arrays["frequencies"],
+                arrays["lengths"],
+                meta["chunk_ids"],
+                meta["texts"],
+                meta["sources"],
+                meta["pages"],
+            )
+
+    def __len__(self) -> int:
+        return len(self.chunk_ids)
+
+    def known_identifiers(self, query: str) -> list[str]:
+        return [term for term in dict.fromkeys(extract_identifiers(query, upper_case_codes=False)) if term in self.term_index]
+
+    def search(self, query: str, top_k: int, identifiers: Sequence[str] = ()) -> list[tuple[int, float]]:
+        """Top ``(document, BM25 score)`` pairs; with ``identifiers``, only chunks containing them.
+
+        Chunks carrying more of the identifiers rank first, then by BM25 score.
+        """
+        terms = [term for term in dict.fromkeys(tokenize(query) + list(identifiers)) if term in self.term_index]
+        if not terms:
+            return []
+        scores = np.zeros(len(self.chunk_ids), dtype=np.float64)
+        length_norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths / max(self.average_length, 1e-9))
+        for term in terms:
+            position = self.term_index[term]
+            start, end = self.offsets[position], self.offsets[position + 1]
+            documents = self.postings[start:end]
+            frequencies = self.frequencies[start:end]
+            scores[documents] += self.idf[position] * frequencies * (BM25_K1 + 1) / (frequencies + length_norm[documents])
+
+        if identifiers:
+            matched = np.zeros(len(self.chunk_ids), dtype=np.int32)
+            for term in identifiers:
+                position = self.term_index[term]
+                matched[self.postings[self.offsets[position]:self.offsets[position + 1]]] += 1
+            candidates = np.flatnonzero(matched)
+            # Identifier matches first, BM25 breaks ties.
+            order = np.lexsort((-scores[candidates], -matched[candidates]))[:top_k]
+            return [(int(candidates[index]), float(scores[candidates[index]])) for index in order]
+
+        candidates = np.flatnonzero(scores)
+        if len(candidates) > top_k:
+            candidates = candidates[np.argpartition(-scores[candidates], top_k)[:top_k]]
+        order = candidates[np.argsort(-scores[candidates])]
+        return [(int(document), float(scores[document])) for document in order]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "documents": len(self.chunk_ids),
+            "terms": len(self.vocabulary),
+            "identifiers": sum(1 for term in self.vocabulary if term.startswith(IDENTIFIER_PREFIX)),
+        }
+
+
+def build_lexical_index(collection: Any, page_size: int = 5000) -> tuple[LexicalIndex, float]:
+    """Index every chunk of a Chroma collection; returns the index and the build time in seconds."""
+    started = time.perf_counter()
+    chunk_ids: list[str] = []
+    texts: list[str] = []
+    metadatas: list[Optional[Dict[str, Any]]] = []
+    total = collection.count()
+    for offset in range(0, total, page_size):
+        page = collection.get(include=["documents", "metadatas"], limit=page_size, offset=offset)
+        chunk_ids.extend(page["ids"])
+        texts.extend(text or "" for text in page["documents"])
+        metadatas.extend(page["metadatas"])
+    return LexicalIndex.build(chunk_ids, texts, metadatas), time.perf_counter() - started
@@ -0,0 +1,285 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional
+
+from server.config import Settings
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BATCH: "batch"}
+# Recent queue waits kept per priority for the wait-time percentiles.
+WAIT_SAMPLE_SIZE = 512
+
+
+class LlmSchedulerError(RuntimeError):
+    pass
+
+
+class LlmQueueFull(LlmSchedulerError):
+    """The wait queue is full, or a higher-priority request took this one's place in it."""
+
+
+class LlmDeadlineExceeded(LlmSchedulerError):
+    def __init__(self, message: str, queued: bool) -> None:
+        super().__init__(message)
+        # True when the deadline passed before the request reached the LLM.
+        self.queued = queued
+
+
+class _Waiter:
+    __slots__ = ("priority", "sequence", "enqueued_at", "state", "error", "wake")
+
+    def __init__(self, priority: int, sequence: int, wake: Callable[[], None]) -> None:
+        self.priority = priority
+        self.sequence = sequence
+        self.enqueued_at = time.monotonic()
+        self.state = "waiting"
+        self.error: Optional[LlmSchedulerError] = None
+        self.wake = wake
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.sequence) < (other.priority, other.sequence)
+
+
+class LlmLease:
+    """A held LLM slot. ``release`` is idempotent, so several cleanup paths may call it."""
+
+    def __init__(self, scheduler: "LlmScheduler", deadline: float) -> None:
+        self._scheduler = scheduler
+        self._released = False
+        self._lock = threading.Lock()
+        self.deadline = deadline
+
+    def remaining_s(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+    def release(self) -> None:
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        self._scheduler._release()
+
+
+class LlmScheduler:
+    """Admission control for the single local Ollama instance.
+
+    At most ``max_concurrency`` generations run at once. Up to ``max_queue``
+    further requests wait, lowest ``priority`` value first and FIFO within a
+    priority; beyond that new requests are rejected immediately, except that an
+    interactive request displaces the newest queued batch one. Every request
+    carries a deadline covering its queue wait and, for async callers, its
+    generation. Both threads and coroutines can wait for a slot.
+    """
+
+    def __init__(self, max_concurrency: int = 2, max_queue: int = 32, timeout_s: float = 120.0) -> None:
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.max_queue = max(0, int(max_queue))
+        self.timeout_s = float(timeout_s)
+        self._lock = threading.Lock()
+        self._queue: list[_Waiter] = []
+        self._queued = 0
+        self._active = 0
+        self._sequence = itertools.count()
+        self._waits = {priority: deque(maxlen=WAIT_SAMPLE_SIZE) for priority in PRIORITY_NAMES}
+        self.admitted = 0
+        self.rejected = 0
+        self.displaced = 0
+        self.expired_in_queue = 0
+        self.expired_running = 0
+
+    def acquire(self, priority: int = PRIORITY_BATCH, timeout_s: Optional[float] = None) -> LlmLease:
+        """Block the calling thread until a slot is free; raises LlmQueueFull or LlmDeadlineExceeded."""
+        deadline = self._deadline(timeout_s)
+        event = threading.Event()
+        waiter = self._enter(priority, event.set)
+        if waiter is None:
+            return LlmLease(self, deadline)
+        event.wait(max(0.0, deadline - time.monotonic()))
+        return self._settle(waiter, deadline)
+
+    async def acquire_async(self, priority: int = PRIORITY_INTERACTIVE, timeout_s: Optional[float] = None) -> LlmLease:
+        deadline = self._deadline(timeout_s)
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def wake() -> None:
+            try:
+                loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(None))
+            except RuntimeError:
+                pass  # Loop already closed; nobody is waiting any more.
+
+        waiter = self._enter(priority, wake)
+        if waiter is None:
+            return LlmLease(self, deadline)
+        try:
+            await asyncio.wait_for(asyncio.shield(granted), max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        return self._settle(waiter, deadline)
+
+    @contextmanager
+    def slot(self, priority: int = PRIORITY_BATCH, timeout_s: Optional[float] = None) -> Iterator[LlmLease]:
+        lease = self.acquire(priority, timeout_s)
+        try:
+            yield lease
+        finally:
+            lease.release()
+
+    @asynccontextmanager
+    async def slot_async(
+        self,
+        priority: int = PRIORITY_INTERACTIVE,
+        timeout_s: Optional[float] = None,
+    ) -> AsyncIterator[LlmLease]:
+        lease = await self.acquire_async(priority, timeout_s)
+        try:
+            yield lease
+        finally:
+            lease.release()
+
+    def invoke(self, llm: Any, prompt: str, priority: int = PRIORITY_BATCH, timeout_s: Optional[float] = None) -> Any:
+        """``llm.invoke(prompt)`` in the calling thread once a slot is free.
+
+        The deadline bounds the queue wait only; a blocking call cannot be
+        interrupted once it has started.
+        """
+        with self.slot(priority, timeout_s):
+            return llm.invoke(prompt)
+
+    async def invoke_async(
+        self,
+        llm: Any,
+        prompt: str,
+        priority: int = PRIORITY_INTERACTIVE,
+        timeout_s: Optional[float] = None,
+    ) -> Any:
+        """``llm.invoke(prompt)`` in a worker thread, giving up on it when the deadline passes.
+
+        The slot stays held until the thread actually returns, so an abandoned
+        generation still counts against ``max_concurrency``.
+        """
+        lease = await self.acquire_async(priority, timeout_s)
+        try:
+            task = asyncio.ensure_future(asyncio.to_thread(llm.invoke, prompt))
+        except BaseException:
+            lease.release()
+            raise
+        task.add_done_callback(lambda _: lease.release())
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), lease.remaining_s())
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.expired_running += 1
+            raise LlmDeadlineExceeded("LLM generation exceeded its deadline", queued=False) from None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = {priority: list(samples) for priority, samples in self._waits.items()}
+            stats: Dict[str, Any] = {
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "timeout_s": self.timeout_s,
+                "active": self._active,
+                "queue_depth": self._queued,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "displaced": self.displaced,
+                "expired_in_queue": self.expired_in_queue,
+                "expired_running": self.expired_running,
+            }
+        stats["wait_ms"] = {PRIORITY_NAMES[priority]: _wait_summary(samples) for priority, samples in waits.items()}
+        return stats
+
+    def _deadline(self, timeout_s: Optional[float]) -> float:
+        return time.monotonic() + (self.timeout_s if timeout_s is None else float(timeout_s))
+
+    def _enter(self, priority: int, wake: Callable[[], None]) -> Optional[_Waiter]:
+        """Take a free slot (returns None) or join the queue (returns the waiter)."""
+        with self._lock:
+            if self._active < self.max_concurrency and self._queued == 0:
+                self._active += 1
+                self.admitted += 1
+                self._waits[priority].append(0.0)
+                return None
+            if self._queued >= self.max_queue:
+                displaced = self._newest_lower_priority(priority)
+                if displaced is None:
+                    self.rejected += 1
+                    raise LlmQueueFull(f"LLM queue is full ({self._queued} waiting)")
+                displaced.state = "rejected"
+                displaced.error = LlmQueueFull("Displaced from the LLM queue by a higher-priority request")
+                self._queued -= 1
+                self.displaced += 1
+                displaced.wake()
+            waiter = _Waiter(priority, next(self._sequence), wake)
+            heapq.heappush(self._queue, waiter)
+            self._queued += 1
+            return waiter
+
+    def _settle(self, waiter: _Waiter, deadline: float) -> LlmLease:
+        with self._lock:
+            if waiter.state == "waiting":
+                waiter.state = "abandoned"
+                self._queued -= 1
+                self.expired_in_queue += 1
+                raise LlmDeadlineExceeded("Timed out waiting for an LLM slot", queued=True)
+            if waiter.state == "rejected":
+                raise waiter.error
+            self._waits[waiter.priority].append((time.monotonic() - waiter.enqueued_at) * 1000)
+        return LlmLease(self, deadline)
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        with self._lock:
+            state, waiter.state = waiter.state, "abandoned"
+            if state == "waiting":
+                self._queued -= 1
+        if state == "granted":
+            # The slot was handed over just as the caller went away; pass it on.
+            self._release()
+
+    def _release(self) -> None:
+        with self._lock:
+            while self._queue:
+                waiter = heapq.heappop(self._queue)
+                if waiter.state != "waiting":
+                    continue
+                # Hand the slot straight over; _active is unchanged.
+                waiter.state = "granted"
+                self._queued -= 1
+                self.admitted += 1
+                waiter.wake()
+                return
+            self._active -= 1
+
+    def _newest_lower_priority(self, priority: int) -> Optional[_Waiter]:
+        candidates = [waiter for waiter in self._queue if waiter.state == "waiting" and waiter.priority > priority]
+        return max(candidates, key=lambda waiter: (waiter.priority, waiter.sequence)) if candidates else None
+
+
+def _wait_summary(samples: list[float]) -> Dict[str, Any]:
+    if not samples:
+        return {"count": 0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "p50": round(ordered[len(ordered) // 2], 2),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+        "max": round(ordered[-1], 2),
+    }
+
+
+def build_llm_scheduler(settings: Settings) -> LlmScheduler:
+    return LlmScheduler(
+        max_concurrency=settings.llm_max_concurrency,
+        max_queue=settings.llm_max_queue,
+        timeout_s=settings.llm_timeout_s,
+    )
@@ -0,0 +1,83 @@
+import json
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+OLLAMA_TEMPERATURE = 0.2
+
+
+class OllamaStreamError(RuntimeError):
+    pass
+
+
+class OllamaStreamClient:
+    """Relays ``/api/generate`` completions from Ollama chunk by chunk.
+
+    One pooled ``httpx.AsyncClient`` is kept per process. Leaving the iterator
+    early (the caller stops, or its task is cancelled because the HTTP client
+    went away) closes the upstream response, and Ollama stops generating as
+    soon as its connection is closed.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        model: str,
+        temperature: float = OLLAMA_TEMPERATURE,
+        connect_timeout_s: float = 5.0,
+        read_timeout_s: float = 120.0,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.temperature = temperature
+        self.timeout = httpx.Timeout(read_timeout_s, connect=connect_timeout_s)
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def stream_generate(self, prompt: str, timeout_s: Optional[float] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Yield Ollama's stream records; each carries a ``response`` text chunk, the last has ``done``.
+
+        ``timeout_s`` caps every wait on Ollama, including the one for the first token.
+        """
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": True,
+            "options": {"temperature": self.temperature},
+        }
+        timeout = self.timeout
+        if timeout_s is not None:
+            timeout = httpx.Timeout(min(self.timeout.read, timeout_s), connect=min(self.timeout.connect, timeout_s))
+        async with self._get_client().stream("POST", "/api/generate", json=payload, timeout=timeout) as response:
+            if response.status_code >= 400:
+                body = (await response.aread()).decode("utf-8", "replace")
+                raise OllamaStreamError(f"{response.status_code} from Ollama: {_error_message(body)}")
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as error:
+                    # A truncated or garbled line must end the stream with an error event, not silently.
+                    raise OllamaStreamError(f"malformed response from Ollama: {line[:200]!r}") from error
+                if "error" in record:
+                    raise OllamaStreamError(str(record["error"]))
+                yield record
+                if record.get("done"):
+                    return
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout)
+        return self._client
+
+
+def _error_message(body: str) -> str:
+    try:
+        return str(json.loads(body).get("error", body))
+    except (ValueError, AttributeError):
+        return body
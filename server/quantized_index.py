@@ -0,0 +1,173 @@
+import json
+import os
+import time
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+# Written by server/ingest.py into CHROMA_DIR; the .npy files are memory-mapped.
+QUANTIZED_INDEX_NAME = "quantized_index"
+QUANTIZED_INDEX_VERSION = 1
+# Rows scored per block, bounding the float32 temporary a query allocates.
+SCAN_BLOCK_ROWS = 8192
+
+
+class QuantizedVectorIndex:
+    """Chunk embeddings as int8 codes with float32 re-ranking, all memory-mapped.
+
+    Each vector is scaled by its largest absolute component into int8, a
+    quarter of the float32 size. A query scans the codes for approximate
+    squared-L2 distances (the metric Chroma uses), then reads the float32
+    rows of the best ``top_k * rerank`` candidates to compute exact distances.
+    Files are opened with ``mmap_mode="r"``, so every worker process on a
+    host shares one copy through the page cache.
+    """
+
+    def __init__(
+        self,
+        codes: np.ndarray,
+        scales: np.ndarray,
+        norms: np.ndarray,
+        vectors: np.ndarray,
+        chunk_ids: list[str],
+        texts: list[str],
+        sources: list[str],
+        pages: list[Optional[int]],
+        embedding_model: str = "",
+    ) -> None:
+        self.codes = codes
+        self.scales = scales
+        self.norms = norms
+        self.vectors = vectors
+        self.chunk_ids = chunk_ids
+        self.texts = texts
+        self.sources = sources
+        self.pages = pages
+        self.embedding_model = embedding_model
+
+    @classmethod
+    def build(
+        cls,
+        chunk_ids: Sequence[str],
+        embeddings: Any,
+        texts: Sequence[str],
+        metadatas: Sequence[Optional[Dict[str, Any]]],
+        embedding_model: str = "",
+    ) -> "QuantizedVectorIndex":
+        vectors = np.ascontiguousarray(np.asarray(embeddings, dtype=np.float32).reshape(len(chunk_ids), -1))
+        if not len(vectors):
+            vectors = np.zeros((0, 0), dtype=np.float32)
+        peaks = np.abs(vectors).max(axis=1) if len(vectors) else np.zeros(0, dtype=np.float32)
+        scales = np.where(peaks > 0, peaks / 127.0, 1.0).astype(np.float32)
+        codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        metadatas = [metadata or {} for metadata in metadatas]
+        return cls(
+            codes,
+            scales,
+            np.einsum("ij,ij->i", vectors, vectors).astype(np.float32),
+            vectors,
+            list(chunk_ids),
+            list(texts),
+            [str(metadata.get("source", "")) for metadata in metadatas],
+            [int(metadata["page"]) if metadata.get("page") is not None else None for metadata in metadatas],
+            embedding_model,
+        )
+
+    def save(self, directory: str) -> None:
+        path = os.path.join(directory, QUANTIZED_INDEX_NAME)
+        for name in ("codes", "scales", "norms", "vectors"):
+            # np.save appends .npy to names without it; keep the suffix explicit.
+            np.save(f"{path}.{name}.tmp.npy", getattr(self, name))
+        with open(f"{path}.tmp.json", "w", encoding="utf-8") as handle:
+            json.dump(
+                {
+                    "version": QUANTIZED_INDEX_VERSION,
+                    "embedding_model": self.embedding_model,
+                    "chunk_ids": self.chunk_ids,
+                    "texts": self.texts,
+                    "sources": self.sources,
+                    "pages": self.pages,
+                },
+                handle,
+                ensure_ascii=False,
+            )
+        for name in ("codes", "scales", "norms", "vectors"):
+            os.replace(f"{path}.{name}.tmp.npy", f"{path}.{name}.npy")
+        os.replace(f"{path}.tmp.json", f"{path}.json")
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["QuantizedVectorIndex"]:
+        """The memory-mapped index in ``directory``, or None when there is none (or it is from another version)."""
+        path = os.path.join(directory, QUANTIZED_INDEX_NAME)
+        if not os.path.isfile(f"{path}.json"):
+            return None
+        with open(f"{path}.json", "r", encoding="utf-8") as handle:
+            meta = json.load(handle)
+        if meta.get("version") != QUANTIZED_INDEX_VERSION:
+            return None
+        arrays = {name: np.load(f"{path}.{name}.npy", mmap_mode="r") for name in ("codes", "scales", "norms", "vectors")}
+        return cls(
+            arrays["codes"],
+            arrays["scales"],
+            arrays["norms"],
+            arrays["vectors"],
+            meta["chunk_ids"],
+            meta["texts"],
+            meta["sources"],
+            meta["pages"],
+            meta.get("embedding_model", ""),
+        )
+
+    def __len__(self) -> int:
+        return len(self.chunk_ids)
+
+    def search(self, query: Sequence[float], top_k: int, rerank: int = 4) -> list[tuple[int, float]]:
+        """Top ``(row, squared L2 distance)`` pairs; ``rerank=0`` skips the float32 pass."""
+        count = len(self.chunk_ids)
+        if count == 0:
+            return []
+        query = np.asarray(query, dtype=np.float32)
+        top_k = min(top_k, count)
+        candidates = min(count, top_k * rerank) if rerank > 0 else top_k
+
+        approximate = np.empty(count, dtype=np.float32)
+        for start in range(0, count, SCAN_BLOCK_ROWS):
+            end = min(start + SCAN_BLOCK_ROWS, count)
+            dots = (self.codes[start:end].astype(np.float32) @ query) * self.scales[start:end]
+            # ||q||^2 is the same for every row, so it is left out of the ranking.
+            approximate[start:end] = self.norms[start:end] - 2.0 * dots
+        rows = np.argpartition(approximate, candidates - 1)[:candidates] if candidates < count else np.arange(count)
+
+        if rerank > 0:
+            rows = np.sort(rows)  # Ascending offsets read the mapped float32 file sequentially.
+            distances = ((np.asarray(self.vectors[rows]) - query) ** 2).sum(axis=1)
+        else:
+            distances = approximate[rows] + float(query @ query)
+        order = np.argsort(distances)[:top_k]
+        return [(int(rows[position]), float(distances[position])) for position in order]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "documents": len(self.chunk_ids),
+            "dimensions": int(self.codes.shape[1]) if self.codes.ndim == 2 else 0,
+            "code_bytes": int(self.codes.nbytes),
+            "float_bytes": int(self.vectors.nbytes),
+        }
+
+
+def build_quantized_index(collection: Any, embedding_model: str = "", page_size: int = 5000) -> tuple[QuantizedVectorIndex, float]:
+    """Quantize every embedding in a Chroma collection; returns the index and the build time in seconds."""
+    started = time.perf_counter()
+    chunk_ids: list[str] = []
+    embeddings: list[Any] = []
+    texts: list[str] = []
+    metadatas: list[Optional[Dict[str, Any]]] = []
+    total = collection.count()
+    for offset in range(0, total, page_size):
+        page = collection.get(include=["embeddings", "documents", "metadatas"], limit=page_size, offset=offset)
+        chunk_ids.extend(page["ids"])
+        embeddings.extend(page["embeddings"])
+        texts.extend(text or "" for text in page["documents"])
+        metadatas.extend(page["metadatas"])
+    index = QuantizedVectorIndex.build(chunk_ids, embeddings, texts, metadatas, embedding_model)
+    return index, time.perf_counter() - started
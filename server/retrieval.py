@@ -0,0 +1,358 @@
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Optional, Union
+
+from server.config import Settings
+from server.embeddings import CachedEmbeddings
+from server.lexical_index import LexicalIndex
+from server.quantized_index import QuantizedVectorIndex
+
+if TYPE_CHECKING:
+    from chromadb.api.models.Collection import Collection
+
+logger = logging.getLogger("grid-backend")
+
+# Collection name langchain's Chroma wrapper writes to (see server/ingest.py).
+CHROMA_COLLECTION = "langchain"
+# Reciprocal rank fusion constant; 60 is the value from the original RRF paper.
+RRF_K = 60
+# Candidates taken from each side before fusing, as a multiple of top_k.
+HYBRID_CANDIDATES = 4
+RAG_MODES = ("hybrid", "vector", "lexical")
+VECTOR_STORES = ("chroma", "int8")
+
+
+@dataclass
+class RetrievedChunk:
+    text: str
+    source: str
+    page: Optional[int]
+    distance: Optional[float]
+    chunk_id: str = ""
+    # "vector", "lexical", "identifier" or "hybrid" (found by both searches).
+    match: str = "vector"
+
+    @property
+    def label(self) -> str:
+        name = os.path.splitext(os.path.basename(self.source))[0] if self.source else "document"
+        return f"{name}, p. {self.page + 1}" if self.page is not None else name
+
+    def as_source(self) -> Dict[str, Any]:
+        return {
+            "label": self.label,
+            "source": os.path.basename(self.source),
+            "page": self.page + 1 if self.page is not None else None,
+            "distance": round(self.distance, 4) if self.distance is not None else None,
+            "match": self.match,
+        }
+
+
+class ChromaRetriever:
+    """Top-k search over the regulatory PDF index built by ``server/ingest.py``.
+
+    The persistent Chroma client and collection are opened once; query
+    embeddings go through a shared LRU so repeated questions skip the model.
+    """
+
+    def __init__(
+        self,
+        collection: "Collection",
+        embeddings: CachedEmbeddings,
+        top_k: int = 4,
+        max_distance: float = 0.0,
+    ) -> None:
+        self.collection = collection
+        self.embeddings = embeddings
+        self.top_k = max(1, int(top_k))
+        self.max_distance = float(max_distance)
+        self.document_count = collection.count()
+        self.queries = 0
+        self.search_ms_total = 0.0
+
+    def retrieve(self, query: str, top_k: Optional[int] = None) -> tuple[list[RetrievedChunk], Dict[str, Any]]:
+        """Return the closest chunks and a timing breakdown in milliseconds."""
+        started = time.perf_counter()
+        vector, cached = self.embeddings.embed_query_timed(query)
+        embedded = time.perf_counter()
+        result = self.collection.query(
+            query_embeddings=[vector],
+            n_results=min(top_k or self.top_k, max(self.document_count, 1)),
+            include=["documents", "metadatas", "distances"],
+        )
+        searched = time.perf_counter()
+
+        chunks = []
+        rows = zip(result["ids"][0], result["documents"][0], result["metadatas"][0], result["distances"][0])
+        for chunk_id, text, metadata, distance in rows:
+            if self.max_distance > 0 and distance > self.max_distance:
+                continue
+            metadata = metadata or {}
+            page = metadata.get("page")
+            chunks.append(
+                RetrievedChunk(
+                    text=text or "",
+                    source=str(metadata.get("source", "")),
+                    page=int(page) if page is not None else None,
+                    distance=float(distance),
+                    chunk_id=chunk_id,
+                )
+            )
+
+        self.queries += 1
+        self.search_ms_total += (searched - embedded) * 1000
+        return chunks, {
+            "path": "vector",
+            "embed_ms": round((embedded - started) * 1000, 2),
+            "embedding_cached": cached,
+            "search_ms": round((searched - embedded) * 1000, 2),
+            "total_ms": round((time.perf_counter() - started) * 1000, 2),
+            "hits": len(chunks),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "documents": self.document_count,
+            "top_k": self.top_k,
+            "queries": self.queries,
+            "search_ms_total": round(self.search_ms_total, 2),
+            "query_embeddings": self.embeddings.stats(),
+        }
+
+
+class QuantizedRetriever:
+    """Vector search over the memory-mapped int8 index written by ``server/ingest.py``.
+
+    Same results shape and timing breakdown as ``ChromaRetriever``; distances
+    are exact squared L2 after the float32 re-rank, as Chroma reports them.
+    """
+
+    def __init__(
+        self,
+        index: QuantizedVectorIndex,
+        embeddings: CachedEmbeddings,
+        top_k: int = 4,
+        max_distance: float = 0.0,
+        rerank: int = 4,
+    ) -> None:
+        self.index = index
+        self.embeddings = embeddings
+        self.top_k = max(1, int(top_k))
+        self.max_distance = float(max_distance)
+        self.rerank = max(0, int(rerank))
+        self.document_count = len(index)
+        self.queries = 0
+        self.search_ms_total = 0.0
+
+    def retrieve(self, query: str, top_k: Optional[int] = None) -> tuple[list[RetrievedChunk], Dict[str, Any]]:
+        started = time.perf_counter()
+        vector, cached = self.embeddings.embed_query_timed(query)
+        embedded = time.perf_counter()
+        hits = self.index.search(vector, top_k or self.top_k, rerank=self.rerank)
+        searched = time.perf_counter()
+
+        chunks = [
+            RetrievedChunk(
+                text=self.index.texts[row],
+                source=self.index.sources[row],
+                page=self.index.pages[row],
+                distance=distance,
+                chunk_id=self.index.chunk_ids[row],
+            )
+            for row, distance in hits
+            if not (self.max_distance > 0 and distance > self.max_distance)
+        ]
+        self.queries += 1
+        self.search_ms_total += (searched - embedded) * 1000
+        return chunks, {
+            "path": "vector",
+            "embed_ms": round((embedded - started) * 1000, 2),
+            "embedding_cached": cached,
+            "search_ms": round((searched - embedded) * 1000, 2),
+            "total_ms": round((time.perf_counter() - started) * 1000, 2),
+            "hits": len(chunks),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "store": "int8",
+            **self.index.stats(),
+            "top_k": self.top_k,
+            "rerank": self.rerank,
+            "queries": self.queries,
+            "search_ms_total": round(self.search_ms_total, 2),
+            "query_embeddings": self.embeddings.stats(),
+        }
+
+
+VectorRetriever = Union[ChromaRetriever, QuantizedRetriever]
+
+
+class HybridRetriever:
+    """BM25 and vector search over the same chunks, fused by reciprocal rank.
+
+    A question naming a known identifier ("SHNQ 2.07.01-23", "O'RQ-939",
+    "319-son") is answered from the lexical index alone, without a query
+    embedding. Either side may be missing, in which case the other serves
+    every query.
+    """
+
+    def __init__(
+        self,
+        lexical: Optional[LexicalIndex],
+        vector: Optional[VectorRetriever],
+        top_k: int = 4,
+        mode: str = "hybrid",
+    ) -> None:
+        self.lexical = lexical
+        self.vector = vector
+        self.top_k = max(1, int(top_k))
+        self.mode = mode
+        self.queries = {"identifier": 0, "lexical": 0, "vector": 0, "hybrid": 0}
+
+    def retrieve(self, query: str, top_k: Optional[int] = None) -> tuple[list[RetrievedChunk], Dict[str, Any]]:
+        top_k = top_k or self.top_k
+        started = time.perf_counter()
+        identifiers = self.lexical.known_identifiers(query) if self.lexical is not None else []
+        if self.lexical is not None and (identifiers or self.vector is None or self.mode == "lexical"):
+            path = "identifier" if identifiers else "lexical"
+            hits = self.lexical.search(query, top_k, identifiers)
+            chunks = [self._lexical_chunk(document, path) for document, _ in hits]
+            lexical_ms = (time.perf_counter() - started) * 1000
+            self.queries[path] += 1
+            return chunks, {
+                "path": path,
+                "identifiers": [identifier[1:] for identifier in identifiers],
+                "embed_ms": 0.0,
+                "embedding_cached": None,
+                "search_ms": 0.0,
+                "lexical_ms": round(lexical_ms, 3),
+                "total_ms": round(lexical_ms, 3),
+                "hits": len(chunks),
+            }
+
+        if self.lexical is None or self.mode == "vector":
+            self.queries["vector"] += 1
+            return self.vector.retrieve(query, top_k)
+
+        candidates = top_k * HYBRID_CANDIDATES
+        lexical_started = time.perf_counter()
+        lexical_hits = self.lexical.search(query, candidates)
+        lexical_ms = (time.perf_counter() - lexical_started) * 1000
+        vector_chunks, timing = self.vector.retrieve(query, candidates)
+
+        scores: Dict[str, float] = {}
+        chunks: Dict[str, RetrievedChunk] = {}
+        for rank, chunk in enumerate(vector_chunks):
+            scores[chunk.chunk_id] = 1.0 / (RRF_K + rank + 1)
+            chunks[chunk.chunk_id] = chunk
+        for rank, (document, _) in enumerate(lexical_hits):
+            chunk_id = self.lexical.chunk_ids[document]
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (RRF_K + rank + 1)
+            if chunk_id in chunks:
+                chunks[chunk_id].match = "hybrid"
+            else:
+                chunks[chunk_id] = self._lexical_chunk(document, "lexical")
+        fused = [chunks[chunk_id] for chunk_id in sorted(scores, key=scores.get, reverse=True)[:top_k]]
+        self.queries["hybrid"] += 1
+        return fused, {
+            **timing,
+            "path": "hybrid",
+            "lexical_ms": round(lexical_ms, 3),
+            "total_ms": round((time.perf_counter() - started) * 1000, 2),
+            "hits": len(fused),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "top_k": self.top_k,
+            "queries": dict(self.queries),
+            "lexical": self.lexical.stats() if self.lexical is not None else None,
+            "vector": self.vector.stats() if self.vector is not None else None,
+        }
+
+    def _lexical_chunk(self, document: int, match: str) -> RetrievedChunk:
+        return RetrievedChunk(
+            text=self.lexical.texts[document],
+            source=self.lexical.sources[document],
+            page=self.lexical.pages[document],
+            distance=None,
+            chunk_id=self.lexical.chunk_ids[document],
+            match=match,
+        )
+
+
+Retriever = Union[ChromaRetriever, QuantizedRetriever, HybridRetriever]
+
+
+def build_retriever(settings: Settings, embeddings: CachedEmbeddings) -> Optional[Retriever]:
+    """Open the indexes ``RAG_MODE`` asks for; None (logged) when RAG is off or nothing has been built."""
+    if not settings.rag_enabled:
+        return None
+    if settings.rag_mode not in RAG_MODES:
+        raise RuntimeError(
+            "Unsupported RAG_MODE. Use 'hybrid', 'vector' or 'lexical'. "
+            f"Received: {settings.rag_mode}"
+        )
+    if settings.vector_store not in VECTOR_STORES:
+        raise RuntimeError(
+            "Unsupported VECTOR_STORE. Use 'chroma' or 'int8'. "
+            f"Received: {settings.vector_store}"
+        )
+    lexical = LexicalIndex.load(settings.chroma_dir) if settings.rag_mode != "vector" else None
+    vector = _open_vector_retriever(settings, embeddings) if settings.rag_mode != "lexical" else None
+    if settings.rag_mode == "vector" or lexical is None:
+        if lexical is None and settings.rag_mode != "vector":
+            logger.warning("No lexical index in %s; retrieval is vector-only (rebuild it with server/ingest.py)", settings.chroma_dir)
+        return vector
+    return HybridRetriever(lexical, vector, top_k=settings.rag_top_k, mode=settings.rag_mode)
+
+
+def _open_vector_retriever(settings: Settings, embeddings: CachedEmbeddings) -> Optional[VectorRetriever]:
+    if settings.vector_store == "int8":
+        index = QuantizedVectorIndex.load(settings.chroma_dir)
+        if index is not None:
+            if index.embedding_model and index.embedding_model != embeddings.model_name:
+                logger.warning(
+                    "Quantized index was built with embeddings '%s' but queries use '%s'; re-run server/ingest.py",
+                    index.embedding_model,
+                    embeddings.model_name,
+                )
+            return QuantizedRetriever(
+                index,
+                embeddings,
+                top_k=settings.rag_top_k,
+                max_distance=settings.rag_max_distance,
+                rerank=settings.vector_rerank,
+            )
+        logger.warning("No quantized index in %s; falling back to Chroma (build it with server/ingest.py)", settings.chroma_dir)
+    return _open_chroma_retriever(settings, embeddings)
+
+
+def _open_chroma_retriever(settings: Settings, embeddings: CachedEmbeddings) -> Optional[ChromaRetriever]:
+    if not os.path.isfile(os.path.join(settings.chroma_dir, "chroma.sqlite3")):
+        logger.warning("No Chroma index in %s; /ask runs without vector search (build it with server/ingest.py)", settings.chroma_dir)
+        return None
+    # Imported here: chromadb takes about a second to import.
+    import chromadb
+
+    client = chromadb.PersistentClient(
+        path=settings.chroma_dir,
+        settings=chromadb.Settings(anonymized_telemetry=False),
+    )
+    try:
+        collection = client.get_collection(CHROMA_COLLECTION)
+    except Exception as error:
+        logger.warning("Chroma index in %s has no '%s' collection: %s", settings.chroma_dir, CHROMA_COLLECTION, error)
+        return None
+
+    indexed_with = (collection.metadata or {}).get("embedding_model")
+    if indexed_with and indexed_with != embeddings.model_name:
+        logger.warning(
+            "Chroma index was built with embeddings '%s' but queries use '%s'; re-run server/ingest.py",
+            indexed_with,
+            embeddings.model_name,
+        )
+    return ChromaRetriever(collection, embeddings, top_k=settings.rag_top_k, max_distance=settings.rag_max_distance)
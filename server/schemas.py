@@ -1,5 +1,7 @@
 from typing import Any, Dict, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+FUTURE_STATE_ID_PATTERN = r"^[A-Za-z0-9_-]+$"
 
 
 class ChatQuery(BaseModel):
@@ -7,7 +9,20 @@ class ChatQuery(BaseModel):
     question: Optional[str] = None
     context_snapshot: Optional[Dict[str, Any]] = None
     context: Optional[Dict[str, Any]] = None
+    future_state_id: Optional[str] = Field(default=None, max_length=64, pattern=FUTURE_STATE_ID_PATTERN)
+    # en, uz or ru; English when omitted.
+    language: Optional[str] = Field(default=None, max_length=16)
 
 
 class PredictRequest(BaseModel):
     target_date: str
+    # Reuse a handle to keep one future state per planner session; a new one is issued otherwise.
+    future_state_id: Optional[str] = Field(default=None, max_length=64, pattern=FUTURE_STATE_ID_PATTERN)
+    # Language of the TP suggestion explanations; English when omitted.
+    language: Optional[str] = Field(default=None, max_length=16)
+
+
+class PredictRangeRequest(BaseModel):
+    start_date: str
+    end_date: str
+    step_months: int = 1
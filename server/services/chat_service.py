@@ -1,13 +1,23 @@
+import hashlib
+import heapq
 import json
+import re
+import string
+from dataclasses import dataclass, field
 from datetime import date
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, Optional
 
+from server.llm_scheduler import PRIORITY_BATCH, PRIORITY_INTERACTIVE
 from server.state import RuntimeState
 from server.utils import safe_json_parse
 
 
 
-def extract_prediction_params(query: str, state: RuntimeState) -> Dict[str, str]:
+def extract_prediction_params(
+    query: str,
+    state: RuntimeState,
+    priority: int = PRIORITY_INTERACTIVE,
+) -> Dict[str, str]:
     parser_prompt = (
         "Extract district and target_date from the request.\n"
         "Known districts: " + ", ".join(state.known_districts) + ".\n"
@@ -15,7 +25,7 @@ def extract_prediction_params(query: str, state: RuntimeState) -> Dict[str, str]
         f"Request: {query}\n"
         "Return JSON only: {\"district\":\"...\", \"target_date\":\"YYYY-MM-DD\"}"
     )
-    raw = state.llm.invoke(parser_prompt)
+    raw = state.llm_scheduler.invoke(state.llm, parser_prompt, priority)
     parsed = safe_json_parse(str(raw)) or {}
     district = str(parsed.get("district", "")).strip().lower()
     target_date = str(parsed.get("target_date", "")).strip()
@@ -32,33 +42,170 @@ def extract_prediction_params(query: str, state: RuntimeState) -> Dict[str, str]
 
 
 
-def translate_to_english(text: str, source_lang: str, state: RuntimeState) -> str:
+SUPPORTED_LANGUAGES = ("en", "uz", "ru")
+# How prompts name each language; Uzbek is written in Latin script, as in src/locales/uz.json.
+LANGUAGE_NAMES = {"en": "English", "uz": "Uzbek (Latin script)", "ru": "Russian"}
+
+
+def normalize_language(language: Optional[str]) -> Optional[str]:
+    """A supported language code for ``"uz"``, ``"ru-RU"``, ``"EN"`` and the like; None for anything else."""
+    code = (language or "").strip().lower().replace("_", "-").split("-")[0]
+    return code if code in SUPPORTED_LANGUAGES else None
+
+
+def _cached_translation(
+    text: str,
+    source_lang: str,
+    target_lang: str,
+    prompt: str,
+    state: RuntimeState,
+    priority: int,
+) -> str:
+    key = (text, source_lang, target_lang)
+    cached = state.translation_cache.get(key)
+    if cached is not None:
+        return cached
+    translated = str(state.llm_scheduler.invoke(state.llm, prompt, priority)).strip()
+    state.translation_cache.put(key, translated)
+    return translated
+
+
+def translate_to_english(
+    text: str,
+    source_lang: str,
+    state: RuntimeState,
+    priority: int = PRIORITY_INTERACTIVE,
+) -> str:
     if source_lang == "en":
         return text
     prompt = (
         "Translate the following text to English.\n"
         "Return only the translated text, no comments.\n\n"
-        f"Source language: {source_lang}\n"
+        f"Source language: {LANGUAGE_NAMES.get(source_lang, source_lang)}\n"
         f"Text: {text}"
     )
-    return str(state.llm.invoke(prompt)).strip()
+    return _cached_translation(text, source_lang, "en", prompt, state, priority)
 
 
 
-def translate_from_english(text: str, target_lang: str, state: RuntimeState) -> str:
+def translate_from_english(
+    text: str,
+    target_lang: str,
+    state: RuntimeState,
+    priority: int = PRIORITY_INTERACTIVE,
+) -> str:
     if target_lang == "en":
         return text
     prompt = (
-        f"Translate the following text from English to {target_lang}.\n"
+        f"Translate the following text from English to {LANGUAGE_NAMES.get(target_lang, target_lang)}.\n"
         "Keep structure and bullet points.\n"
         "Return only translated text.\n\n"
         f"Text: {text}"
     )
-    return str(state.llm.invoke(prompt)).strip()
+    return _cached_translation(text, "en", target_lang, prompt, state, priority)
+
+
+def _placeholders(text: str) -> Optional[set[tuple[str, str, Optional[str]]]]:
+    """Replacement fields as ``(name, format_spec, conversion)``; ``{district!r}`` is not ``{district}``."""
+    try:
+        return {
+            (name, spec or "", conversion)
+            for _, name, spec, conversion in string.Formatter().parse(text)
+            if name is not None
+        }
+    except ValueError:
+        return None
+
+
+def _formats_cleanly(template: str, sample_values: Dict[str, str]) -> bool:
+    try:
+        template.format(**sample_values)
+    except Exception:
+        # Formatted exactly as /predict will format it, so no translation that passes can fail there.
+        return False
+    return True
+
+
+def _parse_json_list(raw_text: str) -> Optional[list]:
+    match = re.search(r"\[.*\]", raw_text, re.DOTALL)
+    if not match:
+        return None
+    try:
+        parsed = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return None
+    return parsed if isinstance(parsed, list) else None
+
+
+def translate_batch_from_english(
+    texts: list[str],
+    target_lang: str,
+    state: RuntimeState,
+    priority: int = PRIORITY_BATCH,
+    sample_values: Optional[Dict[str, str]] = None,
+) -> list[Optional[str]]:
+    """Translate ``texts`` with a single LLM call covering every text not already in the translation cache.
+
+    ``{placeholders}`` must come back unchanged, format specs and conversions
+    included, and given ``sample_values`` each translation must also
+    ``format`` with them. Texts whose translation is missing or fails either
+    check are None in the result and are not cached, so a later call asks for
+    those alone.
+    """
+    if target_lang == "en":
+        return list(texts)
+    translations: Dict[str, Optional[str]] = {
+        text: state.translation_cache.get((text, "en", target_lang)) for text in texts
+    }
+    missing = [text for text, translation in translations.items() if translation is None]
+    if missing:
+        prompt = (
+            f"Translate each string in this JSON array from English to {LANGUAGE_NAMES.get(target_lang, target_lang)}.\n"
+            "Keep every {placeholder} in braces exactly as written, untranslated.\n"
+            "Return only a JSON array of the translated strings, in the same order.\n\n"
+            f"{json.dumps(missing, ensure_ascii=False)}"
+        )
+        translated = _parse_json_list(str(state.llm_scheduler.invoke(state.llm, prompt, priority))) or []
+        if len(translated) == len(missing):
+            for text, translation in zip(missing, translated):
+                if not isinstance(translation, str) or not translation.strip():
+                    continue
+                if _placeholders(translation) != _placeholders(text):
+                    continue
+                if sample_values is not None and not _formats_cleanly(translation, sample_values):
+                    continue
+                translations[text] = translation.strip()
+                state.translation_cache.put((text, "en", target_lang), translations[text])
+    return [translations[text] for text in texts]
 
 
+def translate_templates(
+    templates: Dict[str, str],
+    target_lang: str,
+    state: RuntimeState,
+    priority: int = PRIORITY_BATCH,
+    sample_values: Optional[Dict[str, str]] = None,
+) -> Optional[Dict[str, str]]:
+    """``templates`` translated in one batched call, or None until every one of them has a usable translation.
 
-def explain_prediction_for_mayor(query: str, prediction: Dict[str, Any], state: RuntimeState) -> str:
+    None keeps callers on the English templates.
+    """
+    keys = list(templates)
+    translated = translate_batch_from_english(
+        [templates[key] for key in keys], target_lang, state, priority, sample_values
+    )
+    if any(translation is None for translation in translated):
+        return None
+    return dict(zip(keys, translated))
+
+
+
+def explain_prediction_for_mayor(
+    query: str,
+    prediction: Dict[str, Any],
+    state: RuntimeState,
+    priority: int = PRIORITY_BATCH,
+) -> str:
     brief_prompt = (
         "You are briefing the Mayor of Tashkent.\n"
         "Turn the prediction numbers into a concise operational warning in English.\n"
@@ -71,4 +218,276 @@ def explain_prediction_for_mayor(query: str, prediction: Dict[str, Any], state:
         f"Original question: {query}\n"
         f"Prediction data: {json.dumps(prediction, ensure_ascii=True)}"
     )
-    return str(state.llm.invoke(brief_prompt)).strip()
+    return str(state.llm_scheduler.invoke(state.llm, brief_prompt, priority)).strip()
+
+
+
+# Rough size of a Llama-family token in English/JSON text; only used for budgeting.
+CHARS_PER_TOKEN = 4
+CONTEXT_STATIONS_PER_DISTRICT = 3
+CONTEXT_CRITICAL_STATIONS = 10
+CONTEXT_SUGGESTIONS_PER_DISTRICT = 5
+DISTRICT_SUMMARY_FIELDS = (
+    "district",
+    "risk_level",
+    "risk_score",
+    "load_percentage",
+    "predicted_load_kva",
+    "current_capacity_kva",
+    "load_gap_kva",
+    "transformers_needed",
+)
+NO_FUTURE_STATE = "No future mode prediction has been generated yet."
+# Client context keys that change on every request without changing the answer.
+VOLATILE_CLIENT_CONTEXT_KEYS = ("timestamp",)
+
+
+@dataclass
+class AskPrompt:
+    query: str
+    prompt: str
+    context_hash: str
+    future_context: str = NO_FUTURE_STATE
+    client_context: Dict[str, Any] = field(default_factory=dict)
+    future_state_json: Optional[str] = None
+    context_tokens: Dict[str, Any] = field(default_factory=dict)
+    retrieval: Optional[Dict[str, Any]] = None
+    sources: list[Dict[str, Any]] = field(default_factory=list)
+    language: str = "en"
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _compact_json(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=True, separators=(",", ":"))
+
+
+def _station_summary(station: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": station.get("id"),
+        "name": station.get("name"),
+        "district": station.get("district"),
+        "capacity_kva": station.get("capacity_kva"),
+        "predicted_load_pct": station.get("predicted_load_pct"),
+    }
+
+
+def _suggestion_summary(point: Dict[str, Any]) -> Dict[str, Any]:
+    reasons = point.get("reasons") or []
+    return {
+        "id": point.get("id"),
+        "district": point.get("district"),
+        "expected_load_kva": point.get("expected_load_kva"),
+        "load_gap_kva": point.get("load_gap_kva"),
+        "cluster_load_gap_kva": point.get("cluster_load_gap_kva"),
+        "anchor_station_id": point.get("anchor_station_id"),
+        "action": reasons[-1] if reasons else point.get("why_summary"),
+    }
+
+
+def summarize_future_state(future_state: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce a future-mode state to a digest whose size depends on the district count, not the fleet.
+
+    Built once per prediction; ``/ask`` then assembles prompts from the digest
+    alone. Keeps per-district aggregates with their most loaded stations, the
+    fleet-wide critical stations and a few TP suggestions per district.
+    """
+    stations = future_state.get("station_predictions") or []
+    district_stations: Dict[str, Dict[str, Any]] = {}
+    for station in stations:
+        district = str(station.get("district", "")).strip().lower()
+        entry = district_stations.setdefault(district, {"count": 0, "overloaded": 0, "pct_sum": 0.0, "top": []})
+        load_pct = float(station.get("predicted_load_pct") or 0.0)
+        entry["count"] += 1
+        entry["overloaded"] += load_pct >= 100
+        entry["pct_sum"] += load_pct
+        # Min-heap of (load pct, -position) keeps a stable descending order like sorted().
+        heapq.heappush(entry["top"], (load_pct, -entry["count"], station))
+        if len(entry["top"]) > CONTEXT_STATIONS_PER_DISTRICT:
+            heapq.heappop(entry["top"])
+
+    suggestions: Dict[str, list[Dict[str, Any]]] = {}
+    for point in future_state.get("suggested_tps") or []:
+        district = str(point.get("district", "")).strip().lower()
+        suggestions.setdefault(district, []).append(_suggestion_summary(point))
+
+    districts = []
+    for prediction in future_state.get("district_predictions") or []:
+        district = str(prediction.get("district", "")).strip().lower()
+        summary = {field: prediction.get(field) for field in DISTRICT_SUMMARY_FIELDS}
+        station_entry = district_stations.get(district)
+        if station_entry:
+            summary["stations"] = station_entry["count"]
+            summary["overloaded_stations"] = station_entry["overloaded"]
+            summary["avg_station_load_pct"] = round(station_entry["pct_sum"] / station_entry["count"], 1)
+            summary["top_stations"] = [
+                _station_summary(station) for _, _, station in sorted(station_entry["top"], reverse=True)
+            ]
+        district_suggestions = sorted(
+            suggestions.get(district, []),
+            key=lambda point: point.get("cluster_load_gap_kva") or 0,
+            reverse=True,
+        )
+        summary["suggested_tp_count"] = len(district_suggestions)
+        summary["suggested_tps"] = district_suggestions[:CONTEXT_SUGGESTIONS_PER_DISTRICT]
+        districts.append(summary)
+
+    if stations:
+        critical = heapq.nlargest(
+            CONTEXT_CRITICAL_STATIONS, stations, key=lambda station: float(station.get("predicted_load_pct") or 0.0)
+        )
+    else:
+        critical = future_state.get("critical_priority") or []
+
+    return {
+        "target_date": future_state.get("target_date"),
+        "generated_at": future_state.get("generated_at"),
+        "total_transformers_needed": future_state.get("total_transformers_needed"),
+        "station_count": len(stations) or future_state.get("station_count"),
+        "districts": districts,
+        "critical_stations": [_station_summary(station) for station in critical],
+    }
+
+
+def mentioned_districts(query: str, districts: Iterable[str]) -> list[str]:
+    lowered = query.lower()
+    return [district for district in districts if district and district in lowered]
+
+
+def build_future_context(
+    digest: Optional[Dict[str, Any]],
+    query: str,
+    token_budget: int,
+) -> tuple[str, Dict[str, Any]]:
+    """Fill ``token_budget`` with the parts of ``digest`` most relevant to ``query``.
+
+    Districts named in the question come first with their TP suggestions, then
+    the remaining districts by risk, then critical stations. Suggestions for
+    districts the question does not name are only used when it names none.
+    Returns the context text and a report of what was included.
+    """
+    if not digest:
+        return NO_FUTURE_STATE, {"tokens": estimate_tokens(NO_FUTURE_STATE), "focus_districts": []}
+
+    districts = digest.get("districts") or []
+    focus = mentioned_districts(query, [entry["district"] for entry in districts])
+    ranked = sorted(
+        districts,
+        key=lambda entry: (
+            entry["district"] not in focus,
+            -float(entry.get("risk_score") or 0),
+            -float(entry.get("load_percentage") or 0),
+        ),
+    )
+
+    context: Dict[str, Any] = {
+        "target_date": digest.get("target_date"),
+        "total_transformers_needed": digest.get("total_transformers_needed"),
+        "station_count": digest.get("station_count"),
+        "focus_districts": focus,
+        "districts": [],
+        "critical_stations": [],
+        "suggested_tps": [],
+    }
+    used = estimate_tokens(_compact_json(context))
+    truncated = False
+
+    def fits(item: Any) -> bool:
+        nonlocal used, truncated
+        # +1 for the separating comma.
+        cost = estimate_tokens(_compact_json(item)) + 1
+        if used + cost > token_budget:
+            truncated = True
+            return False
+        used += cost
+        return True
+
+    candidates: list[tuple[str, Dict[str, Any]]] = []
+    for entry in ranked:
+        summary = {key: value for key, value in entry.items() if key != "suggested_tps"}
+        if entry["district"] not in focus:
+            summary.pop("top_stations", None)
+        candidates.append(("districts", summary))
+        if entry["district"] in focus:
+            candidates.extend(("suggested_tps", point) for point in entry.get("suggested_tps") or [])
+    candidates.extend(("critical_stations", station) for station in digest.get("critical_stations") or [])
+    if not focus:
+        general = sorted(
+            (point for entry in districts for point in entry.get("suggested_tps") or []),
+            key=lambda point: point.get("cluster_load_gap_kva") or 0,
+            reverse=True,
+        )
+        candidates.extend(("suggested_tps", point) for point in general)
+
+    for section, item in candidates:
+        if fits(item):
+            context[section].append(item)
+
+    text = _compact_json(context)
+    return text, {
+        "tokens": estimate_tokens(text),
+        "focus_districts": focus,
+        "districts": len(context["districts"]),
+        "critical_stations": len(context["critical_stations"]),
+        "suggested_tps": len(context["suggested_tps"]),
+        "truncated": truncated,
+    }
+
+
+def split_client_context(context_snapshot: Dict[str, Any]) -> tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """Separate the client's echo of the /predict payload from the rest of its context snapshot.
+
+    The echo repeats the full station list, so it never goes into the prompt
+    verbatim; it is only summarized when the server holds no future state.
+    """
+    future_summary = context_snapshot.get("futureSummary")
+    remaining = {key: value for key, value in context_snapshot.items() if key != "futureSummary"}
+    return remaining, future_summary if isinstance(future_summary, dict) else None
+
+
+def format_excerpts(chunks: Iterable[Any], max_chars: int) -> str:
+    """Number retrieved chunks as ``[n] label: text`` lines, each cut to ``max_chars``."""
+    lines = []
+    for position, chunk in enumerate(chunks, start=1):
+        text = " ".join(chunk.text.split())
+        if len(text) > max_chars:
+            text = text[:max_chars].rsplit(" ", 1)[0] + " ..."
+        lines.append(f"[{position}] {chunk.label}: {text}")
+    return "\n".join(lines)
+
+
+def build_ask_prompt(
+    query: str,
+    future_context: str,
+    context_snapshot: Dict[str, Any],
+    excerpts: str = "",
+    language: str = "en",
+) -> str:
+    grounding = ""
+    if excerpts:
+        grounding = (
+            "Regulatory excerpts (ground legal and regulatory statements in these and cite them as [n]):\n"
+            f"{excerpts}\n"
+        )
+    return (
+        "You are Grid AI Assistant for Tashkent power planning.\n"
+        f"Always answer in {LANGUAGE_NAMES[language]}.\n"
+        "Use the future mode state and context snapshot as the source of truth when available.\n"
+        "Keep responses practical, concise, and operations-focused.\n"
+        "If the user asks for prediction guidance, give a short summary and concrete action.\n"
+        "Do not invent missing metrics; say when data is unavailable.\n\n"
+        f"Future mode state: {future_context}\n"
+        f"Client context snapshot: {json.dumps(context_snapshot, ensure_ascii=True)}\n"
+        f"{grounding}"
+        f"User question: {query}\n"
+        "Assistant response:"
+    )
+
+
+def answer_context_hash(future_context: str, context_snapshot: Dict[str, Any], language: str = "en") -> str:
+    """Fingerprint of everything in the prompt except the question, for the answer cache."""
+    stable = {key: value for key, value in context_snapshot.items() if key not in VOLATILE_CLIENT_CONTEXT_KEYS}
+    payload = f"{language}\n{future_context}\n{json.dumps(stable, ensure_ascii=True, sort_keys=True, default=str)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
@@ -1,89 +1,159 @@
 import asyncio
+import heapq
 import math
 import random
 from datetime import date, datetime
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, Iterator, Optional
 
+import numpy as np
+
+from server.history import DistrictHistory
 from server.state import RuntimeState
+from server.station_registry import StationRegistry
 from server.utils import parse_target_date
 
 
 
-def predict_grid_load(state: RuntimeState, district: str, target_date: str) -> Dict[str, Any]:
-    district_key = district.strip().lower()
-    district_rows = state.district_df[state.district_df["district"] == district_key]
-    if district_rows.empty:
-        raise ValueError(f"Unknown district: {district}")
+MODEL_FEATURE_COLUMNS = [
+    "district_rating",
+    "population_density",
+    "avg_temp",
+    "asset_age",
+    "commercial_infra_count",
+]
 
-    current = district_rows.sort_values("snapshot_date").iloc[-1]
-    target = parse_target_date(target_date)
+NUM_TRANSFORMERS_PER_DISTRICT = 5
+AVG_TRANSFORMER_CAPACITY_MW = 0.075
+
+
+def _months_ahead(target: date) -> int:
     today = date.today()
-    months_ahead = max(1, (target.year - today.year) * 12 + (target.month - today.month))
+    return max(1, (target.year - today.year) * 12 + (target.month - today.month))
 
-    features = [
-        float(current["district_rating"]),
-        float(current["population_density"]),
-        float(current["avg_temp"]),
-        float(current["asset_age"]),
-        float(current["commercial_infra_count"]),
-        float(months_ahead),
-    ]
 
-    predicted_load_mw = float(state.model.predict([features])[0])
-    current_capacity_mw = float(current["current_capacity_mw"])
+def _latest_district_rows(state: RuntimeState, districts: list[str]) -> tuple[list[str], list[Dict[str, Any]]]:
+    district_keys = []
+    latest_rows = []
+    for district in districts:
+        district_key = district.strip().lower()
+        history = state.district_history.get(district_key)
+        if history is None:
+            raise ValueError(f"Unknown district: {district}")
+        district_keys.append(district_key)
+        latest_rows.append(history.latest)
+    return district_keys, latest_rows
 
-    num_transformers_per_district = 5
-    avg_transformer_capacity_mw = 0.075
 
-    scaling_factor = (num_transformers_per_district * avg_transformer_capacity_mw) / max(current_capacity_mw, 1e-6)
+def _predict_load_matrix(
+    state: RuntimeState,
+    latest_rows: list[Dict[str, Any]],
+    months_ahead: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """Run one model call over districts x horizons and derive the load metrics.
+
+    Every returned array has shape ``(len(latest_rows), len(months_ahead))``.
+    """
+    horizons = len(months_ahead)
+    base_features = np.array(
+        [[float(row[column]) for column in MODEL_FEATURE_COLUMNS] for row in latest_rows],
+        dtype=float,
+    )
+    features = np.column_stack(
+        [
+            np.repeat(base_features, horizons, axis=0),
+            np.tile(np.asarray(months_ahead, dtype=float), len(latest_rows)),
+        ]
+    )
+    predicted_load_mw = np.asarray(state.model.predict(features), dtype=float).reshape(len(latest_rows), horizons)
+    current_capacity_mw = np.array([[float(row["current_capacity_mw"])] for row in latest_rows], dtype=float)
+    tp_capacity_mw = np.array([[float(row.get("avg_tp_capacity_mw", 2.5))] for row in latest_rows], dtype=float)
+
+    scaling_factor = (NUM_TRANSFORMERS_PER_DISTRICT * AVG_TRANSFORMER_CAPACITY_MW) / np.maximum(current_capacity_mw, 1e-6)
     predicted_load = predicted_load_mw * scaling_factor
-    current_capacity = current_capacity_mw * scaling_factor
+    current_capacity = np.broadcast_to(current_capacity_mw * scaling_factor, predicted_load.shape)
 
     load_gap = predicted_load - current_capacity
-    utilization = predicted_load / max(current_capacity, 1e-6)
+    utilization = predicted_load / np.maximum(current_capacity, 1e-6)
     load_percentage = utilization * 100
-    risk_score = max(1, min(10, math.ceil(utilization * 8)))
-    if load_gap > 0:
-        risk_score = min(10, risk_score + 1)
-    risk_level = "Low" if risk_score <= 4 else "Medium" if risk_score <= 7 else "High"
-
-    tp_capacity_mw = float(current.get("avg_tp_capacity_mw", 2.5))
-    tps_needed = max(0, math.ceil(load_gap / max(tp_capacity_mw * scaling_factor, 0.1)))
+    risk_score = np.clip(np.ceil(utilization * 8), 1, 10)
+    risk_score = np.where(load_gap > 0, np.minimum(10, risk_score + 1), risk_score)
+    tps_needed = np.maximum(0, np.ceil(load_gap / np.maximum(tp_capacity_mw * scaling_factor, 0.1)))
 
     return {
-        "district": district,
-        "target_date": target.isoformat(),
-        "months_ahead": months_ahead,
-        "predicted_load_kva": round(predicted_load * 1000, 2),
-        "current_capacity_kva": round(current_capacity * 1000, 2),
-        "load_gap_kva": round(load_gap * 1000, 2),
-        "predicted_load_mw": round(predicted_load, 2),
-        "current_capacity_mw": round(current_capacity, 2),
-        "load_gap_mw": round(load_gap, 2),
-        "load_percentage": round(load_percentage, 2),
-        "risk_level": risk_level,
-        "risk_score": int(risk_score),
-        "transformers_needed": int(tps_needed),
-        "affecting_factors": {
-            "district_rating": float(current["district_rating"]),
-            "population_density": float(current["population_density"]),
-            "avg_temp": float(current["avg_temp"]),
-            "asset_age": float(current["asset_age"]),
-            "commercial_infra_count": float(current["commercial_infra_count"]),
-            "months_ahead": months_ahead,
-        },
-        "feature_projection": _build_feature_projection(state, district_key, months_ahead),
+        "predicted_load": predicted_load,
+        "current_capacity": current_capacity,
+        "load_gap": load_gap,
+        "load_percentage": load_percentage,
+        "risk_score": risk_score,
+        "transformers_needed": tps_needed,
     }
 
 
+def predict_grid_loads(state: RuntimeState, districts: list[str], target_date: str) -> list[Dict[str, Any]]:
+    """Predict grid load for several districts with a single model call."""
+    target = parse_target_date(target_date)
+    months_ahead = _months_ahead(target)
+
+    district_keys, latest_rows = _latest_district_rows(state, districts)
+    if not latest_rows:
+        return []
+
+    metrics = _predict_load_matrix(state, latest_rows, np.array([months_ahead]))
+    predicted_load = metrics["predicted_load"][:, 0]
+    current_capacity = metrics["current_capacity"][:, 0]
+    load_gap = metrics["load_gap"][:, 0]
+    load_percentage = metrics["load_percentage"][:, 0]
+    risk_score = metrics["risk_score"][:, 0]
+    tps_needed = metrics["transformers_needed"][:, 0]
+
+    predictions = []
+    for index, (district, district_key, current) in enumerate(zip(districts, district_keys, latest_rows)):
+        # Python round() keeps the payload byte-identical to the per-district path.
+        district_risk = int(risk_score[index])
+        risk_level = "Low" if district_risk <= 4 else "Medium" if district_risk <= 7 else "High"
+        predictions.append(
+            {
+                "district": district,
+                "target_date": target.isoformat(),
+                "months_ahead": months_ahead,
+                "predicted_load_kva": round(float(predicted_load[index]) * 1000, 2),
+                "current_capacity_kva": round(float(current_capacity[index]) * 1000, 2),
+                "load_gap_kva": round(float(load_gap[index]) * 1000, 2),
+                "predicted_load_mw": round(float(predicted_load[index]), 2),
+                "current_capacity_mw": round(float(current_capacity[index]), 2),
+                "load_gap_mw": round(float(load_gap[index]), 2),
+                "load_percentage": round(float(load_percentage[index]), 2),
+                "risk_level": risk_level,
+                "risk_score": district_risk,
+                "transformers_needed": int(tps_needed[index]),
+                "affecting_factors": {
+                    "district_rating": float(current["district_rating"]),
+                    "population_density": float(current["population_density"]),
+                    "avg_temp": float(current["avg_temp"]),
+                    "asset_age": float(current["asset_age"]),
+                    "commercial_infra_count": float(current["commercial_infra_count"]),
+                    "months_ahead": months_ahead,
+                },
+                "feature_projection": _build_feature_projection(state, district_key, months_ahead),
+            }
+        )
+
+    return predictions
+
+
+def predict_grid_load(state: RuntimeState, district: str, target_date: str) -> Dict[str, Any]:
+    return predict_grid_loads(state, [district], target_date)[0]
+
+
 
 def district_factor_trends(state: RuntimeState, district: str) -> Dict[str, float]:
-    rows = state.district_df[state.district_df["district"] == district].sort_values("snapshot_date").tail(24)
-    if len(rows) < 12:
+    history = state.district_history.get(district)
+    if history is None or len(history) < 12:
         return {"population_pct": 0.0, "commercial_pct": 0.0}
 
-    recent = rows.tail(12)
-    previous = rows.head(len(rows) - 12).tail(12)
+    population = history.column("population_density")[-24:]
+    commercial = history.column("commercial_infra_count")[-24:]
+    split = len(population) - 12
 
     def pct_change(new_val: float, old_val: float) -> float:
         if abs(old_val) < 1e-6:
@@ -93,15 +163,15 @@ def district_factor_trends(state: RuntimeState, district: str) -> Dict[str, floa
     return {
         "population_pct": round(
             pct_change(
-                float(recent["population_density"].mean()),
-                float(previous["population_density"].mean()),
+                float(np.nanmean(population[split:])),
+                float(np.nanmean(population[:split][-12:])),
             ),
             1,
         ),
         "commercial_pct": round(
             pct_change(
-                float(recent["commercial_infra_count"].mean()),
-                float(previous["commercial_infra_count"].mean()),
+                float(np.nanmean(commercial[split:])),
+                float(np.nanmean(commercial[:split][-12:])),
             ),
             1,
         ),
@@ -109,13 +179,51 @@ def district_factor_trends(state: RuntimeState, district: str) -> Dict[str, floa
 
 
 
-def seasonal_pressure_note(target_date_iso: str) -> str:
+# Fixed wording of the TP suggestion explanations. Values are formatted before
+# substitution, so a translated template only has to keep its {placeholders}.
+EXPLANATION_TEMPLATES: Dict[str, str] = {
+    "why_summary": (
+        "By {target_date}, projected demand reaches {expected_load} kVA against {capacity} kVA capacity "
+        "({load_pct}% utilization)."
+    ),
+    "reason_shortfall": (
+        "Capacity shortfall is {load_gap} kVA on {target_date}; this point covers ~{cluster_gap} kVA of that deficit."
+    ),
+    "reason_overload": (
+        "In {district_title}, about {overloaded_tp_count} of {current_tp_count} current transformers "
+        "are likely to run above safe limits at peak hours, increasing outage/shutdown risk."
+    ),
+    "reason_trajectory": (
+        "Model input trajectory for this date: district rating {district_rating_shift}, "
+        "population density {density_shift} people/km2, average temperature {temp_shift}C, "
+        "asset age {age_shift} years, commercial infrastructure count {commercial_shift}, "
+        "months_since_start {months_since_start}. {season_note}"
+    ),
+    "reason_action": (
+        "Recommended action: add {transformers_needed} new TP unit(s) in this cluster by {target_date} "
+        "to close the projected deficit and keep utilization within safe limits."
+    ),
+    "season_summer": "Summer cooling demand is expected to increase grid stress.",
+    "season_winter": "Winter heating demand is expected to increase grid stress.",
+    "season_baseline": "Baseline seasonal demand still contributes to elevated peak load.",
+    "label_installation": "Proposed Installation: {district}",
+    "label_date": "Date: {target_date}",
+    "label_expected_load": "Expected Load: {expected_load} kVA",
+}
+REASON_TEMPLATE_KEYS = ("reason_shortfall", "reason_overload", "reason_trajectory", "reason_action")
+
+
+def _season_key(target_date_iso: str) -> str:
     month = datetime.strptime(target_date_iso, "%Y-%m-%d").month
     if month in (6, 7, 8):
-        return "Summer cooling demand is expected to increase grid stress."
+        return "season_summer"
     if month in (12, 1, 2):
-        return "Winter heating demand is expected to increase grid stress."
-    return "Baseline seasonal demand still contributes to elevated peak load."
+        return "season_winter"
+    return "season_baseline"
+
+
+def seasonal_pressure_note(target_date_iso: str) -> str:
+    return EXPLANATION_TEMPLATES[_season_key(target_date_iso)]
 
 
 
@@ -143,23 +251,33 @@ def _point_within_radius_km(center: list[float], min_km: float, max_km: float) -
     return [round(lat + delta_lat, 6), round(lon + delta_lon, 6)]
 
 
+def _feature_trend(history: DistrictHistory, column: str) -> tuple[float, float] | None:
+    """Return (latest value, average monthly change) over the last 12 valid snapshots."""
+    values = history.column(column)
+    series = values[~np.isnan(values)][-12:]
+    if series.size == 0:
+        return None
+
+    current = float(series[-1])
+    if len(series) >= 2:
+        monthly_change = (float(series[-1]) - float(series[0])) / float(len(series) - 1)
+    else:
+        monthly_change = 0.0
+    return current, monthly_change
+
+
 def _project_feature_value(
-    district_rows,
+    history: DistrictHistory,
     column: str,
     months_ahead: int,
     min_value: float | None = None,
     max_value: float | None = None,
 ) -> Dict[str, float]:
-    series = district_rows[column].astype(float).dropna().tail(12)
-    if series.empty:
+    trend = _feature_trend(history, column)
+    if trend is None:
         return {"current": 0.0, "projected": 0.0, "delta": 0.0}
 
-    current = float(series.iloc[-1])
-    if len(series) >= 2:
-        monthly_change = (float(series.iloc[-1]) - float(series.iloc[0])) / float(len(series) - 1)
-    else:
-        monthly_change = 0.0
-
+    current, monthly_change = trend
     projected = current + (monthly_change * months_ahead)
     if min_value is not None:
         projected = max(min_value, projected)
@@ -174,18 +292,18 @@ def _project_feature_value(
 
 
 def _build_feature_projection(state: RuntimeState, district: str, months_ahead: int) -> Dict[str, Any]:
-    district_rows = state.district_df[state.district_df["district"] == district].sort_values("snapshot_date")
-    if district_rows.empty:
+    history = state.district_history.get(district)
+    if history is None:
         return {"months_since_start": months_ahead}
 
-    district_rating = _project_feature_value(district_rows, "district_rating", months_ahead, min_value=1.0, max_value=5.0)
-    population_density = _project_feature_value(district_rows, "population_density", months_ahead, min_value=0.0)
-    avg_temp = _project_feature_value(district_rows, "avg_temp", months_ahead, min_value=-40.0, max_value=60.0)
-    asset_age = _project_feature_value(district_rows, "asset_age", months_ahead, min_value=0.0)
+    district_rating = _project_feature_value(history, "district_rating", months_ahead, min_value=1.0, max_value=5.0)
+    population_density = _project_feature_value(history, "population_density", months_ahead, min_value=0.0)
+    avg_temp = _project_feature_value(history, "avg_temp", months_ahead, min_value=-40.0, max_value=60.0)
+    asset_age = _project_feature_value(history, "asset_age", months_ahead, min_value=0.0)
     # Asset age naturally advances with time, even if historical trend is flat.
     asset_age["projected"] = max(asset_age["projected"], asset_age["current"] + (months_ahead / 12.0))
     asset_age["delta"] = asset_age["projected"] - asset_age["current"]
-    commercial_infra_count = _project_feature_value(district_rows, "commercial_infra_count", months_ahead, min_value=0.0)
+    commercial_infra_count = _project_feature_value(history, "commercial_infra_count", months_ahead, min_value=0.0)
 
     return {
         "district_rating": district_rating,
@@ -197,6 +315,47 @@ def _build_feature_projection(state: RuntimeState, district: str, months_ahead:
     }
 
 
+def _project_feature_series(
+    history: DistrictHistory,
+    column: str,
+    months_ahead: np.ndarray,
+    min_value: float | None = None,
+    max_value: float | None = None,
+) -> np.ndarray:
+    trend = _feature_trend(history, column)
+    if trend is None:
+        return np.zeros(len(months_ahead), dtype=float)
+
+    current, monthly_change = trend
+    projected = current + (monthly_change * months_ahead)
+    if min_value is not None:
+        projected = np.maximum(min_value, projected)
+    if max_value is not None:
+        projected = np.minimum(max_value, projected)
+    return projected
+
+
+def _build_feature_projection_range(history: DistrictHistory, months_ahead: np.ndarray) -> Dict[str, np.ndarray]:
+    """Vectorized _build_feature_projection over many horizons; returns projected values only."""
+    asset_age = _project_feature_series(history, "asset_age", months_ahead, min_value=0.0)
+    asset_age_trend = _feature_trend(history, "asset_age")
+    current_asset_age = asset_age_trend[0] if asset_age_trend is not None else 0.0
+    # Asset age naturally advances with time, even if historical trend is flat.
+    asset_age = np.maximum(asset_age, current_asset_age + (months_ahead / 12.0))
+
+    return {
+        "district_rating": _project_feature_series(
+            history, "district_rating", months_ahead, min_value=1.0, max_value=5.0
+        ),
+        "population_density": _project_feature_series(history, "population_density", months_ahead, min_value=0.0),
+        "avg_temp": _project_feature_series(history, "avg_temp", months_ahead, min_value=-40.0, max_value=60.0),
+        "asset_age": asset_age,
+        "commercial_infra_count": _project_feature_series(
+            history, "commercial_infra_count", months_ahead, min_value=0.0
+        ),
+    }
+
+
 def _fmt_feature_shift(feature: Dict[str, float], decimals: int = 1) -> str:
     current = round(float(feature.get("current", 0.0)), decimals)
     projected = round(float(feature.get("projected", 0.0)), decimals)
@@ -205,21 +364,24 @@ def _fmt_feature_shift(feature: Dict[str, float], decimals: int = 1) -> str:
     return f"{current} -> {projected} ({sign}{delta})"
 
 
-def _build_station_future_projection(
-    stations: list[Dict[str, Any]],
-    district_prediction_map: Dict[str, Dict[str, Any]],
-) -> list[Dict[str, Any]]:
+def _district_average_weights(stations: Iterable[Dict[str, Any]]) -> Dict[str, float]:
     district_weights: Dict[str, list[float]] = {}
     for station in stations:
         district = str(station.get("district", "")).strip().lower()
         district_weights.setdefault(district, []).append(_safe_float(station.get("load_weight"), 50.0))
 
-    district_avg_weight = {
+    return {
         district: (sum(weights) / max(1, len(weights)))
         for district, weights in district_weights.items()
     }
 
-    projected_stations = []
+
+def _iter_station_future_projection(
+    stations: Iterable[Dict[str, Any]],
+    district_prediction_map: Dict[str, Dict[str, Any]],
+) -> Iterator[Dict[str, Any]]:
+    district_avg_weight = _district_average_weights(stations)
+
     for station in stations:
         district_key = str(station.get("district", "")).strip().lower()
         district_prediction = district_prediction_map.get(district_key, {})
@@ -231,38 +393,33 @@ def _build_station_future_projection(
         predicted_load_pct = _clamp(district_load_pct * scaling_factor, 0.0, 180.0)
 
         capacity_kva = max(1.0, _safe_float(station.get("capacity_kva"), 100.0))
-        projected_stations.append(
-            {
-                "id": station.get("id"),
-                "name": station.get("name"),
-                "district": district_key,
-                "district_label": station.get("district"),
-                "coordinates": station.get("coordinates"),
-                "capacity_kva": capacity_kva,
-                "predicted_load_pct": round(predicted_load_pct, 2),
-                "predicted_load_kva": round((predicted_load_pct / 100.0) * capacity_kva, 2),
-            }
-        )
+        yield {
+            "id": station.get("id"),
+            "name": station.get("name"),
+            "district": district_key,
+            "district_label": station.get("district"),
+            "coordinates": station.get("coordinates"),
+            "capacity_kva": capacity_kva,
+            "predicted_load_pct": round(predicted_load_pct, 2),
+            "predicted_load_kva": round((predicted_load_pct / 100.0) * capacity_kva, 2),
+        }
 
-    return projected_stations
 
-
-def _build_proximity_suggestions(
-    stations_future: list[Dict[str, Any]],
+def _build_station_future_projection(
+    stations: Iterable[Dict[str, Any]],
     district_prediction_map: Dict[str, Dict[str, Any]],
 ) -> list[Dict[str, Any]]:
-    suggestions: list[Dict[str, Any]] = []
-    counters: Dict[str, int] = {}
+    return list(_iter_station_future_projection(stations, district_prediction_map))
 
-    # Only use overloaded stations as anchor points for new TP suggestions.
-    anchor_threshold = 100.0
-    stressed_anchors = [
-        station for station in stations_future if station["predicted_load_pct"] >= anchor_threshold
-    ]
-    district_to_anchors: Dict[str, list[Dict[str, Any]]] = {}
-    for anchor in stressed_anchors:
-        district_to_anchors.setdefault(anchor["district"], []).append(anchor)
 
+# Only overloaded stations are used as anchor points for new TP suggestions.
+ANCHOR_THRESHOLD_PCT = 100.0
+
+
+def _iter_district_suggestions(
+    district_to_anchors: Dict[str, list[Dict[str, Any]]],
+    district_prediction_map: Dict[str, Dict[str, Any]],
+) -> Iterator[tuple[str, list[Dict[str, Any]]]]:
     for district, prediction in district_prediction_map.items():
         load_gap_kva = _safe_float(prediction.get("load_gap_kva"), 0.0)
         transformers_needed = int(prediction.get("transformers_needed", 0))
@@ -282,17 +439,16 @@ def _build_proximity_suggestions(
         if months_ahead >= 24:
             suggestion_count += max(1, int(math.ceil(transformers_needed * 0.15)))
 
+        suggestions = []
         for index in range(suggestion_count):
             anchor = anchors[index % len(anchors)]
             anchor_coordinates = anchor.get("coordinates") or [41.3111, 69.2797]
             if len(anchor_coordinates) != 2:
                 anchor_coordinates = [41.3111, 69.2797]
 
-            counters[district] = counters.get(district, 0) + 1
-            suggestion_id = f"{district}-tp-{counters[district]}"
             suggestions.append(
                 {
-                    "id": suggestion_id,
+                    "id": f"{district}-tp-{index + 1}",
                     "district": district,
                     "coordinates": _point_within_radius_km(anchor_coordinates, min_km=0.2, max_km=0.5),
                     "cluster_share_pct": round(100.0 / max(1, suggestion_count), 1),
@@ -301,17 +457,226 @@ def _build_proximity_suggestions(
                     "anchor_predicted_load_pct": anchor["predicted_load_pct"],
                 }
             )
+        yield district, suggestions
+
+
+def _build_proximity_suggestions(
+    stations_future: list[Dict[str, Any]],
+    district_prediction_map: Dict[str, Dict[str, Any]],
+) -> list[Dict[str, Any]]:
+    district_to_anchors: Dict[str, list[Dict[str, Any]]] = {}
+    for station in stations_future:
+        if station["predicted_load_pct"] >= ANCHOR_THRESHOLD_PCT:
+            district_to_anchors.setdefault(station["district"], []).append(station)
 
+    suggestions: list[Dict[str, Any]] = []
+    for _, district_suggestions in _iter_district_suggestions(district_to_anchors, district_prediction_map):
+        suggestions.extend(district_suggestions)
     return suggestions
 
 
+def _describe_tp_suggestion(
+    point: Dict[str, Any],
+    district_prediction: Dict[str, Any],
+    target_date: str,
+    district_tp_count: int,
+) -> None:
+    """Attach load figures, reasons and the recommendation text to a TP suggestion in place."""
+    feature_projection = district_prediction.get("feature_projection", {})
+
+    predicted_load_kva = float(district_prediction.get("predicted_load_kva", 0))
+    current_capacity_kva = float(district_prediction.get("current_capacity_kva", 0))
+    load_gap_kva = float(district_prediction.get("load_gap_kva", 0))
+    load_percentage = float(district_prediction.get("load_percentage", 0))
+    cluster_share_pct = float(point.get("cluster_share_pct", 0.0))
+
+    predicted_load_kva = 0 if predicted_load_kva != predicted_load_kva else predicted_load_kva
+    current_capacity_kva = 0 if current_capacity_kva != current_capacity_kva else current_capacity_kva
+    load_gap_kva = 0 if load_gap_kva != load_gap_kva else load_gap_kva
+    load_percentage = 0 if load_percentage != load_percentage else load_percentage
+    load_gap_kva = max(0.0, load_gap_kva)
+
+    point["target_date"] = district_prediction.get("target_date", target_date)
+    point["expected_load_kva"] = round(float(predicted_load_kva), 1)
+    point["expected_load_mw"] = round(float(predicted_load_kva / 1000), 2)
+    point["current_capacity_kva"] = round(float(current_capacity_kva), 1)
+    point["current_capacity_mw"] = round(float(current_capacity_kva / 1000), 2)
+    point["load_gap_kva"] = round(float(load_gap_kva), 1)
+    point["load_gap_mw"] = round(float(load_gap_kva / 1000), 2)
+    point["load_percentage"] = round(float(load_percentage), 2)
+    point["transformers_needed"] = int(district_tp_count)
+    point["cluster_load_gap_kva"] = round((cluster_share_pct / 100.0) * max(load_gap_kva, 0.0), 1)
+
+    expected_load_display = int(point["expected_load_kva"]) if point["expected_load_kva"] >= 0 else 0
+    current_capacity_display = int(point["current_capacity_kva"]) if point["current_capacity_kva"] >= 0 else 0
+    load_pct_display = point["load_percentage"] if point["load_percentage"] >= 0 else 0
+
+    current_tp_count = 5
+    overloaded_tp_count = min(
+        current_tp_count,
+        max(0, int(math.ceil((load_gap_kva / max(current_capacity_kva, 1)) * current_tp_count))),
+    )
+
+    point["explanation_values"] = {
+        "target_date": point["target_date"],
+        "district": point["district"],
+        "district_title": point["district"].title(),
+        "expected_load": str(expected_load_display),
+        "capacity": str(current_capacity_display),
+        "load_pct": str(load_pct_display),
+        "load_gap": f"{point['load_gap_kva']:.0f}",
+        "cluster_gap": f"{point['cluster_load_gap_kva']:.0f}",
+        "overloaded_tp_count": str(overloaded_tp_count),
+        "current_tp_count": str(current_tp_count),
+        "district_rating_shift": _fmt_feature_shift(feature_projection.get("district_rating", {}), decimals=1),
+        "density_shift": _fmt_feature_shift(feature_projection.get("population_density", {}), decimals=0),
+        "temp_shift": _fmt_feature_shift(feature_projection.get("avg_temp", {}), decimals=1),
+        "age_shift": _fmt_feature_shift(feature_projection.get("asset_age", {}), decimals=1),
+        "commercial_shift": _fmt_feature_shift(feature_projection.get("commercial_infra_count", {}), decimals=0),
+        "months_since_start": str(
+            int(feature_projection.get("months_since_start", district_prediction.get("months_ahead", 1)))
+        ),
+        "season": _season_key(point["target_date"]),
+        "transformers_needed": str(point["transformers_needed"]),
+    }
+    render_tp_explanation(point, EXPLANATION_TEMPLATES)
+
+
+def render_tp_explanation(point: Dict[str, Any], templates: Dict[str, str]) -> None:
+    """Fill ``why_summary``, ``reasons`` and ``recommendation`` from the point's explanation values."""
+    values = _template_values(point["explanation_values"], templates)
+    point["why_summary"] = templates["why_summary"].format(**values)
+    point["reasons"] = [templates[key].format(**values) for key in REASON_TEMPLATE_KEYS]
+    point["recommendation"] = (
+        f"{templates['label_installation'].format(**values)}\n\n"
+        f"{templates['label_date'].format(**values)}\n\n"
+        f"{templates['label_expected_load'].format(**values)}\n\n"
+        f"{point['why_summary']}\n\n"
+        + "\n".join(f"{i + 1}. {reason}" for i, reason in enumerate(point["reasons"]))
+    )
+
+
+def _template_values(explanation_values: Dict[str, str], templates: Dict[str, str]) -> Dict[str, str]:
+    return {**explanation_values, "season_note": templates[explanation_values["season"]]}
+
+
+def sample_explanation_values() -> Dict[str, str]:
+    """The values ``EXPLANATION_TEMPLATES`` are formatted with, for a made-up summer TP suggestion.
+
+    Built by the same code as real suggestions, so translated templates can be
+    test-formatted against every key and value type they will meet.
+    """
+    point = {"district": "chilonzor", "cluster_share_pct": 40.0}
+    district_prediction = {
+        "target_date": "2027-07-15",
+        "predicted_load_kva": 12500.0,
+        "current_capacity_kva": 10000.0,
+        "load_gap_kva": 2500.0,
+        "load_percentage": 125.0,
+        "months_ahead": 9,
+        "feature_projection": {
+            "district_rating": {"current": 7.2, "projected": 7.5, "delta": 0.3},
+            "population_density": {"current": 11800, "projected": 12400, "delta": 600},
+            "avg_temp": {"current": 28.1, "projected": 29.0, "delta": 0.9},
+            "asset_age": {"current": 18.0, "projected": 18.8, "delta": 0.8},
+            "commercial_infra_count": {"current": 410, "projected": 436, "delta": 26},
+            "months_since_start": 9,
+        },
+    }
+    _describe_tp_suggestion(point, district_prediction, district_prediction["target_date"], 2)
+    return _template_values(point["explanation_values"], EXPLANATION_TEMPLATES)
+
+
+def localize_suggestions(
+    points: list[Dict[str, Any]],
+    templates: Optional[Dict[str, str]] = None,
+) -> list[Dict[str, Any]]:
+    """Copies of ``points`` for clients and the future-state store, re-rendered from ``templates`` when given.
+
+    ``explanation_values`` is only needed for rendering and stays on the cached originals.
+    """
+    localized = []
+    for point in points:
+        point = dict(point)
+        if templates is not None and "explanation_values" in point:
+            render_tp_explanation(point, templates)
+        point.pop("explanation_values", None)
+        localized.append(point)
+    return localized
+
+
+MAX_RANGE_HORIZONS = 240
+
+
+def _month_steps(start: date, end: date, step_months: int) -> list[date]:
+    if step_months < 1:
+        raise ValueError("step_months must be at least 1")
+    if end < start:
+        raise ValueError("end_date must not be before start_date")
 
-def build_prediction_response(state: RuntimeState, target_date: str, all_stations: list[Dict[str, Any]]) -> Dict[str, Any]:
-    district_predictions = []
+    first = start.year * 12 + (start.month - 1)
+    last = end.year * 12 + (end.month - 1)
+    months = list(range(first, last + 1, step_months))
+    if len(months) > MAX_RANGE_HORIZONS:
+        raise ValueError(f"Range covers {len(months)} horizons; the limit is {MAX_RANGE_HORIZONS}")
+    return [date(month // 12, month % 12 + 1, 1) for month in months]
 
-    for district in state.known_districts:
-        prediction = predict_grid_load(state, district, target_date)
-        district_predictions.append(prediction)
+
+def _rounded(values: np.ndarray, decimals: int) -> list:
+    return [round(float(value), decimals) for value in values]
+
+
+def build_prediction_range_response(
+    state: RuntimeState,
+    start_date: str,
+    end_date: str,
+    step_months: int = 1,
+) -> Dict[str, Any]:
+    """Predict every district for every month in a range with one model call.
+
+    The payload is columnar: per-district lists are aligned with ``target_dates``.
+    """
+    target_dates = _month_steps(parse_target_date(start_date), parse_target_date(end_date), step_months)
+    months_ahead = np.array([_months_ahead(target) for target in target_dates], dtype=float)
+
+    district_keys, latest_rows = _latest_district_rows(state, state.known_districts)
+    metrics = _predict_load_matrix(state, latest_rows, months_ahead)
+
+    predicted_load_kva = metrics["predicted_load"] * 1000
+    load_gap_kva = metrics["load_gap"] * 1000
+    transformers_needed = metrics["transformers_needed"].astype(int)
+
+    return {
+        "mode": "prediction_range",
+        "start_date": start_date,
+        "end_date": end_date,
+        "step_months": step_months,
+        "target_dates": [target.isoformat() for target in target_dates],
+        "months_ahead": months_ahead.astype(int).tolist(),
+        "districts": district_keys,
+        "current_capacity_kva": _rounded(metrics["current_capacity"][:, 0] * 1000, 2),
+        "predicted_load_kva": [_rounded(row, 2) for row in predicted_load_kva],
+        "load_gap_kva": [_rounded(row, 2) for row in load_gap_kva],
+        "load_percentage": [_rounded(row, 2) for row in metrics["load_percentage"]],
+        "risk_score": metrics["risk_score"].astype(int).tolist(),
+        "transformers_needed": transformers_needed.tolist(),
+        "total_transformers_needed": transformers_needed.sum(axis=0).tolist(),
+        "feature_projection": {
+            district_key: {
+                feature: _rounded(values, 2)
+                for feature, values in _build_feature_projection_range(
+                    state.district_history[district_key],
+                    months_ahead,
+                ).items()
+            }
+            for district_key in district_keys
+        },
+    }
+
+
+
+def build_prediction_response(state: RuntimeState, target_date: str, all_stations: StationRegistry) -> Dict[str, Any]:
+    district_predictions = predict_grid_loads(state, state.known_districts, target_date)
 
     district_prediction_map = {entry["district"]: entry for entry in district_predictions}
     stations_future = _build_station_future_projection(all_stations, district_prediction_map)
@@ -328,89 +693,11 @@ def build_prediction_response(state: RuntimeState, target_date: str, all_station
     )[:5]
 
     for point in suggested_tps:
-        district_prediction = district_prediction_map.get(point["district"], {})
-        feature_projection = district_prediction.get("feature_projection", {})
-
-        predicted_load_kva = float(district_prediction.get("predicted_load_kva", 0))
-        current_capacity_kva = float(district_prediction.get("current_capacity_kva", 0))
-        load_gap_kva = float(district_prediction.get("load_gap_kva", 0))
-        load_percentage = float(district_prediction.get("load_percentage", 0))
-        cluster_share_pct = float(point.get("cluster_share_pct", 0.0))
-
-        predicted_load_kva = 0 if predicted_load_kva != predicted_load_kva else predicted_load_kva
-        current_capacity_kva = 0 if current_capacity_kva != current_capacity_kva else current_capacity_kva
-        load_gap_kva = 0 if load_gap_kva != load_gap_kva else load_gap_kva
-        load_percentage = 0 if load_percentage != load_percentage else load_percentage
-        load_gap_kva = max(0.0, load_gap_kva)
-
-        point["target_date"] = district_prediction.get("target_date", target_date)
-        point["expected_load_kva"] = round(float(predicted_load_kva), 1)
-        point["expected_load_mw"] = round(float(predicted_load_kva / 1000), 2)
-        point["current_capacity_kva"] = round(float(current_capacity_kva), 1)
-        point["current_capacity_mw"] = round(float(current_capacity_kva / 1000), 2)
-        point["load_gap_kva"] = round(float(load_gap_kva), 1)
-        point["load_gap_mw"] = round(float(load_gap_kva / 1000), 2)
-        point["load_percentage"] = round(float(load_percentage), 2)
-        point["transformers_needed"] = int(district_suggestion_counts.get(point["district"], 0))
-        point["cluster_load_gap_kva"] = round((cluster_share_pct / 100.0) * max(load_gap_kva, 0.0), 1)
-
-        expected_load_display = int(point["expected_load_kva"]) if point["expected_load_kva"] >= 0 else 0
-        current_capacity_display = int(point["current_capacity_kva"]) if point["current_capacity_kva"] >= 0 else 0
-        load_pct_display = point["load_percentage"] if point["load_percentage"] >= 0 else 0
-
-        point["why_summary"] = (
-            f"By {point['target_date']}, projected demand reaches {expected_load_display} kVA "
-            f"against {current_capacity_display} kVA capacity "
-            f"({load_pct_display}% utilization)."
-        )
-
-        current_tp_count = 5
-        overloaded_tp_count = min(
-            current_tp_count,
-            max(0, int(math.ceil((load_gap_kva / max(current_capacity_kva, 1)) * current_tp_count))),
-        )
-
-        district_rating_shift = _fmt_feature_shift(feature_projection.get("district_rating", {}), decimals=1)
-        density_shift = _fmt_feature_shift(feature_projection.get("population_density", {}), decimals=0)
-        temp_shift = _fmt_feature_shift(feature_projection.get("avg_temp", {}), decimals=1)
-        age_shift = _fmt_feature_shift(feature_projection.get("asset_age", {}), decimals=1)
-        commercial_shift = _fmt_feature_shift(
-            feature_projection.get("commercial_infra_count", {}),
-            decimals=0,
-        )
-        months_since_start = int(feature_projection.get("months_since_start", district_prediction.get("months_ahead", 1)))
-
-        point["reasons"] = [
-            (
-                f"Capacity shortfall is {point['load_gap_kva']:.0f} kVA on {point['target_date']}; "
-                f"this point covers ~{point['cluster_load_gap_kva']:.0f} kVA of that deficit."
-            ),
-            (
-                f"In {point['district'].title()}, about {overloaded_tp_count} of {current_tp_count} current transformers "
-                "are likely to run above safe limits at peak hours, increasing outage/shutdown risk."
-            ),
-            (
-                "Model input trajectory for this date: "
-                f"district rating {district_rating_shift}, "
-                f"population density {density_shift} people/km2, "
-                f"average temperature {temp_shift}C, "
-                f"asset age {age_shift} years, "
-                f"commercial infrastructure count {commercial_shift}, "
-                f"months_since_start {months_since_start}. "
-                f"{seasonal_pressure_note(point['target_date'])}"
-            ),
-            (
-                f"Recommended action: add {point['transformers_needed']} new TP unit(s) in this cluster by "
-                f"{point['target_date']} to close the projected deficit and keep utilization within safe limits."
-            ),
-        ]
-
-        point["recommendation"] = (
-            f"Proposed Installation: {point['district']}\n\n"
-            f"Date: {point['target_date']}\n\n"
-            f"Expected Load: {expected_load_display} kVA\n\n"
-            f"{point['why_summary']}\n\n"
-            + "\n".join(f"{i + 1}. {reason}" for i, reason in enumerate(point["reasons"]))
+        _describe_tp_suggestion(
+            point,
+            district_prediction_map.get(point["district"], {}),
+            target_date,
+            district_suggestion_counts.get(point["district"], 0),
         )
 
     future_state = {
@@ -435,11 +722,112 @@ def build_prediction_response(state: RuntimeState, target_date: str, all_station
     }
 
 
+STREAM_CHUNK_SIZE = 500
+CRITICAL_PRIORITY_SIZE = 5
+
+
+def iter_prediction_events(
+    state: RuntimeState,
+    target_date: str,
+    all_stations: StationRegistry,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> Iterator[Dict[str, Any]]:
+    """Yield the /predict payload incrementally, district predictions first.
+
+    Station projections are emitted in chunks as they are computed and only the
+    overloaded anchor stations plus the running top-5 are retained, so memory
+    stays flat in the station count. Events carry an ``event`` name:
+    ``district_predictions``, ``station_predictions``, ``suggested_tps`` and a
+    final ``summary``.
+    """
+    district_predictions = predict_grid_loads(state, state.known_districts, target_date)
+    district_prediction_map = {entry["district"]: entry for entry in district_predictions}
+    total_transformers_needed = int(sum(entry["transformers_needed"] for entry in district_predictions))
+    yield {
+        "event": "district_predictions",
+        "mode": "prediction",
+        "target_date": target_date,
+        "district_predictions": district_predictions,
+        "total_transformers_needed": total_transformers_needed,
+    }
+
+    district_to_anchors: Dict[str, list[Dict[str, Any]]] = {}
+    # Min-heap of (load pct, -position) keeps the same tie order as a stable descending sort.
+    critical_heap: list[tuple[float, int, Dict[str, Any]]] = []
+    station_count = 0
+    chunk: list[Dict[str, Any]] = []
+    for station in _iter_station_future_projection(all_stations, district_prediction_map):
+        if station["predicted_load_pct"] >= ANCHOR_THRESHOLD_PCT:
+            district_to_anchors.setdefault(station["district"], []).append(station)
+        heapq.heappush(critical_heap, (station["predicted_load_pct"], -station_count, station))
+        if len(critical_heap) > CRITICAL_PRIORITY_SIZE:
+            heapq.heappop(critical_heap)
+        station_count += 1
+
+        chunk.append(station)
+        if len(chunk) >= chunk_size:
+            yield {"event": "station_predictions", "station_predictions": chunk}
+            chunk = []
+    if chunk:
+        yield {"event": "station_predictions", "station_predictions": chunk}
+
+    suggested_tp_count = 0
+    for district, suggestions in _iter_district_suggestions(district_to_anchors, district_prediction_map):
+        for point in suggestions:
+            _describe_tp_suggestion(point, district_prediction_map[district], target_date, len(suggestions))
+        suggested_tp_count += len(suggestions)
+        yield {"event": "suggested_tps", "district": district, "suggested_tps": suggestions}
+
+    yield {
+        "event": "summary",
+        "target_date": target_date,
+        "critical_priority": [station for _, _, station in sorted(critical_heap, reverse=True)],
+        "station_count": station_count,
+        "suggested_tp_count": suggested_tp_count,
+        "total_transformers_needed": total_transformers_needed,
+    }
+
+
+def prediction_cache_key(state: RuntimeState, target_date: str, all_stations: StationRegistry) -> tuple:
+    # months_ahead is measured from today, so the current month is part of the key.
+    return (
+        parse_target_date(target_date).isoformat(),
+        date.today().replace(day=1).isoformat(),
+        state.data_version,
+        state.model_version,
+        all_stations.fingerprint,
+    )
+
+
+def _with_requested_target_date(payload: Dict[str, Any], target_date: str) -> Dict[str, Any]:
+    # Cached payloads are shared between callers; hand out a shallow copy stamped
+    # with the caller's own target_date spelling ("next year", "2027-01", ...).
+    return {
+        **payload,
+        "target_date": target_date,
+        "future_state": {**payload["future_state"], "target_date": target_date},
+    }
+
+
 async def build_prediction_response_async(
     state: RuntimeState,
     target_date: str,
-    all_stations: list[Dict[str, Any]],
+    all_stations: StationRegistry,
+) -> Dict[str, Any]:
+    cache_key = prediction_cache_key(state, target_date, all_stations)
+    payload = state.prediction_cache.get(cache_key)
+    if payload is None:
+        # Offload the full district compute loop (including state.model.predict calls)
+        # to a worker thread so the event loop stays responsive to signals/cancellation.
+        payload = await asyncio.to_thread(build_prediction_response, state, target_date, all_stations)
+        state.prediction_cache.put(cache_key, payload)
+    return _with_requested_target_date(payload, target_date)
+
+
+async def build_prediction_range_response_async(
+    state: RuntimeState,
+    start_date: str,
+    end_date: str,
+    step_months: int = 1,
 ) -> Dict[str, Any]:
-    # Offload the full district compute loop (including state.model.predict calls)
-    # to a worker thread so the event loop stays responsive to signals/cancellation.
-    return await asyncio.to_thread(build_prediction_response, state, target_date, all_stations)
+    return await asyncio.to_thread(build_prediction_range_response, state, start_date, end_date, step_months)
@@ -0,0 +1,86 @@
+import hashlib
+import time
+from typing import Any, Dict
+
+import pandas as pd
+
+from server.data_sources.normalization import normalize_district_dataframe
+from server.history import build_district_history_index
+from server.services.station_service import district_load_history
+from server.state import RuntimeState, _hash_dataframe, replace_district_data
+
+
+
+def _latest_common_snapshot(state: RuntimeState) -> str:
+    # The oldest "latest" snapshot, so a district that lags behind still gets its new rows.
+    return min(str(history.snapshot_dates[-1]) for history in state.district_history.values())
+
+
+
+def _unseen_rows(state: RuntimeState, delta_df: pd.DataFrame, since: str) -> pd.DataFrame:
+    delta_df = delta_df.drop_duplicates(["district", "snapshot_date"], keep="last")
+    known = pd.MultiIndex.from_tuples(
+        [
+            (district, snapshot_date)
+            for district, history in state.district_history.items()
+            for snapshot_date in history.snapshot_dates[history.snapshot_dates > since].tolist()
+        ],
+        names=["district", "snapshot_date"],
+    )
+    keys = pd.MultiIndex.from_arrays(
+        [delta_df["district"].astype(str), delta_df["snapshot_date"].astype(str)],
+        names=["district", "snapshot_date"],
+    )
+    return delta_df[~keys.isin(known)]
+
+
+
+def refresh_district_data(state: RuntimeState) -> tuple[RuntimeState, Dict[str, Any]]:
+    """Fetch snapshots newer than the loaded history and return an updated copy of ``state``.
+
+    Only the districts that received rows get their history index and station
+    load history rebuilt; everything else is shared with the old state. When
+    nothing new arrived the old state is returned unchanged.
+    """
+    if state.data_provider is None:
+        raise RuntimeError("Runtime state has no grid data provider to refresh from")
+
+    started = time.perf_counter()
+    since = _latest_common_snapshot(state)
+    delta_df = state.data_provider.load_district_dataframe_since(since)
+    new_rows = _unseen_rows(state, delta_df, since) if not delta_df.empty else delta_df
+
+    summary: Dict[str, Any] = {
+        "since": since,
+        "rows_added": int(len(new_rows)),
+        "districts_updated": [],
+        "data_version": state.data_version,
+    }
+    if new_rows.empty:
+        summary["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return state, summary
+
+    district_df = normalize_district_dataframe(pd.concat([state.district_df, new_rows], ignore_index=True))
+    affected = sorted(new_rows["district"].astype(str).unique().tolist())
+    district_history = {
+        **state.district_history,
+        **build_district_history_index(district_df[district_df["district"].isin(affected)]),
+    }
+    # Chain the version off the previous one instead of rehashing the whole frame.
+    data_version = hashlib.sha256(f"{state.data_version}:{_hash_dataframe(new_rows)}".encode("utf-8")).hexdigest()[:16]
+
+    refreshed = replace_district_data(state, district_df, district_history, data_version)
+    if refreshed.current_stations is not None:
+        refreshed.current_stations = refreshed.current_stations.with_history(
+            {
+                **refreshed.current_stations.history_by_district,
+                **district_load_history(refreshed, districts=affected),
+            }
+        )
+
+    summary.update(
+        districts_updated=affected,
+        data_version=data_version,
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+    )
+    return refreshed, summary
@@ -1,95 +1,127 @@
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, Optional
 
 import numpy as np
 
 from server.constants import DISTRICT_CENTERS
 from server.state import RuntimeState
-
-
-
-def generate_stations_from_csv(state: RuntimeState) -> list[Dict[str, Any]]:
-    """Generate transformer stations from CSV data in kVA format."""
-    capacity_options = [50, 100, 160, 200, 240, 300, 400]
-
-    stations = []
-    station_id = 1
-
-    target_stations = 20
-    green_count = 10
-    yellow_count = 5
-    red_count = 5
-
-    status_distribution = ["green"] * green_count + ["yellow"] * yellow_count + ["red"] * red_count
-    np.random.shuffle(status_distribution)
-
-    status_idx = 0
-
-    for district in state.known_districts:
-        if status_idx >= len(status_distribution):
+from server.station_registry import STATION_DTYPE, StationRegistry
+
+CAPACITY_OPTIONS_KVA = [50, 100, 160, 200, 240, 300, 400]
+STATUS_LABELS = ["green", "yellow", "red"]
+STATUS_LOAD_RANGES = np.array([[10.0, 49.0], [50.0, 79.0], [80.0, 98.0]])
+HISTORY_WINDOW = 24
+
+
+
+def district_load_history(
+    state: RuntimeState,
+    window: int = HISTORY_WINDOW,
+    districts: Optional[Iterable[str]] = None,
+) -> Dict[str, list[Dict[str, Any]]]:
+    """Peak load as a percentage of the latest capacity, last ``window`` snapshots per district.
+
+    ``districts`` limits the result to those district keys.
+    """
+    history_by_district = {}
+    selected = state.district_history.keys() if districts is None else districts
+    for district in selected:
+        history = state.district_history[district]
+        capacity_mw = float(history.latest.get("current_capacity_mw", 120))
+        load_pct = history.column("actual_peak_load_mw")[-window:] / capacity_mw * 100
+        # Python round() (not np.round) so halfway cases match the rest of the payload.
+        history_by_district[district] = [
+            {"date": str(snapshot_date), "load": round(load, 1)}
+            for snapshot_date, load in zip(history.snapshot_dates[-window:], load_pct.tolist())
+        ]
+    return history_by_district
+
+
+
+def _stations_per_district(district_count: int, target_stations: int) -> list[int]:
+    # Spread the remaining stations evenly over the remaining districts, at least one each.
+    counts = []
+    assigned = 0
+    for position in range(district_count):
+        remaining_stations = target_stations - assigned
+        if remaining_stations <= 0:
             break
-
-        district_data = state.district_df[state.district_df["district"] == district].sort_values("snapshot_date")
-        if district_data.empty:
-            continue
-
-        latest = district_data.iloc[-1]
-        center = DISTRICT_CENTERS.get(district, [41.3111, 69.2797])
-
-        capacity_mw = float(latest.get("current_capacity_mw", 120))
-
-        remaining_stations = target_stations - station_id + 1
-        remaining_districts = len(
-            [d for d in state.known_districts if state.known_districts.index(d) >= state.known_districts.index(district)]
-        )
-        num_stations = max(1, remaining_stations // remaining_districts)
-
-        if num_stations <= 0:
-            break
-
-        history_data = []
-        for _, row in district_data.iterrows():
-            history_data.append(
-                {
-                    "date": str(row["snapshot_date"]),
-                    "load": round(float(row["actual_peak_load_mw"]) / capacity_mw * 100, 1),
-                }
-            )
-
-        for i in range(num_stations):
-            if status_idx >= len(status_distribution) or station_id > target_stations:
-                break
-
-            target_status = status_distribution[status_idx]
-            status_idx += 1
-
-            capacity_kva = int(np.random.choice(capacity_options))
-
-            if target_status == "green":
-                load_pct = np.random.uniform(10, 49)
-            elif target_status == "yellow":
-                load_pct = np.random.uniform(50, 79)
-            else:
-                load_pct = np.random.uniform(80, 98)
-
-            station_id_str = f"ts-{station_id:03d}"
-            station_id += 1
-
-            stations.append(
-                {
-                    "id": station_id_str,
-                    "name": f"Substation-{district.replace(' ', '-')}-{chr(65 + (i % 26))}",
-                    "district": district.title(),
-                    "coordinates": [
-                        round(center[0] + np.random.uniform(-0.01, 0.01), 6),
-                        round(center[1] + np.random.uniform(-0.01, 0.01), 6),
-                    ],
-                    "load_weight": round(load_pct, 1),
-                    "capacity_kva": capacity_kva,
-                    "status": target_status,
-                    "installDate": int(2023 - np.random.randint(0, 5)),
-                    "demographic_growth": round(1.0 + np.random.uniform(0.15, 0.35), 2),
-                    "history": history_data[-24:],
-                }
-            )
-
-    return stations
+        count = min(remaining_stations, max(1, remaining_stations // (district_count - position)))
+        counts.append(count)
+        assigned += count
+    return counts
+
+
+
+def generate_stations_from_csv(
+    state: RuntimeState,
+    rng: Optional[np.random.Generator] = None,
+    target_stations: int = 20,
+) -> StationRegistry:
+    """Generate transformer stations from CSV data in kVA format.
+
+    Pass a seeded ``numpy.random.Generator`` for reproducible output.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+
+    # Half healthy, a quarter each near and over the warning threshold.
+    green_count = target_stations // 2
+    yellow_count = (target_stations - green_count) // 2
+    red_count = target_stations - green_count - yellow_count
+    status_distribution = rng.permutation(
+        np.repeat(np.arange(len(STATUS_LABELS), dtype=np.int16), [green_count, yellow_count, red_count])
+    )
+
+    districts = [district for district in state.known_districts if district in state.district_history]
+    counts = _stations_per_district(len(districts), target_stations)
+    districts = districts[: len(counts)]
+    station_count = int(sum(counts))
+
+    district_codes = np.repeat(np.arange(len(districts), dtype=np.int32), counts)
+    position_in_district = np.concatenate([np.arange(count) for count in counts]) if counts else np.array([], dtype=int)
+    centers = np.array(
+        [DISTRICT_CENTERS.get(district, [41.3111, 69.2797]) for district in districts],
+        dtype=float,
+    ).reshape(-1, 2)[district_codes]
+
+    statuses = status_distribution[:station_count]
+    load_ranges = STATUS_LOAD_RANGES[statuses]
+
+    records = np.zeros(station_count, dtype=STATION_DTYPE)
+    records["district"] = district_codes
+    records["status"] = statuses
+    records["capacity_kva"] = rng.choice(CAPACITY_OPTIONS_KVA, size=station_count)
+    records["load_weight"] = np.round(rng.uniform(load_ranges[:, 0], load_ranges[:, 1]), 1)
+    coordinates = np.round(centers + rng.uniform(-0.01, 0.01, size=(station_count, 2)), 6)
+    records["lat"] = coordinates[:, 0]
+    records["lon"] = coordinates[:, 1]
+    records["install_date"] = 2023 - rng.integers(0, 5, size=station_count)
+    records["demographic_growth"] = np.round(1.0 + rng.uniform(0.15, 0.35, size=station_count), 2)
+
+    ids = np.array([f"ts-{number:03d}" for number in range(1, station_count + 1)], dtype=object)
+    names = np.array(
+        [
+            f"Substation-{districts[code].replace(' ', '-')}-{chr(65 + (position % 26))}"
+            for code, position in zip(district_codes.tolist(), position_in_district.tolist())
+        ],
+        dtype=object,
+    )
+
+    return StationRegistry(
+        ids=ids,
+        names=names,
+        records=records,
+        district_labels=[district.title() for district in districts],
+        status_labels=list(STATUS_LABELS),
+        history_by_district=district_load_history(state),
+    )
+
+
+
+def load_current_stations(state: RuntimeState) -> StationRegistry:
+    """Load the configured station inventory, falling back to synthetic stations."""
+    if state.station_provider is None:
+        return generate_stations_from_csv(state)
+
+    registry = state.station_provider.load_station_registry()
+    registry.history_by_district = district_load_history(state)
+    return registry
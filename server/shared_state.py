@@ -0,0 +1,272 @@
+"""Read-only runtime snapshot shared by worker processes through memory-mapped files.
+
+The gunicorn master builds the snapshot once (see ``server/gunicorn.conf.py``):
+district frame columns, the per-district history arrays, the transformer
+station registry and a flattened copy of the model are written as ``.npy``
+files. Workers map them read-only instead of loading and indexing the data
+themselves, so N workers share one page-cached copy.
+
+Usage::
+
+    python -m server.shared_state .cache/shared_state
+"""
+
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from server.cache import LruTtlCache
+from server.config import Settings, get_settings
+from server.data_sources.factory import build_data_provider, build_station_provider
+from server.flat_forest import FlatForestRegressor, export_flat_forest, is_flat_forest
+from server.future_state_store import build_future_state_store
+from server.history import DistrictHistory
+from server.llm_scheduler import build_llm_scheduler
+from server.services.station_service import load_current_stations
+from server.state import (
+    RuntimeState,
+    _build_answer_cache,
+    _build_llm,
+    _build_llm_stream,
+    _build_retrieval,
+    _load_district_data,
+    _load_model,
+    _timed,
+)
+from server.station_registry import StationRegistry
+
+SNAPSHOT_FORMAT_VERSION = 1
+SNAPSHOT_MANIFEST_FILENAME = "snapshot.json"
+SNAPSHOT_MODEL_DIRNAME = "model"
+
+
+
+def has_shared_snapshot(directory: str) -> bool:
+    return os.path.isfile(os.path.join(directory, SNAPSHOT_MANIFEST_FILENAME))
+
+
+
+def _write_frame(district_df: pd.DataFrame, directory: str) -> list[Dict[str, Any]]:
+    columns = []
+    for position, column in enumerate(district_df.columns):
+        values = district_df[column]
+        filename = f"frame-{position}.npy"
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            np.save(os.path.join(directory, filename), values.cat.codes.to_numpy())
+            columns.append({"name": column, "file": filename, "categories": values.cat.categories.astype(str).tolist()})
+        elif pd.api.types.is_numeric_dtype(values):
+            np.save(os.path.join(directory, filename), values.to_numpy())
+            columns.append({"name": column, "file": filename})
+        else:
+            np.save(os.path.join(directory, filename), values.to_numpy(dtype=str))
+            columns.append({"name": column, "file": filename})
+    return columns
+
+
+def _write_history(district_history: Dict[str, DistrictHistory], directory: str) -> Dict[str, Any]:
+    districts = sorted(district_history)
+    history_columns = list(district_history[districts[0]].columns) if districts else []
+    index = {}
+    start = 0
+    for district in districts:
+        history = district_history[district]
+        index[district] = {"start": start, "stop": start + len(history), "latest": history.latest}
+        start += len(history)
+
+    snapshot_dates = np.concatenate(
+        [np.asarray(district_history[district].snapshot_dates, dtype=str) for district in districts]
+    ) if districts else np.array([], dtype=str)
+    # Column-major, so every per-district column is a contiguous slice of the mapped file.
+    values = np.empty((len(history_columns), start), dtype=np.float64)
+    for district in districts:
+        for row, column in enumerate(history_columns):
+            values[row, index[district]["start"] : index[district]["stop"]] = district_history[district].column(column)
+
+    np.save(os.path.join(directory, "history-dates.npy"), snapshot_dates)
+    np.save(os.path.join(directory, "history-values.npy"), values)
+    return {"columns": history_columns, "districts": index}
+
+
+def _write_stations(registry: StationRegistry, directory: str) -> Dict[str, Any]:
+    np.save(os.path.join(directory, "station-records.npy"), registry.records)
+    np.save(os.path.join(directory, "station-ids.npy"), np.asarray(registry.ids, dtype=str))
+    np.save(os.path.join(directory, "station-names.npy"), np.asarray(registry.names, dtype=str))
+    return {
+        "district_labels": registry.district_labels,
+        "status_labels": registry.status_labels,
+        "history_by_district": registry.history_by_district,
+    }
+
+
+
+def build_shared_snapshot(settings: Settings, directory: str) -> Dict[str, Any]:
+    """Load data, model and stations once and write them to ``directory`` for the workers to map."""
+    started = time.perf_counter()
+    data_provider = build_data_provider(settings)
+    district_df, district_history, data_version = _load_district_data(data_provider)
+    model, model_version = _load_model(settings.model_path)
+
+    # Station loading only needs the district data; the LLM client and caches are left out.
+    loader_state = RuntimeState(
+        district_df=district_df,
+        model=model,
+        known_districts=sorted(district_df["district"].dropna().unique().tolist()),
+        llm=None,
+        data_provider_name=data_provider.provider_name,
+        district_history=district_history,
+        data_version=data_version,
+        model_version=model_version,
+        prediction_cache=LruTtlCache(max_entries=1, ttl_s=0),
+        station_provider=build_station_provider(settings),
+    )
+    stations = load_current_stations(loader_state)
+
+    staging = f"{directory.rstrip(os.sep)}.building-{os.getpid()}"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    if is_flat_forest(settings.model_path):
+        model_dir = os.path.abspath(settings.model_path)
+    else:
+        model_version = export_flat_forest(model, os.path.join(staging, SNAPSHOT_MODEL_DIRNAME))["checksum"]
+        model_dir = SNAPSHOT_MODEL_DIRNAME
+
+    manifest = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "built_at": time.time(),
+        "data_provider_name": data_provider.provider_name,
+        "data_version": data_version,
+        "model_version": model_version,
+        "model_dir": model_dir,
+        "frame": _write_frame(district_df, staging),
+        "history": _write_history(district_history, staging),
+        "stations": _write_stations(stations, staging),
+    }
+    with open(os.path.join(staging, SNAPSHOT_MANIFEST_FILENAME), "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, default=str)
+
+    # Swap directories; workers still mapping the old files keep valid mappings after the unlink.
+    retired = f"{directory.rstrip(os.sep)}.retired-{os.getpid()}"
+    if os.path.exists(directory):
+        os.rename(directory, retired)
+    os.rename(staging, directory)
+    shutil.rmtree(retired, ignore_errors=True)
+
+    manifest["build_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return manifest
+
+
+
+def _map(directory: str, filename: str) -> np.ndarray:
+    return np.load(os.path.join(directory, filename), mmap_mode="r")
+
+
+def _map_snapshot(directory: str) -> tuple[Dict[str, Any], pd.DataFrame, Dict[str, DistrictHistory], StationRegistry]:
+    with open(os.path.join(directory, SNAPSHOT_MANIFEST_FILENAME), encoding="utf-8") as handle:
+        manifest = json.load(handle)
+    if manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+        raise RuntimeError(f"Unsupported shared state snapshot in {directory}: {manifest.get('format_version')}")
+
+    frame_columns = {}
+    for column in manifest["frame"]:
+        values = _map(directory, column["file"])
+        if "categories" in column:
+            values = pd.Categorical.from_codes(values, categories=column["categories"])
+        frame_columns[column["name"]] = values
+    district_df = pd.DataFrame(frame_columns, copy=False)
+
+    snapshot_dates = _map(directory, "history-dates.npy")
+    history_values = _map(directory, "history-values.npy")
+    history_columns = manifest["history"]["columns"]
+    district_history = {
+        district: DistrictHistory(
+            district=district,
+            snapshot_dates=snapshot_dates[entry["start"] : entry["stop"]],
+            columns={
+                column: history_values[row, entry["start"] : entry["stop"]]
+                for row, column in enumerate(history_columns)
+            },
+            latest=entry["latest"],
+        )
+        for district, entry in manifest["history"]["districts"].items()
+    }
+
+    station_meta = manifest["stations"]
+    stations = StationRegistry(
+        ids=_map(directory, "station-ids.npy"),
+        names=_map(directory, "station-names.npy"),
+        records=_map(directory, "station-records.npy"),
+        district_labels=station_meta["district_labels"],
+        status_labels=station_meta["status_labels"],
+        history_by_district=station_meta["history_by_district"],
+    )
+    return manifest, district_df, district_history, stations
+
+
+def load_shared_runtime_state(settings: Settings, stage_timings: Optional[Dict[str, float]] = None) -> RuntimeState:
+    """Build a worker's RuntimeState on top of the snapshot in ``settings.shared_state_dir``."""
+    directory = settings.shared_state_dir
+    stage_timings = stage_timings if stage_timings is not None else {}
+
+    with ThreadPoolExecutor(max_workers=3, thread_name_prefix="startup") as executor:
+        llm_future = executor.submit(_timed, stage_timings, "llm_client", _build_llm, settings)
+        retrieval_future = executor.submit(_timed, stage_timings, "retriever", _build_retrieval, settings)
+        manifest, district_df, district_history, stations = _timed(stage_timings, "shared_snapshot", _map_snapshot, directory)
+        model = _timed(
+            stage_timings,
+            "model",
+            FlatForestRegressor.load,
+            os.path.join(directory, manifest["model_dir"]),
+        )
+        llm = llm_future.result()
+        query_embeddings, retriever = retrieval_future.result()
+
+    data_provider = build_data_provider(settings)
+    return RuntimeState(
+        district_df=district_df,
+        model=model,
+        known_districts=sorted(district_history),
+        llm=llm,
+        data_provider_name=manifest["data_provider_name"],
+        district_history=district_history,
+        data_version=manifest["data_version"],
+        model_version=manifest["model_version"],
+        prediction_cache=LruTtlCache(
+            max_entries=settings.prediction_cache_size,
+            ttl_s=settings.prediction_cache_ttl_s,
+        ),
+        future_state_store=build_future_state_store(settings),
+        current_stations=stations,
+        station_provider=build_station_provider(settings),
+        data_provider=data_provider,
+        llm_stream=_build_llm_stream(settings),
+        answer_cache=_build_answer_cache(settings, query_embeddings),
+        llm_scheduler=build_llm_scheduler(settings),
+        query_embeddings=query_embeddings,
+        retriever=retriever,
+        translation_cache=LruTtlCache(max_entries=settings.translation_cache_size),
+    )
+
+
+
+def main(argv: list[str]) -> None:
+    settings = get_settings()
+    directory = argv[0] if argv else settings.shared_state_dir
+    if not directory:
+        raise SystemExit("usage: python -m server.shared_state OUTPUT_DIR (or set SHARED_STATE_DIR)")
+    manifest = build_shared_snapshot(settings, directory)
+    print(
+        f"Shared state written to {directory} in {manifest['build_ms']:.0f}ms "
+        f"({len(manifest['history']['districts'])} districts, data {manifest['data_version']})"
+    )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,12 +1,28 @@
-from dataclasses import dataclass, field
-from typing import Any, Dict
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
 
 import joblib
 import pandas as pd
-from langchain_community.llms import Ollama
 
+from server.answer_cache import AnswerCache, build_answer_cache
+from server.cache import LruTtlCache
 from server.config import Settings
-from server.data_sources.factory import build_data_provider
+from server.data_sources.base import GridDataProvider, StationDataProvider
+from server.data_sources.factory import build_data_provider, build_station_provider
+from server.embeddings import CachedEmbeddings, build_query_embeddings
+from server.flat_forest import FlatForestRegressor, is_flat_forest
+from server.future_state_store import FutureStateStore, InProcessFutureStateStore, build_future_state_store
+from server.history import DistrictHistory, build_district_history_index
+from server.llm_scheduler import LlmScheduler, build_llm_scheduler
+from server.ollama_stream import OllamaStreamClient
+from server.retrieval import Retriever, build_retriever
+from server.station_registry import StationRegistry
+
+if TYPE_CHECKING:
+    from langchain_community.llms import Ollama
 
 
 @dataclass
@@ -14,33 +30,158 @@ class RuntimeState:
     district_df: pd.DataFrame
     model: Any
     known_districts: list[str]
-    llm: Ollama
+    llm: "Ollama"
     data_provider_name: str
-    future_state: Dict[str, Any] = field(default_factory=dict)
-    current_stations: list[Dict[str, Any]] = field(default_factory=list)
+    district_history: Dict[str, DistrictHistory]
+    data_version: str
+    model_version: str
+    prediction_cache: LruTtlCache
+    future_state_store: FutureStateStore = field(default_factory=InProcessFutureStateStore)
+    current_stations: Optional[StationRegistry] = None
+    station_provider: Optional[StationDataProvider] = None
+    data_provider: Optional[GridDataProvider] = None
+    llm_stream: Optional[OllamaStreamClient] = None
+    answer_cache: Optional[AnswerCache] = None
+    llm_scheduler: LlmScheduler = field(default_factory=LlmScheduler)
+    query_embeddings: Optional[CachedEmbeddings] = None
+    retriever: Optional[Retriever] = None
+    # (text, source language, target language) -> translation; see services/chat_service.py.
+    translation_cache: LruTtlCache = field(default_factory=lambda: LruTtlCache(max_entries=0))
+    # Language -> pre-translated EXPLANATION_TEMPLATES, filled in after startup.
+    explanation_templates: Dict[str, Dict[str, str]] = field(default_factory=dict)
 
 
 
-def create_runtime_state(settings: Settings) -> RuntimeState:
-    if not settings.model_path:
-        raise RuntimeError("GRID_MODEL_PATH is not configured")
+def _hash_dataframe(df: pd.DataFrame) -> str:
+    digest = hashlib.sha256(",".join(map(str, df.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
 
-    data_provider = build_data_provider(settings)
-    district_df = data_provider.load_district_dataframe()
 
-    model = joblib.load(settings.model_path)
-    known_districts = sorted(district_df["district"].dropna().unique().tolist())
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def replace_district_data(
+    state: RuntimeState,
+    district_df: pd.DataFrame,
+    district_history: Optional[Dict[str, DistrictHistory]] = None,
+    data_version: Optional[str] = None,
+) -> RuntimeState:
+    """Return a copy of ``state`` serving ``district_df`` and drop predictions computed from the old data.
 
-    llm = Ollama(
+    The model, LLM client and caches are shared with the old state, which stays
+    valid for requests that are still using it.
+    """
+    state.prediction_cache.invalidate()
+    return replace(
+        state,
+        district_df=district_df,
+        district_history=(
+            district_history if district_history is not None else build_district_history_index(district_df)
+        ),
+        known_districts=sorted(district_df["district"].dropna().unique().tolist()),
+        data_version=data_version or _hash_dataframe(district_df),
+    )
+
+
+
+def _build_llm(settings: Settings) -> "Ollama":
+    # Imported here: langchain accounts for over half a second of import time.
+    from langchain_community.llms import Ollama
+
+    return Ollama(
         model=settings.ollama_llm_model,
         base_url=settings.ollama_base_url,
         temperature=0.2,
     )
 
+
+def _build_llm_stream(settings: Settings) -> OllamaStreamClient:
+    return OllamaStreamClient(base_url=settings.ollama_base_url, model=settings.ollama_llm_model)
+
+
+def _build_retrieval(settings: Settings) -> tuple[CachedEmbeddings, Optional[Retriever]]:
+    query_embeddings = build_query_embeddings(settings)
+    return query_embeddings, build_retriever(settings, query_embeddings)
+
+
+def _build_answer_cache(settings: Settings, query_embeddings: Optional[CachedEmbeddings] = None) -> AnswerCache:
+    embed = None
+    if settings.answer_cache_similarity > 0:
+        embed = (query_embeddings or build_query_embeddings(settings)).embed_query
+    return build_answer_cache(settings, embed)
+
+
+def _load_district_data(data_provider: GridDataProvider) -> tuple[pd.DataFrame, Dict[str, DistrictHistory], str]:
+    district_df = data_provider.load_district_dataframe()
+    return district_df, build_district_history_index(district_df), _hash_dataframe(district_df)
+
+
+def _load_model(model_path: str) -> tuple[Any, str]:
+    if is_flat_forest(model_path):
+        model = FlatForestRegressor.load(model_path)
+        return model, model.checksum
+    return joblib.load(model_path), _hash_file(model_path)
+
+
+def _timed(stage_timings: Dict[str, float], stage: str, loader: Callable[..., Any], *args: Any) -> Any:
+    started = time.perf_counter()
+    try:
+        return loader(*args)
+    finally:
+        stage_timings[stage] = round((time.perf_counter() - started) * 1000, 2)
+
+
+
+def create_runtime_state(settings: Settings, stage_timings: Optional[Dict[str, float]] = None) -> RuntimeState:
+    """Load district data, the model, the LLM client and the document index concurrently.
+
+    Per-stage wall times in milliseconds are written to ``stage_timings`` when given.
+    """
+    if not settings.model_path:
+        raise RuntimeError("GRID_MODEL_PATH is not configured")
+
+    stage_timings = stage_timings if stage_timings is not None else {}
+    data_provider = build_data_provider(settings)
+    station_provider = build_station_provider(settings)
+
+    with ThreadPoolExecutor(max_workers=4, thread_name_prefix="startup") as executor:
+        district_future = executor.submit(_timed, stage_timings, "district_data", _load_district_data, data_provider)
+        model_future = executor.submit(_timed, stage_timings, "model", _load_model, settings.model_path)
+        llm_future = executor.submit(_timed, stage_timings, "llm_client", _build_llm, settings)
+        retrieval_future = executor.submit(_timed, stage_timings, "retriever", _build_retrieval, settings)
+        district_df, district_history, data_version = district_future.result()
+        model, model_version = model_future.result()
+        llm = llm_future.result()
+        query_embeddings, retriever = retrieval_future.result()
+
+    known_districts = sorted(district_df["district"].dropna().unique().tolist())
+
     return RuntimeState(
         district_df=district_df,
         model=model,
         known_districts=known_districts,
         llm=llm,
         data_provider_name=data_provider.provider_name,
+        district_history=district_history,
+        data_version=data_version,
+        model_version=model_version,
+        prediction_cache=LruTtlCache(
+            max_entries=settings.prediction_cache_size,
+            ttl_s=settings.prediction_cache_ttl_s,
+        ),
+        future_state_store=build_future_state_store(settings),
+        station_provider=station_provider,
+        data_provider=data_provider,
+        llm_stream=_build_llm_stream(settings),
+        answer_cache=_build_answer_cache(settings, query_embeddings),
+        llm_scheduler=build_llm_scheduler(settings),
+        query_embeddings=query_embeddings,
+        retriever=retriever,
+        translation_cache=LruTtlCache(max_entries=settings.translation_cache_size),
     )
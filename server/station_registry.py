@@ -0,0 +1,175 @@
+import copy
+import hashlib
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+STATION_DTYPE = np.dtype(
+    [
+        ("district", np.int32),
+        ("status", np.int16),
+        ("lat", np.float64),
+        ("lon", np.float64),
+        ("load_weight", np.float64),
+        ("capacity_kva", np.float64),
+        ("install_date", np.int32),
+        ("demographic_growth", np.float64),
+    ]
+)
+
+
+def _encode_labels(values: pd.Series, label_codes: Dict[str, int]) -> np.ndarray:
+    # Factorize within the chunk, then map the chunk's labels onto registry-wide codes.
+    local_codes, uniques = pd.factorize(values)
+    mapping = np.array([label_codes.setdefault(str(label), len(label_codes)) for label in uniques], dtype=np.int32)
+    return mapping[local_codes] if len(mapping) else np.zeros(len(values), dtype=np.int32)
+
+
+class StationRegistry:
+    """Columnar, read-only transformer station fleet.
+
+    Numeric fields live in one structured array, districts and statuses are
+    stored as integer codes, and the load history is kept once per district.
+    Stations are only turned into dicts at the response boundary.
+    """
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        names: np.ndarray,
+        records: np.ndarray,
+        district_labels: list[str],
+        status_labels: list[str],
+        history_by_district: Optional[Dict[str, list[Dict[str, Any]]]] = None,
+    ) -> None:
+        self.ids = ids
+        self.names = names
+        self.records = records
+        self.district_labels = district_labels
+        self.district_keys = [label.strip().lower() for label in district_labels]
+        self.status_labels = status_labels
+        self.history_by_district = history_by_district or {}
+        self._district_index: Dict[str, np.ndarray] = {}
+        order = np.argsort(records["district"], kind="stable")
+        codes, starts = np.unique(records["district"][order], return_index=True)
+        for code, rows in zip(codes.tolist(), np.split(order, starts[1:])):
+            key = self.district_keys[code]
+            if key in self._district_index:
+                rows = np.sort(np.concatenate([self._district_index[key], rows]))
+            self._district_index[key] = rows
+        self._fingerprint: Optional[str] = None
+
+    @classmethod
+    def from_stations(
+        cls,
+        stations: Iterable[Dict[str, Any]],
+        history_by_district: Optional[Dict[str, list[Dict[str, Any]]]] = None,
+    ) -> "StationRegistry":
+        stations = list(stations)
+        district_codes: Dict[str, int] = {}
+        status_codes: Dict[str, int] = {}
+        records = np.zeros(len(stations), dtype=STATION_DTYPE)
+        for row, station in enumerate(stations):
+            coordinates = station.get("coordinates") or [np.nan, np.nan]
+            records[row] = (
+                district_codes.setdefault(str(station.get("district", "")), len(district_codes)),
+                status_codes.setdefault(str(station.get("status", "")), len(status_codes)),
+                coordinates[0],
+                coordinates[1],
+                station.get("load_weight", np.nan),
+                station.get("capacity_kva", np.nan),
+                station.get("installDate", 0),
+                station.get("demographic_growth", np.nan),
+            )
+        return cls(
+            ids=np.array([str(station.get("id")) for station in stations], dtype=object),
+            names=np.array([str(station.get("name")) for station in stations], dtype=object),
+            records=records,
+            district_labels=list(district_codes),
+            status_labels=list(status_codes),
+            history_by_district=history_by_district,
+        )
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[pd.DataFrame]) -> "StationRegistry":
+        """Build a registry from normalized station frames, one chunk at a time.
+
+        Each chunk is reduced to compact columns before the next one is read,
+        so the full inventory never exists as a single DataFrame.
+        """
+        district_codes: Dict[str, int] = {}
+        status_codes: Dict[str, int] = {}
+        ids, names, parts = [], [], []
+        for chunk in chunks:
+            part = np.zeros(len(chunk), dtype=STATION_DTYPE)
+            part["district"] = _encode_labels(chunk["district"], district_codes)
+            part["status"] = _encode_labels(chunk["status"], status_codes)
+            part["lat"] = chunk["latitude"].to_numpy(dtype=float)
+            part["lon"] = chunk["longitude"].to_numpy(dtype=float)
+            part["load_weight"] = chunk["load_weight"].to_numpy(dtype=float)
+            part["capacity_kva"] = chunk["capacity_kva"].to_numpy(dtype=float)
+            part["install_date"] = chunk["install_year"].to_numpy(dtype=float)
+            part["demographic_growth"] = chunk["demographic_growth"].to_numpy(dtype=float)
+            ids.append(chunk["id"].to_numpy(dtype=object))
+            names.append(chunk["name"].to_numpy(dtype=object))
+            parts.append(part)
+
+        return cls(
+            ids=np.concatenate(ids) if ids else np.array([], dtype=object),
+            names=np.concatenate(names) if names else np.array([], dtype=object),
+            records=np.concatenate(parts) if parts else np.zeros(0, dtype=STATION_DTYPE),
+            district_labels=list(district_codes),
+            status_labels=list(status_codes),
+        )
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        # History is deliberately left out: prediction code only needs the scalar fields.
+        for row in range(len(self.records)):
+            yield self._station_dict(row, include_history=False)
+
+    @property
+    def fingerprint(self) -> str:
+        if self._fingerprint is None:
+            digest = hashlib.sha256()
+            digest.update("\x1f".join(self.ids.tolist()).encode("utf-8"))
+            digest.update("\x1f".join(self.names.tolist()).encode("utf-8"))
+            digest.update("\x1f".join(self.district_labels).encode("utf-8"))
+            digest.update(np.ascontiguousarray(self.records).tobytes())
+            self._fingerprint = digest.hexdigest()[:16]
+        return self._fingerprint
+
+    def with_history(self, history_by_district: Dict[str, list[Dict[str, Any]]]) -> "StationRegistry":
+        """Copy of the registry with new load history; the station arrays are shared, not copied."""
+        registry = copy.copy(self)
+        registry.history_by_district = history_by_district
+        return registry
+
+    def district_indices(self, district: str) -> Optional[np.ndarray]:
+        return self._district_index.get(district.strip().lower())
+
+    def materialize(self, indices: Optional[Iterable[int]] = None, include_history: bool = True) -> list[Dict[str, Any]]:
+        rows = range(len(self.records)) if indices is None else indices
+        return [self._station_dict(int(row), include_history) for row in rows]
+
+    def _station_dict(self, row: int, include_history: bool) -> Dict[str, Any]:
+        record = self.records[row]
+        district_label = self.district_labels[record["district"]]
+        capacity_kva = float(record["capacity_kva"])
+        station = {
+            "id": str(self.ids[row]),
+            "name": str(self.names[row]),
+            "district": district_label,
+            "coordinates": [float(record["lat"]), float(record["lon"])],
+            "load_weight": float(record["load_weight"]),
+            "capacity_kva": int(capacity_kva) if capacity_kva.is_integer() else capacity_kva,
+            "status": self.status_labels[record["status"]],
+            "installDate": int(record["install_date"]),
+            "demographic_growth": float(record["demographic_growth"]),
+        }
+        if include_history:
+            station["history"] = self.history_by_district.get(self.district_keys[record["district"]], [])
+        return station
@@ -0,0 +1,83 @@
+import random
+import sys
+import time
+from typing import Any, Callable, Dict
+
+import numpy as np
+
+from server.config import get_settings
+from server.embeddings import build_query_embeddings
+from server.quantized_index import QuantizedVectorIndex
+from server.retrieval import CHROMA_COLLECTION
+
+RERANK_FACTORS = (0, 2, 4, 8)
+QUERY_WORDS = 12
+
+
+def _measure(search: Callable[[list[float]], list[str]], queries: list[list[float]], truth: list[set[str]], top_k: int) -> Dict[str, Any]:
+    latencies = []
+    found = 0
+    for query, expected in zip(queries, truth):
+        started = time.perf_counter()
+        ids = search(query)
+        latencies.append((time.perf_counter() - started) * 1000)
+        found += len(expected.intersection(ids[:top_k]))
+    latencies.sort()
+    return {
+        "recall": found / (len(queries) * top_k),
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+    }
+
+
+def main(argv: list[str]) -> None:
+    """Recall@k and latency of the int8 index against Chroma's HNSW and an exact float32 scan."""
+    if len(argv) > 2:
+        raise SystemExit("usage: python -m server.vector_benchmark [QUERIES] [TOP_K]")
+    query_count = int(argv[0]) if argv else 200
+    top_k = int(argv[1]) if len(argv) > 1 else 10
+    settings = get_settings()
+    index = QuantizedVectorIndex.load(settings.chroma_dir)
+    if index is None or not len(index):
+        raise SystemExit(f"No quantized index in {settings.chroma_dir}; run python -m server.ingest first")
+    # Imported here: chromadb takes about a second to import.
+    import chromadb
+
+    client = chromadb.PersistentClient(path=settings.chroma_dir, settings=chromadb.Settings(anonymized_telemetry=False))
+    collection = client.get_collection(CHROMA_COLLECTION)
+
+    # Queries are the opening words of random chunks, so each has a known relevant neighbourhood.
+    embeddings = build_query_embeddings(settings)
+    rng = random.Random(0)
+    rows = rng.sample(range(len(index)), min(query_count, len(index)))
+    queries = [embeddings.embed_query(" ".join(index.texts[row].split()[:QUERY_WORDS])) for row in rows]
+    vectors = np.asarray(index.vectors, dtype=np.float32)
+
+    def exact(query: list[float]) -> list[str]:
+        distances = ((vectors - np.asarray(query, dtype=np.float32)) ** 2).sum(axis=1)
+        return [index.chunk_ids[row] for row in np.argsort(distances)[:top_k]]
+
+    def chroma(query: list[float]) -> list[str]:
+        return collection.query(query_embeddings=[query], n_results=top_k, include=[])["ids"][0]
+
+    def int8(rerank: int) -> Callable[[list[float]], list[str]]:
+        return lambda query: [index.chunk_ids[row] for row, _ in index.search(query, top_k, rerank=rerank)]
+
+    truth = [set(exact(query)) for query in queries]
+    results = {"float32 exact scan": _measure(exact, queries, truth, top_k), "chroma hnsw": _measure(chroma, queries, truth, top_k)}
+    for rerank in RERANK_FACTORS:
+        label = f"int8 + rerank x{rerank}" if rerank else "int8 only"
+        results[label] = _measure(int8(rerank), queries, truth, top_k)
+
+    stats = index.stats()
+    print(
+        f"{stats['documents']} vectors x {stats['dimensions']} dims; int8 codes {stats['code_bytes']} bytes, "
+        f"float32 {stats['float_bytes']} bytes; {len(queries)} queries, recall@{top_k} against the exact scan"
+    )
+    print(f"{'method':<22} {'recall':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for label, result in results.items():
+        print(f"{label:<22} {result['recall']:>8.3f} {result['p50_ms']:>8.3f} {result['p95_ms']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,4 +1,5 @@
 import { useEffect, useMemo, useRef, useState } from 'react';
+import { useTranslation } from 'react-i18next';
 import MapView from './components/MapView.jsx';
 import AnalyticsModal from './components/AnalyticsModal.jsx';
 import TimeControlPanel from './components/TimeControlPanel.jsx';
@@ -11,6 +12,8 @@ const API_BASE_URL = (
 const PREDICT_DEBOUNCE_MS = 350;
 
 function App() {
+  const { i18n } = useTranslation();
+  const language = i18n.resolvedLanguage;
   const [selectedId, setSelectedId] = useState(null);
   const [analyticsId, setAnalyticsId] = useState(null);
   const [futureMode, setFutureMode] = useState(false);
@@ -72,6 +75,7 @@ function App() {
           signal: controller.signal,
           body: JSON.stringify({
             target_date: futureDateKey,
+            language,
           }),
         });
         if (!response.ok) {
@@ -95,7 +99,7 @@ function App() {
       window.clearTimeout(timeoutId);
       controller.abort();
     };
-  }, [futureMode, futureDateKey]);
+  }, [futureMode, futureDateKey, language]);
 
   const handleFutureDateChange = (nextDate) => {
     if (!nextDate) return;
@@ -126,7 +126,7 @@ function Chatbot({
   futureSummary,
   activeSuggestedTp
 }) {
-  const { t } = useTranslation()
+  const { t, i18n } = useTranslation()
   const [open, setOpen] = useState(false)
   const [input, setInput] = useState('')
   const [isLoading, setIsLoading] = useState(false)
@@ -229,6 +229,8 @@ function Chatbot({
         body: JSON.stringify({
           question: trimmed,
           query: trimmed,
+          future_state_id: futureSummary?.future_state_id || null,
+          language: i18n.resolvedLanguage,
           context: {
             ...contextState
           }
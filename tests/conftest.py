@@ -0,0 +1,5 @@
+import os
+
+# server.app only checks at import that the model file exists; the tests inject their own RuntimeState
+# and never load it, so any existing file will do.
+os.environ.setdefault("GRID_MODEL_PATH", os.path.abspath(__file__))
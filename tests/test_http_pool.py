@@ -0,0 +1,137 @@
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from server.data_sources.http_pool import PooledApiClient, TransientHTTPError
+
+
+class StubApi:
+    """Local paged API; ``routes`` maps a page number to a list of responses served in turn."""
+
+    def __init__(self) -> None:
+        self.routes: dict[int, list[tuple[int, object]]] = {}
+        self.requests: list[dict] = []
+        self.gzip = False
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:
+                query = parse_qs(urlparse(self.path).query)
+                page = int(query.get("page", ["1"])[0])
+                stub.requests.append({"page": page, "headers": dict(self.headers)})
+                responses = stub.routes.get(page) or [(404, {"error": "not found"})]
+                status, payload = responses.pop(0) if len(responses) > 1 else responses[0]
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                if stub.gzip:
+                    body = gzip.compress(body)
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def pages_of(self, records: list[dict], page_size: int) -> None:
+        for start in range(0, len(records), page_size):
+            self.routes[start // page_size + 1] = [(200, {"data": records[start:start + page_size]})]
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    api = StubApi()
+    yield api
+    api.close()
+
+
+def _client(stub: StubApi, **kwargs) -> PooledApiClient:
+    return PooledApiClient(stub.url, {"Accept": "application/json"}, timeout_s=5, backoff_s=0.01, **kwargs)
+
+
+def _records(count: int) -> list[dict]:
+    return [{"id": index} for index in range(count)]
+
+
+def test_pages_prefetched_past_the_last_page_do_not_fail_the_load(stub):
+    stub.pages_of(_records(15), page_size=10)  # pages 1-2; page 3 and later answer 404
+    client = _client(stub, concurrency=4)
+
+    pages = list(client.iter_pages("/x", page_size=10))
+
+    assert [record["id"] for page in pages for record in page] == list(range(15))
+    client.close()
+
+
+def test_error_on_a_page_before_the_last_one_is_raised(stub):
+    stub.pages_of(_records(25), page_size=10)
+    stub.routes[2] = [(404, {"error": "gone"})]
+    client = _client(stub, concurrency=4)
+
+    with pytest.raises(RuntimeError, match="404"):
+        list(client.iter_pages("/x", page_size=10))
+    client.close()
+
+
+def test_next_page_null_ends_the_sequence(stub):
+    stub.routes[1] = [(200, {"data": _records(10), "next_page": 2})]
+    stub.routes[2] = [(200, {"data": _records(10), "next_page": None})]
+    client = _client(stub, concurrency=2)
+
+    assert sum(len(page) for page in client.iter_pages("/x", page_size=10)) == 20
+    client.close()
+
+
+def test_transient_errors_are_retried_with_backoff(stub):
+    stub.routes[1] = [(503, {}), (429, {}), (200, {"data": _records(3)})]
+    client = _client(stub, max_retries=3)
+
+    assert client.get_json("/x", {"page": 1}) == {"data": _records(3)}
+    assert len(stub.requests) == 3
+    client.close()
+
+
+def test_retries_give_up_after_max_retries(stub):
+    stub.routes[1] = [(503, {})]
+    client = _client(stub, max_retries=2)
+
+    with pytest.raises(TransientHTTPError, match="503"):
+        client.get_json("/x", {"page": 1})
+    assert len(stub.requests) == 3
+    client.close()
+
+
+def test_client_errors_are_not_retried(stub):
+    stub.routes[1] = [(400, {"error": "bad request"})]
+    client = _client(stub, max_retries=3)
+
+    with pytest.raises(RuntimeError, match="400"):
+        client.get_json("/x", {"page": 1})
+    assert len(stub.requests) == 1
+    client.close()
+
+
+def test_gzip_responses_are_requested_and_decoded(stub):
+    stub.gzip = True
+    stub.pages_of(_records(4), page_size=10)
+    client = _client(stub, concurrency=1)
+
+    assert list(client.iter_pages("/x", page_size=10)) == [_records(4)]
+    assert stub.requests[0]["headers"]["Accept-Encoding"] == "gzip"
+    client.close()
@@ -0,0 +1,163 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from server.llm_scheduler import PRIORITY_BATCH, PRIORITY_INTERACTIVE, LlmQueueFull, LlmScheduler
+
+
+def _wait_for_queue(scheduler: LlmScheduler, depth: int) -> None:
+    deadline = time.monotonic() + 5
+    while scheduler.stats()["queue_depth"] != depth:
+        assert time.monotonic() < deadline, f"queue never reached depth {depth}"
+        time.sleep(0.005)
+
+
+def _start(target, *args) -> threading.Thread:
+    thread = threading.Thread(target=target, args=args, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_interactive_request_is_served_before_queued_batch_work():
+    scheduler = LlmScheduler(max_concurrency=1, max_queue=4, timeout_s=5)
+    holder = scheduler.acquire(PRIORITY_BATCH)
+    order: list[str] = []
+
+    def run(name: str, priority: int) -> None:
+        with scheduler.slot(priority):
+            order.append(name)
+
+    threads = [_start(run, "batch-1", PRIORITY_BATCH)]
+    _wait_for_queue(scheduler, 1)
+    threads.append(_start(run, "batch-2", PRIORITY_BATCH))
+    _wait_for_queue(scheduler, 2)
+    threads.append(_start(run, "interactive", PRIORITY_INTERACTIVE))
+    _wait_for_queue(scheduler, 3)
+    holder.release()
+    for thread in threads:
+        thread.join(5)
+
+    assert order == ["interactive", "batch-1", "batch-2"]
+    assert scheduler.stats()["active"] == 0
+
+
+def test_full_queue_displaces_the_newest_batch_request():
+    scheduler = LlmScheduler(max_concurrency=1, max_queue=2, timeout_s=5)
+    holder = scheduler.acquire(PRIORITY_BATCH)
+    outcomes: dict[str, object] = {}
+
+    def run(name: str, priority: int) -> None:
+        try:
+            with scheduler.slot(priority):
+                outcomes[name] = "served"
+        except LlmQueueFull as error:
+            outcomes[name] = error
+
+    threads = [_start(run, "batch-old", PRIORITY_BATCH)]
+    _wait_for_queue(scheduler, 1)
+    threads.append(_start(run, "batch-new", PRIORITY_BATCH))
+    _wait_for_queue(scheduler, 2)
+    threads.append(_start(run, "interactive", PRIORITY_INTERACTIVE))
+    threads[1].join(5)
+
+    assert isinstance(outcomes["batch-new"], LlmQueueFull)
+    assert "higher-priority" in str(outcomes["batch-new"])
+    holder.release()
+    for thread in threads:
+        thread.join(5)
+    assert outcomes["batch-old"] == "served" and outcomes["interactive"] == "served"
+    assert scheduler.stats()["displaced"] == 1
+
+
+def test_full_queue_of_interactive_requests_rejects_the_newcomer():
+    scheduler = LlmScheduler(max_concurrency=1, max_queue=1, timeout_s=5)
+    holder = scheduler.acquire(PRIORITY_INTERACTIVE)
+    thread = _start(lambda: scheduler.acquire(PRIORITY_INTERACTIVE).release())
+    _wait_for_queue(scheduler, 1)
+
+    with pytest.raises(LlmQueueFull):
+        scheduler.acquire(PRIORITY_INTERACTIVE)
+
+    holder.release()
+    thread.join(5)
+    assert scheduler.stats()["rejected"] == 1
+
+
+def test_no_more_than_max_concurrency_generations_run_at_once():
+    scheduler = LlmScheduler(max_concurrency=1, max_queue=16, timeout_s=5)
+    lock = threading.Lock()
+    running = peak = 0
+
+    class SlowLlm:
+        def invoke(self, prompt: str) -> str:
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.01)
+            with lock:
+                running -= 1
+            return prompt.upper()
+
+    async def main() -> list[str]:
+        llm = SlowLlm()
+        interactive = [scheduler.invoke_async(llm, f"ask {index}") for index in range(4)]
+        batch = [asyncio.to_thread(scheduler.invoke, llm, f"translate {index}") for index in range(4)]
+        return await asyncio.gather(*interactive, *batch)
+
+    answers = asyncio.run(main())
+
+    assert sorted(answers) == sorted(
+        [f"ASK {index}" for index in range(4)] + [f"TRANSLATE {index}" for index in range(4)]
+    )
+    assert peak == 1
+    assert scheduler.stats()["active"] == 0
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    scheduler = LlmScheduler(max_concurrency=1, max_queue=4, timeout_s=5)
+
+    async def main() -> None:
+        holder = await scheduler.acquire_async(PRIORITY_INTERACTIVE)
+        waiter = asyncio.ensure_future(scheduler.acquire_async(PRIORITY_INTERACTIVE))
+        await asyncio.sleep(0.01)
+        assert scheduler.stats()["queue_depth"] == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert scheduler.stats()["queue_depth"] == 0
+        holder.release()
+        holder.release()  # Idempotent: a second release must not free a slot nobody holds.
+        assert scheduler.stats()["active"] == 0
+        # The slot is free for the next caller straight away.
+        lease = await scheduler.acquire_async(PRIORITY_INTERACTIVE, timeout_s=0.1)
+        lease.release()
+
+    asyncio.run(main())
+    assert scheduler.stats()["active"] == 0
+
+
+def test_cancelling_a_running_request_frees_its_slot():
+    scheduler = LlmScheduler(max_concurrency=1, max_queue=4, timeout_s=5)
+
+    async def main() -> None:
+        started = asyncio.Event()
+
+        async def generate() -> None:
+            async with scheduler.slot_async(PRIORITY_INTERACTIVE):
+                started.set()
+                await asyncio.sleep(10)
+
+        task = asyncio.ensure_future(generate())
+        await started.wait()
+        assert scheduler.stats()["active"] == 1
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert scheduler.stats()["active"] == 0
+        lease = await scheduler.acquire_async(PRIORITY_INTERACTIVE, timeout_s=0.1)
+        lease.release()
+
+    asyncio.run(main())
@@ -0,0 +1,202 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+import server.app as appmod
+from server.cache import LruTtlCache
+from server.llm_scheduler import LlmScheduler
+from server.ollama_stream import OllamaStreamClient
+from server.schemas import ChatQuery
+from server.state import RuntimeState
+
+
+class StubOllama:
+    """Local ``/api/generate`` that streams ``lines`` as NDJSON, ``delay_s`` apart, or answers ``status``."""
+
+    def __init__(self) -> None:
+        self.lines: list[str] = []
+        self.delay_s = 0.0
+        self.status = 200
+        self.requests: list[dict] = []
+        self.sent = 0
+        self.disconnected = threading.Event()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # HTTP/1.0: the stream ends when the connection closes, like a chunked Ollama reply.
+            protocol_version = "HTTP/1.0"
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", "0"))
+                stub.requests.append(json.loads(self.rfile.read(length)))
+                if stub.status >= 400:
+                    body = json.dumps({"error": f"model '{stub.requests[-1]['model']}' not found"}).encode("utf-8")
+                    self.send_response(stub.status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.end_headers()
+                try:
+                    for line in stub.lines:
+                        self.wfile.write(line.encode("utf-8") + b"\n")
+                        self.wfile.flush()
+                        stub.sent += 1
+                        time.sleep(stub.delay_s)
+                except (BrokenPipeError, ConnectionResetError):
+                    stub.disconnected.set()
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tokens(self, tokens: list[str]) -> None:
+        self.lines = [json.dumps({"response": token, "done": False}) for token in tokens]
+        final = {"response": "", "done": True, "prompt_eval_count": 12, "eval_count": len(tokens)}
+        self.lines.append(json.dumps(final))
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    api = StubOllama()
+    yield api
+    api.close()
+
+
+@pytest.fixture
+def install_state(monkeypatch):
+    def install(base_url: str, timeout_s: float = 30.0) -> RuntimeState:
+        runtime_state = RuntimeState(
+            district_df=None,
+            model=None,
+            known_districts=[],
+            llm=None,
+            data_provider_name="test",
+            district_history={},
+            data_version="test",
+            model_version="test",
+            prediction_cache=LruTtlCache(),
+            llm_stream=OllamaStreamClient(base_url, "test-model", connect_timeout_s=1.0),
+            llm_scheduler=LlmScheduler(max_concurrency=1, max_queue=4, timeout_s=timeout_s),
+        )
+        monkeypatch.setattr(appmod, "state", runtime_state)
+        return runtime_state
+
+    return install
+
+
+def _ask_stream(query: str = "How loaded is Chilonzor next summer?") -> list[dict]:
+    response = TestClient(appmod.app).post("/ask/stream", json={"query": query})
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines() if line.strip()]
+
+
+def test_tokens_are_relayed_between_meta_and_done(stub, install_state):
+    stub.tokens(["Load ", "stays ", "below capacity."])
+    runtime_state = install_state(stub.url)
+
+    events = _ask_stream()
+
+    assert [event["event"] for event in events] == ["meta", "token", "token", "token", "done"]
+    assert [event["token"] for event in events[1:-1]] == ["Load ", "stays ", "below capacity."]
+    assert events[-1]["answer"] == "Load stays below capacity."
+    assert events[-1]["eval_count"] == 3
+    assert stub.requests[0]["model"] == "test-model" and stub.requests[0]["stream"] is True
+    assert runtime_state.llm_scheduler.stats()["active"] == 0
+
+
+def test_unreachable_ollama_gives_a_single_error_event(install_state):
+    runtime_state = install_state("http://127.0.0.1:1")
+
+    events = _ask_stream()
+
+    assert [event["event"] for event in events] == ["meta", "error"]
+    assert events[1]["message"] == appmod.ollama_unavailable_message()
+    assert runtime_state.llm_scheduler.stats()["active"] == 0
+
+
+def test_unknown_model_gives_a_single_error_event(stub, install_state):
+    stub.status = 404
+    install_state(stub.url)
+
+    events = _ask_stream()
+
+    assert [event["event"] for event in events] == ["meta", "error"]
+    assert events[1]["message"] == "404 from Ollama: model 'test-model' not found"
+
+
+def test_malformed_line_ends_the_stream_with_an_error_event(stub, install_state):
+    stub.lines = [json.dumps({"response": "Load ", "done": False}), '{"response": "trunc']
+    install_state(stub.url)
+
+    events = _ask_stream()
+
+    assert [event["event"] for event in events] == ["meta", "token", "error"]
+    assert events[-1]["message"].startswith("malformed response from Ollama")
+
+
+def test_generation_past_the_deadline_gives_a_deadline_error_event(stub, install_state):
+    stub.tokens([f"t{index} " for index in range(40)])
+    stub.delay_s = 0.05
+    runtime_state = install_state(stub.url, timeout_s=0.5)
+
+    events = _ask_stream()
+
+    assert events[0]["event"] == "meta"
+    assert events[-1]["event"] == "error"
+    assert events[-1]["message"] == "LLM generation exceeded its deadline"
+    assert "done" not in [event["event"] for event in events]
+    assert runtime_state.llm_scheduler.stats()["active"] == 0
+
+
+def test_client_disconnect_closes_the_upstream_response(stub, install_state, monkeypatch):
+    stub.tokens([f"t{index} " for index in range(200)])
+    stub.delay_s = 0.02
+    runtime_state = install_state(stub.url)
+    opened = []
+    stream_generate = runtime_state.llm_stream.stream_generate
+
+    def recording_stream_generate(*args, **kwargs):
+        opened.append(stream_generate(*args, **kwargs))
+        return opened[-1]
+
+    monkeypatch.setattr(runtime_state.llm_stream, "stream_generate", recording_stream_generate)
+
+    async def read_two_events_then_leave() -> tuple[list[dict], bool]:
+        request = Request({"type": "http", "method": "POST", "path": "/ask/stream", "headers": []})
+        request.state.request_id = "disconnect-test"
+        response = await appmod.ask_stream_endpoint(ChatQuery(query="Will Yunusobod need a transformer?"), request)
+        events = response.body_iterator
+        received = [json.loads(await events.__anext__()) for _ in range(2)]
+        # What Starlette does once the client is gone: the response generator is closed mid-stream.
+        await events.aclose()
+        # Closed by aclosing() right away, not whenever the garbage collector gets to it.
+        assert opened[0].ag_frame is None
+        # Checked before the pooled client is closed, which would drop the connection anyway.
+        closed = await asyncio.to_thread(stub.disconnected.wait, 5)
+        await runtime_state.llm_stream.aclose()
+        return received, closed
+
+    received, closed = asyncio.run(read_two_events_then_leave())
+
+    assert [event["event"] for event in received] == ["meta", "token"]
+    assert closed, "Ollama response was left open after the client went away"
+    assert stub.sent < 201
+    assert runtime_state.llm_scheduler.stats()["active"] == 0
@@ -0,0 +1,156 @@
+import asyncio
+import os
+import time
+from dataclasses import replace
+from types import SimpleNamespace
+
+import chromadb
+import pytest
+
+import server.app as appmod
+from server.config import get_settings
+from server.embeddings import CachedEmbeddings, EmbeddingStore, HashingEmbeddings
+from server.retrieval import CHROMA_COLLECTION, ChromaRetriever, build_retriever
+from server.services.chat_service import NO_FUTURE_STATE, AskPrompt, build_ask_prompt
+
+CHUNKS = [
+    ("Transformer substations keep a 20 percent capacity reserve above the peak load.", "SHNQ_2.07.01-23.pdf", 3),
+    ("Cable lines under roads are laid in protective pipes at a depth of 0.7 metres.", "SHNQ_2.07.01-23.pdf", 7),
+    ("Street lighting poles are spaced no more than 30 metres apart.", "lighting_rules.pdf", 0),
+    ("Residential districts plan 1.5 kW of electrical load per apartment.", "ORQ-939.pdf", 12),
+]
+QUERY = "What capacity reserve must a transformer substation keep?"
+
+
+class SlowEmbeddings(HashingEmbeddings):
+    """Hashing embeddings that take ``delay_s`` per query, like a loaded embedding model."""
+
+    def __init__(self, delay_s: float) -> None:
+        super().__init__()
+        self.delay_s = delay_s
+
+    def embed_query(self, text: str) -> list[float]:
+        time.sleep(self.delay_s)
+        return super().embed_query(text)
+
+
+@pytest.fixture
+def index_dir(tmp_path):
+    """A Chroma index laid out the way ``server/ingest.py`` writes it, embedded with HashingEmbeddings."""
+    client = chromadb.PersistentClient(path=str(tmp_path), settings=chromadb.Settings(anonymized_telemetry=False))
+    collection = client.get_or_create_collection(CHROMA_COLLECTION, metadata={"embedding_model": "hashing-test"})
+    collection.upsert(
+        ids=[f"chunk-{index}" for index in range(len(CHUNKS))],
+        documents=[text for text, _, _ in CHUNKS],
+        embeddings=HashingEmbeddings().embed_documents([text for text, _, _ in CHUNKS]),
+        metadatas=[{"source": os.path.join("docs", source), "page": page} for _, source, page in CHUNKS],
+    )
+    return str(tmp_path)
+
+
+def _retriever(index_dir: str, embeddings: CachedEmbeddings, top_k: int = 2) -> ChromaRetriever:
+    settings = replace(
+        get_settings(),
+        rag_enabled=True,
+        chroma_dir=index_dir,
+        rag_mode="vector",
+        vector_store="chroma",
+        rag_top_k=top_k,
+        rag_max_distance=0.0,
+    )
+    retriever = build_retriever(settings, embeddings)
+    assert isinstance(retriever, ChromaRetriever)
+    return retriever
+
+
+def _ask(query: str = QUERY) -> AskPrompt:
+    return AskPrompt(query=query, prompt=build_ask_prompt(query, NO_FUTURE_STATE, {}), context_hash="test")
+
+
+def test_closest_chunks_come_first_with_their_sources(index_dir):
+    retriever = _retriever(index_dir, CachedEmbeddings(HashingEmbeddings(), "hashing-test"))
+
+    chunks, timing = retriever.retrieve(QUERY)
+
+    assert chunks[0].chunk_id == "chunk-0"
+    assert len(chunks) == 2 and timing["hits"] == 2
+    assert chunks[0].distance <= chunks[1].distance
+    assert chunks[0].as_source() == {
+        "label": "SHNQ_2.07.01-23, p. 4",
+        "source": "SHNQ_2.07.01-23.pdf",
+        "page": 4,
+        "distance": round(chunks[0].distance, 4),
+        "match": "vector",
+    }
+
+
+def test_retrieved_excerpts_go_into_the_prompt_and_sources(index_dir):
+    embeddings = CachedEmbeddings(HashingEmbeddings(), "hashing-test")
+    runtime_state = SimpleNamespace(retriever=_retriever(index_dir, embeddings))
+    ask = _ask()
+
+    asyncio.run(appmod.retrieve_excerpts(runtime_state, ask, "retrieval-test"))
+
+    assert ask.retrieval["timed_out"] is False and ask.retrieval["hits"] == 2
+    assert ask.sources[0]["label"] == "SHNQ_2.07.01-23, p. 4"
+    assert "[1] SHNQ_2.07.01-23, p. 4: Transformer substations keep a 20 percent capacity reserve" in ask.prompt
+
+
+def test_retrieval_past_the_budget_leaves_the_prompt_without_excerpts(index_dir, monkeypatch):
+    monkeypatch.setattr(appmod, "settings", replace(appmod.settings, rag_timeout_ms=50))
+    embeddings = CachedEmbeddings(SlowEmbeddings(delay_s=0.3), "hashing-test")
+    runtime_state = SimpleNamespace(retriever=_retriever(index_dir, embeddings))
+    ask = _ask()
+    prompt = ask.prompt
+
+    asyncio.run(appmod.retrieve_excerpts(runtime_state, ask, "retrieval-test"))
+
+    assert ask.retrieval == {"timed_out": True, "budget_ms": 50, "hits": 0}
+    assert ask.prompt == prompt
+    assert ask.sources == []
+    # The abandoned search still finished (asyncio.run waits for its thread), so a retry skips the model.
+    assert embeddings.model_calls == 1
+    assert runtime_state.retriever.retrieve(QUERY)[1]["embedding_cached"] is True
+
+
+def test_repeated_query_is_embedded_once(index_dir):
+    embeddings = CachedEmbeddings(HashingEmbeddings(), "hashing-test")
+    retriever = _retriever(index_dir, embeddings)
+
+    first, first_timing = retriever.retrieve(QUERY)
+    second, second_timing = retriever.retrieve(QUERY)
+
+    assert [chunk.chunk_id for chunk in second] == [chunk.chunk_id for chunk in first]
+    assert first_timing["embedding_cached"] is False
+    assert second_timing["embedding_cached"] is True
+    assert embeddings.model_calls == 1
+    assert embeddings.stats()["hits"] == 1
+
+
+def test_query_embedded_by_another_worker_comes_from_the_shared_store(index_dir, tmp_path):
+    store_path = str(tmp_path / "embeddings.sqlite3")
+    first_worker = CachedEmbeddings(HashingEmbeddings(), "hashing-test", store=EmbeddingStore(store_path))
+    second_worker = CachedEmbeddings(HashingEmbeddings(), "hashing-test", store=EmbeddingStore(store_path))
+
+    _retriever(index_dir, first_worker).retrieve(QUERY)
+    _, timing = _retriever(index_dir, second_worker).retrieve(QUERY)
+
+    assert timing["embedding_cached"] is True
+    assert (first_worker.model_calls, second_worker.model_calls) == (1, 0)
+
+
+def test_embedding_store_keeps_its_totals_without_rescanning(tmp_path):
+    store_path = str(tmp_path / "embeddings.sqlite3")
+    store = EmbeddingStore(store_path, max_entries=3)
+    embeddings = HashingEmbeddings(dimensions=8)
+    texts = [f"question {index}" for index in range(5)]
+
+    for text in texts:
+        store.put_many("hashing-test", [text], embeddings.embed_documents([text]))
+    store.put_many("hashing-test", texts[-1:], embeddings.embed_documents(texts[-1:]))  # an update, not a new row
+
+    stats = store.stats()
+    assert (stats["entries"], stats["bytes"], stats["evictions"]) == (3, 3 * 8 * 4, 2)
+    assert store.get_many("hashing-test", texts[:2]) == [None, None]
+    reopened = EmbeddingStore(store_path, max_entries=3).stats()
+    assert (reopened["entries"], reopened["bytes"]) == (stats["entries"], stats["bytes"])
@@ -0,0 +1,55 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from server.cache import LruTtlCache
+from server.services.chat_service import translate_templates
+from server.services.prediction_service import (
+    EXPLANATION_TEMPLATES,
+    localize_suggestions,
+    render_tp_explanation,
+    sample_explanation_values,
+)
+
+
+class ScriptedLlm:
+    """Stands in for the scheduler and model: "translates" by prefixing, after ``edit`` has had its way."""
+
+    def __init__(self, edit=lambda text: text) -> None:
+        self.edit = edit
+
+    def invoke(self, llm, prompt: str, priority: int) -> str:
+        texts = json.loads(prompt[prompt.index("["):])
+        return json.dumps([self.edit(f"UZ {text}") for text in texts], ensure_ascii=False)
+
+
+def _state(llm: ScriptedLlm) -> SimpleNamespace:
+    return SimpleNamespace(llm=None, llm_scheduler=llm, translation_cache=LruTtlCache(max_entries=100))
+
+
+def test_translated_templates_render_a_suggestion():
+    llm = ScriptedLlm()
+    templates = translate_templates(EXPLANATION_TEMPLATES, "uz", _state(llm), sample_values=sample_explanation_values())
+    values = sample_explanation_values()
+    del values["season_note"]  # Added by render_tp_explanation itself.
+    point = {"explanation_values": values}
+
+    render_tp_explanation(point, templates)
+
+    assert point["why_summary"].startswith("UZ By 2027-07-15, projected demand reaches 12500 kVA")
+    assert "UZ Summer cooling demand" in point["reasons"][2]
+    assert localize_suggestions([point], templates)[0]["why_summary"] == point["why_summary"]
+
+
+@pytest.mark.parametrize("field", ["{load_pct:x}", "{district!r}", "{load_pct!s}", "{load_pct:>5}", "{load_pct"])
+def test_templates_with_altered_fields_fall_back_to_english(field):
+    llm = ScriptedLlm(lambda text: text.replace("{load_pct}", field).replace("{district}", field))
+    state = _state(llm)
+
+    templates = translate_templates(EXPLANATION_TEMPLATES, "uz", state, sample_values=sample_explanation_values())
+
+    assert templates is None
+    # Only the rejected templates are asked for again; the rest stay cached.
+    translate_templates(EXPLANATION_TEMPLATES, "uz", state, sample_values=sample_explanation_values())
+    assert state.translation_cache.stats()["entries"] == len(EXPLANATION_TEMPLATES) - 2